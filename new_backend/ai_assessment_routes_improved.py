@@ -1,4 +1,5 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, make_response, send_file
+from functools import wraps
 import json
 import base64
 import cv2
@@ -6,11 +7,21 @@ import numpy as np
 import mediapipe as mp
 import os
 import wave
-import tempfile
 import logging
 import io
 from pydub import AudioSegment
 import struct
+import queue
+
+import config
+from catalog_cache import VersionedBody
+from tasks import landmark_array, physical_response, speech
+from tasks.frame_preprocess import FrameIngest, to_rgb
+from tasks.metrics import metrics
+from tasks.profiling import admin_token_valid, request_profiler, profile_section
+from tasks.recognizer_pool import get_recognizer_pool
+from tasks.registry import spec_for_task
+from tasks.speech_jobs import active_speech_jobs, get_speech_jobs
 
 # Import enhanced task manager
 try:
@@ -46,7 +57,7 @@ class ImprovedPoseDetector:
     def __init__(self):
         self.pose = mp_pose.Pose(
             static_image_mode=False,
-            model_complexity=1,  # Use lighter model for better performance
+            model_complexity=config.POSE_MODEL_COMPLEXITY,  # See pose_tiers for the options
             enable_segmentation=False,  # Disable segmentation for speed
             min_detection_confidence=0.6,  # Lowered for better detection
             min_tracking_confidence=0.5
@@ -60,11 +71,9 @@ class ImprovedPoseDetector:
             if frame is None or frame.size == 0:
                 return None
             
-            # Convert BGR to RGB
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Process the frame
-            results = self.pose.process(rgb)
+            # Process the frame (RGB copy in a reused buffer)
+            with profile_section('mediapipe'):
+                results = self.pose.process(to_rgb(frame))
             
             # Store for comparison
             if results.pose_landmarks:
@@ -79,26 +88,40 @@ class ImprovedPoseDetector:
 # Global pose detector instance
 pose_detector = ImprovedPoseDetector()
 
+def profiled(view):
+    """Run the view under the request profiler when asked to (header or sampling)"""
+    @wraps(view)
+    def decorated(*args, **kwargs):
+        if not request_profiler.should_profile(request.headers):
+            return view(*args, **kwargs)
+        
+        with request_profiler.profile(request.path) as trace:
+            response = make_response(view(*args, **kwargs))
+        response.headers['X-Profile-Trace'] = trace['trace_id']
+        return response
+    return decorated
+
+def admin_required(f):
+    """Require the configured admin token in the X-Admin-Token header"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not config.ADMIN_TOKEN:
+            return jsonify({'error': 'Admin endpoints are disabled (ADMIN_TOKEN not set)'}), 403
+        
+        if not admin_token_valid(request.headers):
+            return jsonify({'message': 'Admin token is invalid'}), 401
+        return f(*args, **kwargs)
+    return decorated
+
 def wrists_above_head(landmarks):
     """Check if both wrists are above the head with improved logic"""
     try:
-        if not landmarks:
-            return False
-        
-        # Get landmark positions
-        nose = landmarks.landmark[POSE_LMS.NOSE]
-        left_wrist = landmarks.landmark[POSE_LMS.LEFT_WRIST]
-        right_wrist = landmarks.landmark[POSE_LMS.RIGHT_WRIST]
-        
-        # Check visibility (confidence)
-        if (left_wrist.visibility < 0.5 or right_wrist.visibility < 0.5 or
-            nose.visibility < 0.5):
+        if landmarks is None:
             return False
         
-        # Both wrists should be above nose level
-        threshold = 0.05  # Small buffer for noise
-        return (left_wrist.y < (nose.y - threshold) and 
-                right_wrist.y < (nose.y - threshold))
+        # Both wrists should be above nose level (small buffer for noise)
+        arr = landmark_array.to_landmark_array(landmarks)
+        return bool(landmark_array.wrists_above_head_mask(arr, threshold=0.05))
                 
     except Exception as e:
         print(f"Wrist detection error: {e}")
@@ -107,29 +130,11 @@ def wrists_above_head(landmarks):
 def one_leg_balance(landmarks):
     """Check if one leg is raised (balance pose) with improved detection"""
     try:
-        if not landmarks:
+        if landmarks is None:
             return False
         
-        # Get key points
-        left_knee = landmarks.landmark[POSE_LMS.LEFT_KNEE]
-        right_knee = landmarks.landmark[POSE_LMS.RIGHT_KNEE]
-        left_hip = landmarks.landmark[POSE_LMS.LEFT_HIP]
-        right_hip = landmarks.landmark[POSE_LMS.RIGHT_HIP]
-        left_ankle = landmarks.landmark[POSE_LMS.LEFT_ANKLE]
-        right_ankle = landmarks.landmark[POSE_LMS.RIGHT_ANKLE]
-        
-        # Check visibility
-        landmarks_to_check = [left_knee, right_knee, left_hip, right_hip, left_ankle, right_ankle]
-        if any(lm.visibility < 0.5 for lm in landmarks_to_check):
-            return False
-        
-        # Calculate if one leg is significantly raised
-        left_leg_raised = (left_knee.y < (left_hip.y - 0.08) and 
-                          left_ankle.y < (left_hip.y - 0.1))
-        right_leg_raised = (right_knee.y < (right_hip.y - 0.08) and 
-                           right_ankle.y < (right_hip.y - 0.1))
-        
-        return left_leg_raised or right_leg_raised
+        arr = landmark_array.to_landmark_array(landmarks)
+        return bool(landmark_array.one_leg_raised_mask(arr))
         
     except Exception as e:
         print(f"Balance detection error: {e}")
@@ -138,49 +143,17 @@ def one_leg_balance(landmarks):
 def detect_jump(landmarks):
     """Simplified jump detection based on hip position"""
     try:
-        if not landmarks:
+        if landmarks is None:
             return False
-            
-        left_hip = landmarks.landmark[POSE_LMS.LEFT_HIP]
-        right_hip = landmarks.landmark[POSE_LMS.RIGHT_HIP]
         
-        if left_hip.visibility < 0.5 or right_hip.visibility < 0.5:
-            return False
-        
-        # Check if hips are high (indicating a jump)
-        avg_hip_y = (left_hip.y + right_hip.y) / 2
-        return avg_hip_y < 0.4  # Threshold for jump detection
+        # Hips high in the frame indicate a jump
+        arr = landmark_array.to_landmark_array(landmarks)
+        return bool(landmark_array.hips_high_mask(arr, threshold=0.4))
         
     except Exception as e:
         print(f"Jump detection error: {e}")
         return False
 
-def decode_base64_frame(frame_data):
-    """Safely decode base64 frame data"""
-    try:
-        # Handle data URL format
-        if ',' in frame_data:
-            header, data = frame_data.split(',', 1)
-        else:
-            data = frame_data
-        
-        # Decode base64
-        frame_bytes = base64.b64decode(data)
-        
-        # Convert to numpy array
-        nparr = np.frombuffer(frame_bytes, np.uint8)
-        
-        # Decode image
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        if frame is None:
-            raise ValueError("Failed to decode image")
-        
-        return frame
-        
-    except Exception as e:
-        raise ValueError(f"Frame decode error: {str(e)}")
-
 def convert_audio_to_wav(audio_data):
     """Convert audio data to proper WAV format for Vosk with improved error handling"""
     try:
@@ -253,7 +226,20 @@ def create_wav_header(pcm_data, sample_rate=16000, channels=1, bits_per_sample=1
     )
     return header
 
+def compact_physical_response(result, session_id, age_group, client_seq):
+    """Compact (delta-encoded when the session is known) response for streaming clients"""
+    with profile_section('response_encode'):
+        body = physical_response.compact_body(result)
+        stream = (session_id, age_group) if session_id else None
+        body = physical_response.get_response_deltas().encode(stream, body, client_seq)
+        use_msgpack = request.accept_mimetypes.quality(physical_response.MSGPACK_MIMETYPE) > \
+            request.accept_mimetypes.quality(physical_response.JSON_MIMETYPE)
+        payload, mimetype = physical_response.serialize(body, use_msgpack)
+    metrics.observe('physical.compact_response_bytes', len(payload))
+    return make_response(payload, 200, {'Content-Type': mimetype})
+
 @assessment_ai_bp.route('/api/ai/physical-assessment', methods=['POST'])
+@profiled
 def physical_assessment():
     """Enhanced physical assessment using individual task modules"""
     try:
@@ -264,6 +250,8 @@ def physical_assessment():
         task_type = data.get('task_type')
         frame_data = data.get('frame')
         age_group = data.get('age_group', '1-2')  # Default age group
+        session_id = data.get('session_id')  # Optional, keeps per-child progress apart
+        compact = bool(data.get('compact'))  # Short keys, only the fields that changed
         
         if not frame_data:
             return jsonify({'error': 'No frame data provided'}), 400
@@ -271,38 +259,49 @@ def physical_assessment():
         if not task_type:
             return jsonify({'error': 'No task type provided'}), 400
         
+        # The task being shown decides the scorer; age_group only covers unknown task types
+        spec = spec_for_task('physical', task_type)
+        if spec is not None:
+            age_group = spec.age_group
+        
+        # Decoded at most once, whichever path ends up using it
+        ingest = FrameIngest(frame_data)
+        
         # Try enhanced task system first
         if ENHANCED_TASKS_AVAILABLE:
             try:
                 task_manager = get_task_manager()
-                result = task_manager.process_physical_frame(age_group, frame_data)
+                result = task_manager.process_physical_frame(age_group, ingest, session_id)
+                
+                if result.get('throttled'):
+                    # Sent faster than recommended - ask the client to slow down
+                    response = jsonify({
+                        'success': False,
+                        'throttled': True,
+                        'message': result['message'],
+                        'retry_after_ms': result['retry_after_ms'],
+                        'next_frame_interval_ms': result['next_frame_interval_ms'],
+                        'age_group': age_group
+                    })
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(max(1, -(-result['retry_after_ms'] // 1000)))
+                    return response
                 
                 if not result.get('fallback', False):
                     # Enhanced processing successful
-                    return jsonify({
-                        'success': result.get('detected', False),
-                        'message': result.get('message', 'Processing...'),
-                        'feedback': result.get('feedback', ''),
-                        'confidence': result.get('confidence', 0.0),
-                        'enhanced': True,
-                        'task_name': result.get('task_name', task_type),
-                        'age_group': age_group,
-                        'success_count': result.get('success_count', 0),
-                        'detection_duration': result.get('detection_duration', 0),
-                        'balanced_leg': result.get('balanced_leg'),
-                        'jump_state': result.get('jump_state'),
-                        'additional_data': {
-                            k: v for k, v in result.items() 
-                            if k not in ['detected', 'message', 'feedback', 'confidence']
-                        }
-                    })
+                    if compact:
+                        return compact_physical_response(result, session_id, age_group, data.get('seq'))
+                    response = jsonify(physical_response.full_body(result, task_type, age_group))
+                    metrics.observe('physical.response_bytes', response.content_length)
+                    return response
             except Exception as e:
                 print(f"Enhanced physical assessment error: {e}")
                 # Fall back to basic assessment
         
         # Fallback to basic physical assessment
         try:
-            frame = decode_base64_frame(frame_data)
+            with profile_section('frame_decode'):
+                frame = ingest.frame
         except ValueError as e:
             return jsonify({'error': str(e)}), 400
         
@@ -314,8 +313,11 @@ def physical_assessment():
         confidence = 0.0
         
         if landmarks:
+            # Build the landmark array once and share it between the rules
+            landmarks = landmark_array.to_landmark_array(landmarks)
+            
             # Calculate average confidence
-            confidence = sum(lm.visibility for lm in landmarks.landmark) / len(landmarks.landmark)
+            confidence = float(landmark_array.mean_visibility(landmarks))
             
             if task_type == 'raise_hands':
                 success = wrists_above_head(landmarks)
@@ -347,7 +349,9 @@ def physical_assessment():
             'confidence': round(confidence, 2),
             'enhanced': False,
             'task_type': task_type,
-            'age_group': age_group
+            'age_group': age_group,
+            'next_frame_interval_ms': config.FRAME_INTERVAL_DEFAULT_MS,
+            'model_complexity': config.POSE_MODEL_COMPLEXITY
         })
         
     except Exception as e:
@@ -355,20 +359,62 @@ def physical_assessment():
         return jsonify({'error': f'Physical assessment error: {str(e)}'}), 500
 
 @assessment_ai_bp.route('/api/ai/speech-assessment', methods=['POST'])
+@profiled
 def speech_assessment():
     """Enhanced speech assessment using individual linguistic task modules"""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    if not data.get('audio'):
+        return jsonify({'error': 'No audio data provided'}), 400
+    
+    # Job mode: queue the work and answer with a job id straight away
+    if data.get('async', config.SPEECH_JOBS_DEFAULT):
+        jobs = get_speech_jobs(assess_speech)
+        try:
+            job = jobs.submit(data)
+        except queue.Full:
+            retry_after = jobs.retry_after()
+            response = jsonify({
+                'error': 'Speech queue is full, please retry shortly',
+                'success': False,
+                'retry_after': retry_after
+            })
+            response.headers['Retry-After'] = str(retry_after)
+            return response, 503
+        response = jsonify(dict(job.describe(), status_url=f'/api/ai/speech-assessment/jobs/{job.id}'))
+        response.headers['Location'] = f'/api/ai/speech-assessment/jobs/{job.id}'
+        return response, 202
+    
+    body, status = assess_speech(data)
+    return jsonify(body), status
+
+@assessment_ai_bp.route('/api/ai/speech-assessment/jobs/<job_id>', methods=['GET'])
+def speech_job(job_id):
+    """Poll a queued speech assessment; ?wait=<seconds> holds the request until it finishes"""
+    jobs = active_speech_jobs()
+    try:
+        wait = max(0.0, float(request.args.get('wait', 0)))
+    except ValueError:
+        return jsonify({'error': 'wait must be a number of seconds'}), 400
+    
+    job = jobs.get(job_id, wait) if jobs else None
+    if job is None:
+        return jsonify({'error': f'Unknown or expired speech job {job_id}'}), 404
+    return jsonify(job.describe()), 200 if job.finished is not None else 202
+
+def assess_speech(data):
+    """Speech assessment for a request body: (response body, status code)"""
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-            
         audio_data = data.get('audio')
         target_words = data.get('target_words', [])
         task_type = data.get('task_type')
         age_group = data.get('age_group', '1-2')  # Default age group
         
-        if not audio_data:
-            return jsonify({'error': 'No audio data provided'}), 400
+        # The task being shown decides the scorer; age_group only covers unknown task types
+        spec = spec_for_task('linguistic', task_type)
+        if spec is not None:
+            age_group = spec.age_group
         
         # Try enhanced task system first
         if ENHANCED_TASKS_AVAILABLE:
@@ -378,7 +424,7 @@ def speech_assessment():
                 
                 if not result.get('fallback', False):
                     # Enhanced processing successful
-                    return jsonify({
+                    return {
                         'success': result.get('success', False),
                         'transcript': result.get('transcript', ''),
                         'message': result.get('message', 'Processing...'),
@@ -392,179 +438,153 @@ def speech_assessment():
                         'success_count': result.get('success_count', 0),
                         'total_attempts': result.get('total_attempts', 0),
                         'analysis': result.get('analysis'),
+                        'voice_activity': result.get('voice_activity'),
                         'available': result.get('available', True)
-                    })
+                    }, 200
             except Exception as e:
                 print(f"Enhanced speech assessment error: {e}")
                 # Fall back to basic assessment
         
         # Fallback to basic speech assessment
         if not VOSK_AVAILABLE:
-            return jsonify({'error': 'Speech recognition not available - Vosk not installed'}), 500
+            return {'error': 'Speech recognition not available - Vosk not installed'}, 500
         
         # Convert audio to proper format
         try:
             wav_bytes = convert_audio_to_wav(audio_data)
         except ValueError as e:
-            return jsonify({
+            return {
                 'error': f'Audio format error: {str(e)}',
                 'suggestion': 'Please ensure audio is in a supported format (WAV, MP3, etc.)',
                 'success': False
-            }), 400
+            }, 400
         except Exception as e:
-            return jsonify({
+            return {
                 'error': f'Audio conversion failed: {str(e)}',
                 'suggestion': 'Audio processing issue - may be related to FFmpeg installation',
                 'success': False
-            }), 500
-        
-        # Save to temporary WAV file
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio:
-            temp_audio.write(wav_bytes)
-            temp_audio_path = temp_audio.name
+            }, 500
+        
+        # Load Vosk model - using nested directory structure
+        model_path = r'D:\born_genious\Final_App\new_backend\vosk-model-small-en-us-0.15\vosk-model-small-en-us-0.15'
+        
+        if not os.path.exists(model_path):
+            # Try alternative paths
+            alt_paths = [
+                r'D:\born_genious\Final_App\new_backend\vosk-model-small-en-us-0.15',
+                os.path.join(os.path.dirname(__file__), 'vosk-model-small-en-us-0.15', 'vosk-model-small-en-us-0.15'),
+                os.path.join(os.path.dirname(__file__), 'vosk-model-small-en-us-0.15')
+            ]
+            
+            for alt_path in alt_paths:
+                if os.path.exists(alt_path):
+                    model_path = alt_path
+                    break
+            else:
+                return {
+                    'error': 'Vosk model not found. Please ensure model is at the correct path.',
+                    'expected_path': model_path,
+                    'download_needed': True
+                }, 500
         
+        # Open and validate audio
         try:
-            # Load Vosk model - using nested directory structure
-            model_path = r'D:\born_genious\Final_App\new_backend\vosk-model-small-en-us-0.15\vosk-model-small-en-us-0.15'
-            
-            if not os.path.exists(model_path):
-                # Try alternative paths
-                alt_paths = [
-                    r'D:\born_genious\Final_App\new_backend\vosk-model-small-en-us-0.15',
-                    os.path.join(os.path.dirname(__file__), 'vosk-model-small-en-us-0.15', 'vosk-model-small-en-us-0.15'),
-                    os.path.join(os.path.dirname(__file__), 'vosk-model-small-en-us-0.15')
-                ]
+            with wave.open(io.BytesIO(wav_bytes), 'rb') as wf:
+                channels = wf.getnchannels()
+                sample_width = wf.getsampwidth()
+                frame_rate = wf.getframerate()
                 
-                for alt_path in alt_paths:
-                    if os.path.exists(alt_path):
-                        model_path = alt_path
-                        break
-                else:
-                    return jsonify({
-                        'error': 'Vosk model not found. Please ensure model is at the correct path.',
-                        'expected_path': model_path,
-                        'download_needed': True
-                    }), 500
-            
-            # Initialize model and recognizer
-            model = vosk.Model(model_path)
-            
-            # Open and validate audio file
-            try:
-                with wave.open(temp_audio_path, 'rb') as wf:
-                    channels = wf.getnchannels()
-                    sample_width = wf.getsampwidth()
-                    frame_rate = wf.getframerate()
-                    
-                    print(f"Audio info: channels={channels}, width={sample_width}, rate={frame_rate}")
-                    
-                    if channels != 1:
-                        return jsonify({
-                            'error': f'Audio must be mono (1 channel), got {channels}',
-                            'success': False,
-                            'audio_info': {'channels': channels, 'width': sample_width, 'rate': frame_rate}
-                        }), 400
-                    if sample_width != 2:
-                        return jsonify({
-                            'error': f'Audio must be 16-bit (2 bytes), got {sample_width}',
-                            'success': False,
-                            'audio_info': {'channels': channels, 'width': sample_width, 'rate': frame_rate}
-                        }), 400
-                    
-                    # Create recognizer with correct sample rate
-                    rec = vosk.KaldiRecognizer(model, frame_rate)
-                    
-                    # Process audio in chunks
-                    transcript_parts = []
-                    
-                    while True:
-                        data = wf.readframes(4000)
-                        if len(data) == 0:
-                            break
-                        
-                        if rec.AcceptWaveform(data):
-                            result = json.loads(rec.Result())
-                            text = result.get('text', '').strip()
-                            if text:
-                                transcript_parts.append(text)
-                    
-                    # Get final result
-                    final_result = json.loads(rec.FinalResult())
-                    final_text = final_result.get('text', '').strip()
-                    if final_text:
-                        transcript_parts.append(final_text)
-                    
-                    # Combine all transcript parts
-                    transcript = ' '.join(transcript_parts).strip().lower()
-                    
-            except wave.Error as wave_error:
-                return jsonify({
-                    'error': f'Invalid WAV file: {str(wave_error)}',
-                    'success': False,
-                    'suggestion': 'Audio file may be corrupt or in wrong format'
-                }), 400
-            except Exception as processing_error:
-                return jsonify({
-                    'error': f'Audio processing failed: {str(processing_error)}',
-                    'success': False,
-                    'suggestion': 'Speech recognition processing error'
-                }), 500
-            
-            # Check if transcript contains target words
-            success = False
-            matched_words = []
-            
-            if transcript:
-                for word in target_words:
-                    if word.lower() in transcript:
-                        success = True
-                        matched_words.append(word)
-            
-            # Generate appropriate message
-            if success:
-                message = f"Great job! I heard: '{transcript}'"
-            elif transcript:
-                message = f"I heard: '{transcript}'. Try saying: {', '.join(target_words)}"
-            else:
-                message = f"I couldn't hear anything clearly. Try saying: {', '.join(target_words)}"
-            
-            return jsonify({
-                'success': success,
-                'transcript': transcript,
-                'message': message,
-                'feedback': message,  # Use message as feedback for basic mode
-                'target_words': target_words,
-                'matched_words': matched_words,
-                'task_type': task_type,
-                'enhanced': False,
-                'age_group': age_group
-            })
-            
-        finally:
-            # Clean up temporary file
-            try:
-                if 'temp_audio_path' in locals() and os.path.exists(temp_audio_path):
-                    os.unlink(temp_audio_path)
-            except Exception as cleanup_error:
-                print(f"Cleanup error: {cleanup_error}")
+                print(f"Audio info: channels={channels}, width={sample_width}, rate={frame_rate}")
+                
+                if channels != 1:
+                    return {
+                        'error': f'Audio must be mono (1 channel), got {channels}',
+                        'success': False,
+                        'audio_info': {'channels': channels, 'width': sample_width, 'rate': frame_rate}
+                    }, 400
+                if sample_width != 2:
+                    return {
+                        'error': f'Audio must be 16-bit (2 bytes), got {sample_width}',
+                        'success': False,
+                        'audio_info': {'channels': channels, 'width': sample_width, 'rate': frame_rate}
+                    }, 400
+                
+                pcm = wf.readframes(wf.getnframes())
+                
+        except wave.Error as wave_error:
+            return {
+                'error': f'Invalid WAV file: {str(wave_error)}',
+                'success': False,
+                'suggestion': 'Audio file may be corrupt or in wrong format'
+            }, 400
+        
+        # Short target-word tasks decode against their words (plus [unk]); free-form
+        # and unknown tasks keep the full vocabulary so the transcript survives
+        grammar = speech.task_grammar(target_words, free_form=spec is None or spec.free_form)
+        
+        # Silent clips skip Vosk, and retried or resubmitted ones come from the
+        # transcript cache without loading the model
+        try:
+            entry = speech.transcribe(None, pcm, frame_rate, model_path, grammar)
+        except Exception as processing_error:
+            return {
+                'error': f'Audio processing failed: {str(processing_error)}',
+                'success': False,
+                'suggestion': 'Speech recognition processing error'
+            }, 500
+        
+        transcript = entry['text'].lower()
+        
+        # Check if transcript contains target words
+        success = False
+        matched_words = []
+        
+        if transcript:
+            for word in target_words:
+                if word.lower() in transcript:
+                    success = True
+                    matched_words.append(word)
+        
+        # Generate appropriate message
+        if success:
+            message = f"Great job! I heard: '{transcript}'"
+        elif transcript:
+            message = f"I heard: '{transcript}'. Try saying: {', '.join(target_words)}"
+        else:
+            message = f"I couldn't hear anything clearly. Try saying: {', '.join(target_words)}"
+        
+        return {
+            'success': success,
+            'transcript': transcript,
+            'message': message,
+            'feedback': message,  # Use message as feedback for basic mode
+            'target_words': target_words,
+            'matched_words': matched_words,
+            'task_type': task_type,
+            'enhanced': False,
+            'age_group': age_group,
+            'voice_activity': entry.get('voice_activity')
+        }, 200
         
     except Exception as e:
         print(f"Speech assessment error: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({
+        return {
             'error': f'Speech assessment error: {str(e)}',
             'success': False,
             'message': 'Sorry, speech recognition failed. Please try again.',
             'suggestion': 'Check audio input and ensure microphone is working'
-        }), 500
+        }, 500
+
+_enhanced_tasks_body = VersionedBody()
 
 @assessment_ai_bp.route('/api/ai/enhanced-tasks', methods=['GET'])
 def get_enhanced_tasks():
     """Get information about available enhanced tasks"""
     try:
         if not ENHANCED_TASKS_AVAILABLE:
-            return jsonify({
+            return _enhanced_tasks_body.get(None, lambda: {
                 'available': False,
                 'message': 'Enhanced task system not available',
                 'tasks': {
@@ -573,16 +593,15 @@ def get_enhanced_tasks():
                     'total_physical': 0,
                     'total_linguistic': 0
                 }
-            })
+            }).serve(max_age=0)
         
+        # Re-encoded only when a task has been built or a resource has appeared since
         task_manager = get_task_manager()
-        tasks_summary = task_manager.get_all_available_tasks()
-        
-        return jsonify({
+        return _enhanced_tasks_body.get(task_manager.tasks_version(), lambda: {
             'available': True,
             'message': 'Enhanced task system loaded successfully',
-            'tasks': tasks_summary
-        })
+            'tasks': task_manager.get_all_available_tasks()
+        }).serve(max_age=0)
         
     except Exception as e:
         return jsonify({
@@ -599,7 +618,7 @@ def get_task_progress(age_group, task_type):
             return jsonify({'error': 'Enhanced task system not available'}), 400
         
         task_manager = get_task_manager()
-        progress = task_manager.get_task_progress(age_group, task_type)
+        progress = task_manager.get_task_progress(age_group, task_type, request.args.get('session_id'))
         
         if progress:
             return jsonify(progress)
@@ -617,7 +636,7 @@ def reset_task(age_group, task_type):
             return jsonify({'error': 'Enhanced task system not available'}), 400
         
         task_manager = get_task_manager()
-        success = task_manager.reset_task(age_group, task_type)
+        success = task_manager.reset_task(age_group, task_type, request.args.get('session_id'))
         
         if success:
             return jsonify({'message': f'Task {task_type} for age group {age_group} reset successfully'})
@@ -627,6 +646,47 @@ def reset_task(age_group, task_type):
     except Exception as e:
         return jsonify({'error': f'Task reset error: {str(e)}'}), 500
 
+@assessment_ai_bp.route('/api/ai/metrics', methods=['GET'])
+@admin_required
+def get_metrics():
+    """Pipeline counters, gauges and latency percentiles"""
+    snapshot = metrics.snapshot()
+    if ENHANCED_TASKS_AVAILABLE:
+        scheduler = get_task_manager().pose_scheduler
+        snapshot['pose_batching'] = {
+            'enabled': scheduler is not None,
+            'window_ms': scheduler.window * 1000 if scheduler else None,
+            'max_batch': scheduler.max_batch if scheduler else None,
+            'workers': scheduler.workers if scheduler else None,
+            'tier_ceiling': scheduler.tiers.ceiling if scheduler else None
+        }
+    jobs = active_speech_jobs()
+    snapshot['speech_jobs'] = jobs.stats() if jobs else None
+    return jsonify(snapshot)
+
+@assessment_ai_bp.route('/api/ai/admin/profiles', methods=['GET'])
+@admin_required
+def list_profiles():
+    """List stored request profiles, newest first"""
+    traces = request_profiler.list_traces()
+    return jsonify({
+        'traces': traces,
+        'count': len(traces),
+        'max_traces': request_profiler.max_traces,
+        'sample_rate': request_profiler.sample_rate
+    })
+
+@assessment_ai_bp.route('/api/ai/admin/profiles/<trace_id>', methods=['GET'])
+@admin_required
+def download_profile(trace_id):
+    """Download a stored cProfile trace (load with pstats or snakeviz)"""
+    path = request_profiler.trace_path(trace_id)
+    if not path:
+        return jsonify({'error': f'Profile trace {trace_id} not found'}), 404
+    
+    return send_file(path, mimetype='application/octet-stream',
+                     as_attachment=True, download_name=f'{trace_id}.prof')
+
 @assessment_ai_bp.route('/api/ai/test-camera', methods=['GET'])
 def test_camera():
     """Test endpoint to verify camera and MediaPipe functionality"""
@@ -689,9 +749,10 @@ def test_microphone():
     vosk_model_ok = False
     if VOSK_AVAILABLE and model_exists:
         try:
-            model = vosk.Model(model_path)
-            rec = vosk.KaldiRecognizer(model, 16000)
-            vosk_model_ok = True
+            # Warms the model and the recognizer pool the speech requests use
+            model = speech.load_model(model_path)
+            with get_recognizer_pool().recognizer(model, 16000):
+                vosk_model_ok = True
         except Exception as e:
             print(f"Vosk model test failed: {e}")
     
@@ -6,6 +6,9 @@ import jwt
 from datetime import datetime, timedelta
 from functools import wraps
 from timezone_utils import convert_utc_to_ist
+from config import DATABASE_PATH, JSON_STREAM_MIN_ITEMS
+from json_encoding import install as install_json_encoding, stream_json
+from catalog_cache import cache_bodies
 
 # Import AI assessment routes
 try:
@@ -16,12 +19,13 @@ except ImportError as e:
     AI_ROUTES_AVAILABLE = False
 
 app = Flask(__name__)
+install_json_encoding(app)
 CORS(app)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 
 # Database setup
 def init_db():
-    conn = sqlite3.connect('assessment.db')
+    conn = sqlite3.connect(DATABASE_PATH)
     cursor = conn.cursor()
     
     # Create users table
@@ -66,6 +70,8 @@ def init_db():
         )
     ''')
     
+    create_detail_tables(cursor)
+    
     # Check if we need to migrate existing assessment_results table
     try:
         cursor.execute("PRAGMA table_info(assessment_results)")
@@ -125,6 +131,46 @@ def init_db():
     conn.commit()
     conn.close()
 
+def create_detail_tables(cursor):
+    """Create the per-question and per-AI-task detail tables if they don't exist"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS question_responses (
+            response_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            result_id INTEGER NOT NULL,
+            child_id INTEGER,
+            assessment_type TEXT NOT NULL,
+            question_id TEXT NOT NULL,
+            question_text TEXT NOT NULL,
+            child_answer TEXT,
+            correct_answer TEXT,
+            is_correct TEXT DEFAULT 'false',
+            response_time_seconds INTEGER,
+            difficulty_level INTEGER DEFAULT 1,
+            attempts INTEGER DEFAULT 1,
+            hints_used INTEGER DEFAULT 0,
+            ai_confidence_score REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ai_task_responses (
+            ai_response_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            result_id INTEGER NOT NULL,
+            child_id INTEGER,
+            task_type TEXT NOT NULL,
+            task_name TEXT NOT NULL,
+            success_count INTEGER DEFAULT 0,
+            total_attempts INTEGER DEFAULT 0,
+            completion_time_seconds INTEGER,
+            success_rate REAL,
+            ai_feedback TEXT,
+            was_completed TEXT DEFAULT 'false',
+            was_skipped TEXT DEFAULT 'false',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
 # Authentication decorator
 def token_required(f):
     @wraps(f)
@@ -643,7 +689,7 @@ def register():
         return jsonify({'message': 'Invalid birth date format. Use YYYY-MM-DD'}), 400
     
     try:
-        conn = sqlite3.connect('assessment.db')
+        conn = sqlite3.connect(DATABASE_PATH)
         cursor = conn.cursor()
         
         # Insert parent
@@ -699,7 +745,7 @@ def login():
     
     hashed_password = hashlib.sha256(password.encode()).hexdigest()
     
-    conn = sqlite3.connect('assessment.db')
+    conn = sqlite3.connect(DATABASE_PATH)
     cursor = conn.cursor()
     
     # Get user information
@@ -745,12 +791,8 @@ def login():
         conn.close()
         return jsonify({'message': 'Invalid credentials'}), 401
 
-@app.route('/api/questions/<age_group>', methods=['GET'])
-def get_questions(age_group):
-    """Get intelligence questions for specific age group"""
-    if age_group not in INTELLIGENCE_QUESTIONS:
-        return jsonify({'error': f'Age group {age_group} not found'}), 404
-    
+def format_questions(age_group):
+    """Question catalogue response for an age group"""
     questions = INTELLIGENCE_QUESTIONS[age_group]
     formatted_questions = []
     
@@ -766,32 +808,45 @@ def get_questions(age_group):
         }
         formatted_questions.append(formatted_question)
     
-    return jsonify({
+    return {
         'age_group': age_group,
         'questions': formatted_questions
-    })
+    }
+
+# The catalogues are static: encode each response once, with its ETag
+QUESTION_BODIES = cache_bodies(INTELLIGENCE_QUESTIONS, format_questions)
+PHYSICAL_TASK_BODIES = cache_bodies(PHYSICAL_TASKS, lambda age_group: {
+    'age_group': age_group,
+    'task': PHYSICAL_TASKS[age_group]
+})
+LINGUISTIC_TASK_BODIES = cache_bodies(LINGUISTIC_TASKS, lambda age_group: {
+    'age_group': age_group,
+    'task': LINGUISTIC_TASKS[age_group]
+})
+
+@app.route('/api/questions/<age_group>', methods=['GET'])
+def get_questions(age_group):
+    """Get intelligence questions for specific age group"""
+    if age_group not in QUESTION_BODIES:
+        return jsonify({'error': f'Age group {age_group} not found'}), 404
+    
+    return QUESTION_BODIES[age_group].serve()
 
 @app.route('/api/physical/<age_group>', methods=['GET'])
 def get_physical_task(age_group):
     """Get physical task for specific age group"""
-    if age_group not in PHYSICAL_TASKS:
+    if age_group not in PHYSICAL_TASK_BODIES:
         return jsonify({'error': f'Physical task for age group {age_group} not found'}), 404
     
-    return jsonify({
-        'age_group': age_group,
-        'task': PHYSICAL_TASKS[age_group]
-    })
+    return PHYSICAL_TASK_BODIES[age_group].serve()
 
 @app.route('/api/linguistic/<age_group>', methods=['GET'])
 def get_linguistic_task(age_group):
     """Get linguistic task for specific age group"""
-    if age_group not in LINGUISTIC_TASKS:
+    if age_group not in LINGUISTIC_TASK_BODIES:
         return jsonify({'error': f'Linguistic task for age group {age_group} not found'}), 404
     
-    return jsonify({
-        'age_group': age_group,
-        'task': LINGUISTIC_TASKS[age_group]
-    })
+    return LINGUISTIC_TASK_BODIES[age_group].serve()
 
 @app.route('/api/submit-assessment', methods=['POST'])
 def submit_assessment():
@@ -815,7 +870,7 @@ def submit_assessment():
     # Try to get child_id from token or find the user's latest child
     if not child_id:
         # Find the latest child for this user
-        conn = sqlite3.connect('assessment.db')
+        conn = sqlite3.connect(DATABASE_PATH)
         cursor = conn.cursor()
         cursor.execute('SELECT id FROM children WHERE user_id = ? ORDER BY created_at DESC LIMIT 1', (user_id,))
         child_result = cursor.fetchone()
@@ -861,47 +916,11 @@ def submit_assessment():
     print(f"  Linguistic score: {linguistic_score}")
     print(f"  Total score: {total_score}")
     
-    conn = sqlite3.connect('assessment.db')
+    conn = sqlite3.connect(DATABASE_PATH)
     cursor = conn.cursor()
     
     # Create tables if they don't exist
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS question_responses (
-            response_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            result_id INTEGER NOT NULL,
-            child_id INTEGER,
-            assessment_type TEXT NOT NULL,
-            question_id TEXT NOT NULL,
-            question_text TEXT NOT NULL,
-            child_answer TEXT,
-            correct_answer TEXT,
-            is_correct TEXT DEFAULT 'false',
-            response_time_seconds INTEGER,
-            difficulty_level INTEGER DEFAULT 1,
-            attempts INTEGER DEFAULT 1,
-            hints_used INTEGER DEFAULT 0,
-            ai_confidence_score REAL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ai_task_responses (
-            ai_response_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            result_id INTEGER NOT NULL,
-            child_id INTEGER,
-            task_type TEXT NOT NULL,
-            task_name TEXT NOT NULL,
-            success_count INTEGER DEFAULT 0,
-            total_attempts INTEGER DEFAULT 0,
-            completion_time_seconds INTEGER,
-            success_rate REAL,
-            ai_feedback TEXT,
-            was_completed TEXT DEFAULT 'false',
-            was_skipped TEXT DEFAULT 'false',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    create_detail_tables(cursor)
     
     # Insert assessment result with proper handling of child_id
     if child_id:
@@ -1042,7 +1061,7 @@ def submit_assessment():
 
 @app.route('/api/leaderboard', methods=['GET'])
 def get_leaderboard():
-    conn = sqlite3.connect('assessment.db')
+    conn = sqlite3.connect(DATABASE_PATH)
     cursor = conn.cursor()
     
     # Get highest score per child to avoid duplicates
@@ -1091,7 +1110,7 @@ def get_leaderboard():
 @app.route('/api/progress/<int:child_id>', methods=['GET'])
 def get_child_progress(child_id):
     """Get assessment progress for a specific child"""
-    conn = sqlite3.connect('assessment.db')
+    conn = sqlite3.connect(DATABASE_PATH)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -1143,7 +1162,7 @@ def get_child_progress(child_id):
 @app.route('/api/age-group-stats/<age_group>', methods=['GET'])
 def get_age_group_stats(age_group):
     """Get statistics for a specific age group"""
-    conn = sqlite3.connect('assessment.db')
+    conn = sqlite3.connect(DATABASE_PATH)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -1194,7 +1213,7 @@ def get_age_group_stats(age_group):
 @token_required
 def get_child_detailed_responses(child_id):
     """Get all detailed responses for a specific child, grouped by attempts"""
-    conn = sqlite3.connect('assessment.db')
+    conn = sqlite3.connect(DATABASE_PATH)
     cursor = conn.cursor()
     
     # Get all assessment results for this child (each result = one attempt)
@@ -1334,7 +1353,7 @@ def get_child_detailed_responses(child_id):
     # Latest attempt summary
     latest = attempts[0] if attempts else None
     
-    return jsonify({
+    body = {
         'child_id': child_id,
         'attempts': attempts,
         'summary': {
@@ -1349,12 +1368,17 @@ def get_child_detailed_responses(child_id):
                 'linguistic_score': latest['scores']['linguistic']  # 0 or 1
             } if latest else None
         }
-    })
+    }
+    
+    # Long histories go out attempt by attempt instead of as one encoded body
+    if len(attempts) >= JSON_STREAM_MIN_ITEMS:
+        return stream_json(body, 'attempts')
+    return jsonify(body)
 
 @app.route('/api/question-analysis/<question_id>', methods=['GET'])
 def get_question_analysis(question_id):
     """Get analysis for a specific question across all children"""
-    conn = sqlite3.connect('assessment.db')
+    conn = sqlite3.connect(DATABASE_PATH)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -1420,7 +1444,7 @@ def get_question_analysis(question_id):
 @token_required
 def get_assessment_insights(result_id):
     """Get detailed insights for a specific assessment"""
-    conn = sqlite3.connect('assessment.db')
+    conn = sqlite3.connect(DATABASE_PATH)
     cursor = conn.cursor()
     
     # Get assessment basic info
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for API response encoding
+Fetches the largest real payloads from the assessment database through the
+app (child responses for the child with most attempts, insights for the
+largest assessment, the leaderboard and the question catalogues) and times
+each encoder on them: Flask's default provider, json_encoding on the
+standard library, json_encoding on orjson (when installed) and the
+streamed encoding for list responses. Reports JSON like
+benchmark_pipelines.py.
+
+Usage:
+    python benchmark_json.py
+    python benchmark_json.py --repeat 500 --scale 20 --output json_bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmark_pipelines import summarize_latencies
+
+
+def fetch_payloads(app, database_path, scale):
+    """Decoded bodies of the largest responses, by name"""
+    import jwt
+
+    token = jwt.encode({'user_id': 0, 'exp': datetime.utcnow() + timedelta(hours=1)},
+                       app.config['SECRET_KEY'], algorithm='HS256')
+    headers = {'Authorization': f'Bearer {token}'}
+    conn = sqlite3.connect(database_path)
+    child = conn.execute('''
+        SELECT child_id FROM assessment_results WHERE child_id IS NOT NULL
+        GROUP BY child_id ORDER BY COUNT(*) DESC LIMIT 1
+    ''').fetchone()
+    result = conn.execute('''
+        SELECT result_id FROM question_responses GROUP BY result_id ORDER BY COUNT(*) DESC LIMIT 1
+    ''').fetchone()
+    conn.close()
+
+    urls = {'leaderboard': '/api/leaderboard'}
+    if child:
+        urls['child_responses'] = f'/api/child-responses/{child[0]}'
+    if result:
+        urls['assessment_insights'] = f'/api/assessment-insights/{result[0]}'
+    for age_group in ('0-1', '5-6'):
+        urls[f'questions_{age_group}'] = f'/api/questions/{age_group}'
+
+    payloads = {}
+    client = app.test_client()
+    for name, url in urls.items():
+        with contextlib.redirect_stdout(io.StringIO()):  # The routes print debug output
+            response = client.get(url, headers=headers)
+        if response.status_code == 200:
+            payloads[name] = response.get_json()
+
+    # A long history, as a child with many attempts would have
+    if scale > 1 and 'child_responses' in payloads:
+        large = dict(payloads['child_responses'])
+        large['attempts'] = large['attempts'] * scale
+        payloads[f'child_responses_x{scale}'] = large
+    return payloads
+
+
+def time_encoder(encode, payload, repeat):
+    latencies = []
+    size = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        size = len(encode(payload))
+        latencies.append((time.perf_counter() - t0) * 1000)
+    report = summarize_latencies(latencies)
+    report['bytes'] = size
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API response encoders on real payloads')
+    parser.add_argument('--repeat', type=int, default=200, help='Encodes per payload and encoder')
+    parser.add_argument('--scale', type=int, default=10,
+                        help='Also time child responses with the attempts repeated N times')
+    parser.add_argument('--output', help='Write the JSON report here (default: stdout)')
+    args = parser.parse_args()
+
+    import config
+    import json_encoding
+    from app import app
+    from flask.json.provider import DefaultJSONProvider
+
+    flask_default = DefaultJSONProvider(app)
+    encoders = {
+        'flask_default': lambda obj: flask_default.dumps(obj, separators=(',', ':')).encode()
+    }
+
+    def with_backend(name):
+        def encode(obj):
+            config.JSON_ENCODER = name
+            return json_encoding.dumps_bytes(obj)
+        return encode
+
+    encoders['stdlib'] = with_backend('stdlib')
+    if json_encoding.orjson is not None:
+        encoders['orjson'] = with_backend('orjson')
+
+    def streamed(obj):
+        response = json_encoding.stream_json(obj, 'attempts')
+        return b''.join(response.response)
+
+    payloads = fetch_payloads(app, config.DATABASE_PATH, args.scale)
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'orjson': json_encoding.orjson is not None
+        },
+        'payloads': {}
+    }
+
+    backend = config.JSON_ENCODER
+    for name, payload in payloads.items():
+        print(f"⏱️  {name}", file=sys.stderr)
+        results = {encoder: time_encoder(encode, payload, args.repeat) for encoder, encode in encoders.items()}
+        if isinstance(payload, dict) and 'attempts' in payload:
+            config.JSON_ENCODER = backend
+            results['streamed'] = time_encoder(streamed, payload, args.repeat)
+        baseline = results['flask_default']['mean_ms']
+        for encoder in results.values():
+            encoder['speedup'] = round(baseline / encoder['mean_ms'], 2) if encoder['mean_ms'] else None
+        report['payloads'][name] = results
+    config.JSON_ENCODER = backend
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the frame and audio pipelines
+Replays recorded JPEG frame sequences and WAV/webm clips through
+EnhancedTaskManager in process (no server needed) and reports throughput,
+latency percentiles and peak RSS as JSON
+
+Usage:
+    python benchmark_pipelines.py --frames bench_data/frames --audio bench_data/audio
+    python benchmark_pipelines.py --synthetic-frames 200 --output bench.json
+    python benchmark_pipelines.py --frames bench_data/frames --compare bench.json
+    python benchmark_pipelines.py --synthetic-frames 100 --sessions 8 --batch-window-ms 10
+    python benchmark_pipelines.py --audio bench_data/audio --grammar-compare
+    python benchmark_pipelines.py --synthetic-frames 200 --response-compare
+
+Frame sequences are directories of .jpg/.jpeg files replayed in name order
+(a flat directory of JPEGs is treated as one sequence). Audio clips are
+.wav/.webm/.ogg/.mp3 files.
+"""
+
+import argparse
+import base64
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+FRAME_EXTENSIONS = ('.jpg', '.jpeg')
+AUDIO_EXTENSIONS = ('.wav', '.webm', '.ogg', '.mp3')
+
+# Metrics where a larger value is better (everything else is a latency)
+HIGHER_IS_BETTER = ('frames_per_second', 'clips_per_second')
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def summarize_latencies(latencies_ms):
+    ordered = sorted(latencies_ms)
+    return {
+        'count': len(ordered),
+        'mean_ms': round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 50), 3),
+        'p95_ms': round(percentile(ordered, 95), 3),
+        'p99_ms': round(percentile(ordered, 99), 3),
+        'max_ms': round(ordered[-1], 3) if ordered else 0.0
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    if sys.platform == 'darwin':
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+def to_data_url(raw_bytes, mime):
+    return f"data:{mime};base64,{base64.b64encode(raw_bytes).decode('ascii')}"
+
+
+def load_frame_sequences(frames_dir):
+    """
+    Return {sequence_name: [data_url, ...]} for every sequence under frames_dir
+    """
+    sequences = {}
+    flat = sorted(f for f in os.listdir(frames_dir) if f.lower().endswith(FRAME_EXTENSIONS))
+    if flat:
+        sequences[os.path.basename(os.path.normpath(frames_dir))] = [
+            to_data_url(open(os.path.join(frames_dir, f), 'rb').read(), 'image/jpeg') for f in flat
+        ]
+
+    for name in sorted(os.listdir(frames_dir)):
+        seq_dir = os.path.join(frames_dir, name)
+        if not os.path.isdir(seq_dir):
+            continue
+        files = sorted(f for f in os.listdir(seq_dir) if f.lower().endswith(FRAME_EXTENSIONS))
+        if files:
+            sequences[name] = [
+                to_data_url(open(os.path.join(seq_dir, f), 'rb').read(), 'image/jpeg') for f in files
+            ]
+    return sequences
+
+
+def synthetic_frame_sequence(count, width=640, height=480, seed=1234):
+    """
+    Deterministic noise frames, for smoke runs when no recorded corpus is available
+    """
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        frame = np.roll(base, i * 4, axis=1)
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        if ok:
+            frames.append(to_data_url(encoded.tobytes(), 'image/jpeg'))
+    return {'synthetic': frames}
+
+
+def load_audio_clips(audio_dir):
+    """
+    Return [(clip_name, base64_audio), ...] for every clip under audio_dir
+    """
+    clips = []
+    for root, _, files in os.walk(audio_dir):
+        for f in sorted(files):
+            if f.lower().endswith(AUDIO_EXTENSIONS):
+                path = os.path.join(root, f)
+                with open(path, 'rb') as audio_file:
+                    clips.append((os.path.relpath(path, audio_dir),
+                                  base64.b64encode(audio_file.read()).decode('ascii')))
+    return sorted(clips)
+
+
+def bench_physical(manager, age_group, sequences, warmup, repeat, sessions=1, responses=False):
+    """
+    Replay the frame sequences, optionally as several concurrent sessions so
+    the pose batching scheduler has frames to group; responses=True also
+    compares full and compact response encoding over the results
+    """
+    from tasks.metrics import metrics
+
+    latencies = []
+    counts = {'errors': 0, 'detections': 0}
+    results = {}  # session -> results in order
+    lock = threading.Lock()
+
+    # Warm up the pose graph so model load time does not skew the numbers
+    first_sequence = next(iter(sequences.values()), [])
+    for frame_data in first_sequence[:warmup]:
+        manager.process_physical_frame(age_group, frame_data)
+    metrics.reset()
+
+    def replay(session_id):
+        for _ in range(repeat):
+            for frames in sequences.values():
+                manager.reset_task(age_group, 'physical', session_id)
+                for frame_data in frames:
+                    t0 = time.perf_counter()
+                    result = manager.process_physical_frame(age_group, frame_data, session_id)
+                    elapsed_ms = (time.perf_counter() - t0) * 1000
+                    with lock:
+                        latencies.append(elapsed_ms)
+                        if responses:
+                            results.setdefault(session_id, []).append(result)
+                        if 'error' in result:
+                            counts['errors'] += 1
+                        elif result.get('detected'):
+                            counts['detections'] += 1
+
+    start = time.perf_counter()
+    if sessions <= 1:
+        replay(None)
+    else:
+        threads = [threading.Thread(target=replay, args=(f'bench-{i}',)) for i in range(sessions)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    elapsed = time.perf_counter() - start
+
+    report = summarize_latencies(latencies)
+    report.update({
+        'frames_per_second': round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        'sequences': len(sequences),
+        'sessions': sessions,
+        'errors': counts['errors'],
+        'detections': counts['detections']
+    })
+    if manager.pose_scheduler:
+        report['pose_batch'] = {name.split('.', 1)[1]: stats
+                                for name, stats in metrics.snapshot()['histograms'].items()
+                                if name.startswith('pose_batch.')}
+    if responses:
+        report['responses'] = bench_responses(age_group, results)
+    return report
+
+
+def bench_responses(age_group, results):
+    """Bytes and encode time per frame: full jsonify-style body vs compact deltas"""
+    from tasks import physical_response
+
+    full_bytes, full_ms, compact_bytes, compact_ms = [], [], [], []
+    for session_id, session_results in results.items():
+        deltas = physical_response.ResponseDeltas()
+        seq = None
+        for result in session_results:
+            if 'error' in result or result.get('fallback'):
+                continue
+            t0 = time.perf_counter()
+            body = json.dumps(physical_response.full_body(result, 'physical', age_group)).encode()
+            full_ms.append((time.perf_counter() - t0) * 1000)
+            full_bytes.append(len(body))
+
+            t0 = time.perf_counter()
+            compact = deltas.encode(session_id or 'bench', physical_response.compact_body(result), seq)
+            body, _ = physical_response.serialize(compact)
+            compact_ms.append((time.perf_counter() - t0) * 1000)
+            compact_bytes.append(len(body))
+            seq = compact[physical_response.SEQ_KEY]
+
+    if not full_bytes:
+        return {}
+    report = {
+        'full': {'mean_bytes': round(sum(full_bytes) / len(full_bytes), 1),
+                 'mean_encode_ms': round(sum(full_ms) / len(full_ms), 4)},
+        'compact': {'mean_bytes': round(sum(compact_bytes) / len(compact_bytes), 1),
+                    'mean_encode_ms': round(sum(compact_ms) / len(compact_ms), 4)}
+    }
+    report['bytes_ratio'] = round(report['full']['mean_bytes'] / max(report['compact']['mean_bytes'], 1), 2)
+    return report
+
+
+def bench_linguistic(manager, age_group, clips, warmup, repeat):
+    latencies = []
+    errors = 0
+    successes = 0
+
+    for _, audio_data in clips[:warmup]:
+        manager.process_linguistic_audio(age_group, audio_data)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        manager.reset_task(age_group, 'linguistic')
+        for _, audio_data in clips:
+            t0 = time.perf_counter()
+            result = manager.process_linguistic_audio(age_group, audio_data)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if 'error' in result or not result.get('available', True):
+                errors += 1
+            elif result.get('success'):
+                successes += 1
+    elapsed = time.perf_counter() - start
+
+    report = summarize_latencies(latencies)
+    report.update({
+        'clips_per_second': round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        'clips': len(clips),
+        'errors': errors,
+        'successes': successes
+    })
+    return report
+
+
+def bench_grammar(task, clips, repeat):
+    """
+    Decode every clip with the full vocabulary and with the task's grammar
+    Goes straight to the recognizer, so the transcript cache is not involved
+    """
+    from score_audio import SAMPLE_RATE, decode_pcm
+    from tasks import speech
+
+    pcms = [decode_pcm(base64.b64decode(audio_data)) for _, audio_data in clips]
+    report = {}
+    for mode, grammar in (('full_vocabulary', None), ('grammar', task.grammar)):
+        speech.recognize_pcm(task.model, pcms[0], SAMPLE_RATE, grammar)  # Build the recognizer
+        latencies = []
+        successes = 0
+        for _ in range(repeat):
+            scorer = type(task)(load_model=False)
+            for pcm in pcms:
+                t0 = time.perf_counter()
+                text = speech.recognize_pcm(task.model, pcm, SAMPLE_RATE, grammar)['text']
+                latencies.append((time.perf_counter() - t0) * 1000)
+                successes += bool(scorer.process_transcript(text)['success'])
+        report[mode] = summarize_latencies(latencies)
+        report[mode]['successes'] = successes
+
+    if report['grammar']['mean_ms']:
+        report['speedup'] = round(report['full_vocabulary']['mean_ms'] / report['grammar']['mean_ms'], 2)
+    return report
+
+
+def compare_reports(current, baseline, tolerance):
+    """
+    Return a list of regressions (metric worse than baseline by more than tolerance)
+    """
+    regressions = []
+    for section in ('physical', 'linguistic'):
+        for age_group, metrics in current.get(section, {}).items():
+            base_metrics = baseline.get(section, {}).get(age_group)
+            if not base_metrics:
+                continue
+            for key, value in metrics.items():
+                base_value = base_metrics.get(key)
+                if not isinstance(value, (int, float)) or not base_value:
+                    continue
+                if key in HIGHER_IS_BETTER:
+                    worse = value < base_value * (1 - tolerance)
+                elif key.endswith('_ms'):
+                    worse = value > base_value * (1 + tolerance)
+                else:
+                    continue
+                if worse:
+                    regressions.append({
+                        'section': section,
+                        'age_group': age_group,
+                        'metric': key,
+                        'baseline': base_value,
+                        'current': value
+                    })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline frame/audio pipeline benchmark')
+    parser.add_argument('--frames', help='Directory of JPEG frame sequences')
+    parser.add_argument('--synthetic-frames', type=int, default=0,
+                        help='Generate N deterministic noise frames instead of a recorded corpus')
+    parser.add_argument('--audio', help='Directory of WAV/webm clips')
+    parser.add_argument('--physical-age', action='append',
+                        help='Physical age group to benchmark (default: all loaded tasks)')
+    parser.add_argument('--linguistic-age', action='append',
+                        help='Linguistic age group to benchmark (default: all loaded tasks)')
+    parser.add_argument('--warmup', type=int, default=5, help='Warm-up calls per task')
+    parser.add_argument('--repeat', type=int, default=1, help='Replay the corpus N times')
+    parser.add_argument('--sessions', type=int, default=1,
+                        help='Concurrent sessions replaying the frames (exercises pose batching)')
+    parser.add_argument('--batch-window-ms', type=float, help='Override POSE_BATCH_WINDOW_MS')
+    parser.add_argument('--batch-max-frames', type=int, help='Override POSE_BATCH_MAX_FRAMES')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--output', help='Write the JSON report here (default: stdout)')
+    parser.add_argument('--compare', help='Baseline JSON report to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Allowed relative slowdown before --compare fails (default 0.10)')
+    parser.add_argument('--grammar-compare', action='store_true',
+                        help='Also decode --audio with and without each task\'s grammar')
+    parser.add_argument('--response-compare', action='store_true',
+                        help='Also compare full and compact physical response sizes and encode times')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    import config
+    # Frames are replayed back to back; pacing would refuse most of them
+    config.FRAME_PACING = False
+    if args.batch_window_ms is not None:
+        config.POSE_BATCH_WINDOW_MS = args.batch_window_ms
+    if args.batch_max_frames is not None:
+        config.POSE_BATCH_MAX_FRAMES = args.batch_max_frames
+
+    from tasks import get_task_manager
+    manager = get_task_manager()
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count()
+        },
+        'pose_batching': {
+            'enabled': manager.pose_scheduler is not None,
+            'window_ms': config.POSE_BATCH_WINDOW_MS,
+            'max_frames': config.POSE_BATCH_MAX_FRAMES,
+            'workers': manager.pose_scheduler.workers if manager.pose_scheduler else 0
+        },
+        'physical': {},
+        'linguistic': {},
+        'grammar': {}
+    }
+
+    sequences = {}
+    if args.frames:
+        sequences.update(load_frame_sequences(args.frames))
+    if args.synthetic_frames:
+        sequences.update(synthetic_frame_sequence(args.synthetic_frames, seed=args.seed))
+
+    if sequences:
+        age_groups = args.physical_age or sorted(manager.physical_tasks)
+        for age_group in age_groups:
+            print(f"⏱️  Physical {age_group}: {sum(len(s) for s in sequences.values())} frames", file=sys.stderr)
+            report['physical'][age_group] = bench_physical(manager, age_group, sequences,
+                                                           args.warmup, args.repeat, args.sessions,
+                                                           args.response_compare)
+
+    if args.audio:
+        clips = load_audio_clips(args.audio)
+        age_groups = args.linguistic_age or sorted(manager.linguistic_tasks)
+        for age_group in age_groups:
+            print(f"⏱️  Linguistic {age_group}: {len(clips)} clips", file=sys.stderr)
+            report['linguistic'][age_group] = bench_linguistic(manager, age_group, clips,
+                                                               args.warmup, args.repeat)
+
+        if args.grammar_compare and clips:
+            for age_group in age_groups:
+                task = manager.linguistic_tasks.get(age_group)
+                if task is None or task.model is None or task.grammar is None:
+                    continue
+                print(f"⏱️  Grammar {age_group}: {len(clips)} clips, both modes", file=sys.stderr)
+                report['grammar'][age_group] = bench_grammar(task, clips, args.repeat)
+
+    report['peak_rss_mb'] = peak_rss_mb()
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        report['regressions'] = compare_reports(report, baseline, args.tolerance)
+        if report['regressions']:
+            exit_code = 1
+            for r in report['regressions']:
+                print(f"❌ {r['section']} {r['age_group']} {r['metric']}: "
+                      f"{r['baseline']} -> {r['current']}", file=sys.stderr)
+        else:
+            print("✅ No regressions against baseline", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Precomputed responses for the static catalogues
+The question, physical and linguistic task catalogues never change while
+the app runs, yet every request re-serialized them. CachedBody encodes a
+catalogue once (plus a gzipped copy) with a strong ETag; serve() answers
+from those bytes, with Cache-Control for CATALOG_CACHE_MAX_AGE seconds,
+gzip when the client accepts it and 304 Not Modified when the client
+already holds the current version (If-None-Match).
+
+VersionedBody does the same for content that changes rarely, such as the
+enhanced task listing: it is rebuilt only when the version it is keyed on
+changes, and served with max-age=0 so clients revalidate (a 304 is cheap).
+"""
+
+import gzip
+import hashlib
+
+from flask import current_app, request
+
+import config
+from json_encoding import dumps_bytes
+
+GZIP_MIN_BYTES = 512  # Smaller bodies are not worth compressing
+
+
+class CachedBody:
+    __slots__ = ('body', 'gzipped', 'etag', 'gzip_etag')
+
+    def __init__(self, obj):
+        self.body = dumps_bytes(obj) + b'\n'
+        digest = hashlib.blake2b(self.body, digest_size=16).hexdigest()
+        self.etag = digest
+        self.gzip_etag = f'{digest}-gz'  # Strong ETags differ per encoding
+        gzipped = gzip.compress(self.body, compresslevel=9, mtime=0) if len(self.body) >= GZIP_MIN_BYTES else None
+        self.gzipped = gzipped if gzipped and len(gzipped) < len(self.body) else None
+
+    def serve(self, max_age=None):
+        """200 with the stored bytes, or 304 if the client's copy is current"""
+        max_age = config.CATALOG_CACHE_MAX_AGE if max_age is None else max_age
+        use_gzip = self.gzipped is not None and request.accept_encodings['gzip'] > 0
+        etag = self.gzip_etag if use_gzip else self.etag
+        headers = {
+            'Cache-Control': f'public, max-age={max_age}',
+            'Vary': 'Accept-Encoding'
+        }
+
+        if request.if_none_match.contains_weak(self.etag) or request.if_none_match.contains_weak(self.gzip_etag):
+            response = current_app.response_class(status=304, headers=headers)
+        else:
+            response = current_app.response_class(self.gzipped if use_gzip else self.body,
+                                                  mimetype='application/json', headers=headers)
+            if use_gzip:
+                response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(etag)
+        return response
+
+
+def cache_bodies(keys, render):
+    """{key: CachedBody(render(key))} for every key, built once"""
+    return {key: CachedBody(render(key)) for key in keys}
+
+
+class VersionedBody:
+    """A CachedBody rebuilt only when its version changes"""
+
+    def __init__(self):
+        self.current = (None, None)  # (version, CachedBody), swapped as one
+
+    def get(self, version, render):
+        current_version, cached = self.current
+        if cached is None or current_version != version:
+            cached = CachedBody(render())
+            self.current = (version, cached)
+        return cached
@@ -0,0 +1,140 @@
+"""
+Runtime configuration for the assessment backend
+Every value can be overridden with an environment variable (or a .env file)
+"""
+
+import os
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# SQLite database (relative paths resolve against the working directory)
+DATABASE_PATH = os.environ.get('DATABASE_PATH', 'assessment.db')
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+# Per-request profiling
+PROFILE_HEADER = 'X-Profile'
+PROFILE_SAMPLE_RATE = _env_float('PROFILE_SAMPLE_RATE', 0.0)  # 0.0 - 1.0
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILE_MAX_TRACES = _env_int('PROFILE_MAX_TRACES', 50)
+
+# Per-session task state kept by the task manager (least recently used is dropped)
+MAX_TASK_SESSIONS = _env_int('MAX_TASK_SESSIONS', 256)
+
+# Pose inference micro-batching (tasks/pose_scheduler.py)
+POSE_BATCHING = _env_bool('POSE_BATCHING', True)
+POSE_BATCH_WINDOW_MS = _env_float('POSE_BATCH_WINDOW_MS', 5.0)
+POSE_BATCH_MAX_FRAMES = _env_int('POSE_BATCH_MAX_FRAMES', 8)
+POSE_INFERENCE_WORKERS = _env_int('POSE_INFERENCE_WORKERS', min(4, os.cpu_count() or 1))
+# One tracking graph per live session: fewer would rebuild a graph (~120 ms) on most frames
+POSE_MAX_SESSION_GRAPHS = _env_int('POSE_MAX_SESSION_GRAPHS', MAX_TASK_SESSIONS)
+POSE_INFERENCE_TIMEOUT = _env_float('POSE_INFERENCE_TIMEOUT', 10.0)  # seconds
+
+# Adaptive frame pacing for /api/ai/physical-assessment (tasks/frame_pacing.py)
+FRAME_PACING = _env_bool('FRAME_PACING', True)
+FRAME_INTERVAL_MIN_MS = _env_int('FRAME_INTERVAL_MIN_MS', 100)
+FRAME_INTERVAL_MAX_MS = _env_int('FRAME_INTERVAL_MAX_MS', 2000)
+FRAME_INTERVAL_DEFAULT_MS = _env_int('FRAME_INTERVAL_DEFAULT_MS', 500)
+# Frames sooner than this fraction of the recommended interval are refused
+FRAME_EARLY_TOLERANCE = _env_float('FRAME_EARLY_TOLERANCE', 0.5)
+
+# Frame preprocessing (tasks/frame_preprocess.py)
+FRAME_DECODE_MIN_SIDE = _env_int('FRAME_DECODE_MIN_SIDE', 0)  # Full size until reduced decodes are checked against full-size landmarks on recorded frames
+POSE_ROI_CROP = _env_bool('POSE_ROI_CROP', False)  # Off until checked against full-frame landmarks on real footage
+POSE_ROI_MARGIN = _env_float('POSE_ROI_MARGIN', 0.25)  # Padding as a fraction of the person's size
+
+# Motion-gated pose inference for hold-still tasks (tasks/motion_gate.py)
+MOTION_GATE = _env_bool('MOTION_GATE', True)
+MOTION_GATE_THRESHOLD = _env_float('MOTION_GATE_THRESHOLD', 2.0)  # Mean 0-255 gray difference
+MOTION_GATE_MAX_SKIPS = _env_int('MOTION_GATE_MAX_SKIPS', 4)  # Consecutive reused frames
+
+# Pose model complexity tiers (tasks/pose_tiers.py): 0 = lite, 1 = full, 2 = heavy
+POSE_MODEL_COMPLEXITY = _env_int('POSE_MODEL_COMPLEXITY', 1)
+# Per-task overrides, e.g. "frog_jump=2,one_leg_balance=0"
+POSE_TASK_COMPLEXITY = {
+    name.strip(): int(tier)
+    for name, _, tier in (item.partition('=') for item in os.environ.get('POSE_TASK_COMPLEXITY', '').split(','))
+    if name.strip() and tier.strip().isdigit()
+}
+# Automatic downgrade when the pose queue or p95 latency runs high
+POSE_TIER_AUTO = _env_bool('POSE_TIER_AUTO', True)
+POSE_TIER_QUEUE_HIGH = _env_int('POSE_TIER_QUEUE_HIGH', 8)
+POSE_TIER_QUEUE_LOW = _env_int('POSE_TIER_QUEUE_LOW', 2)
+POSE_TIER_P95_HIGH_MS = _env_float('POSE_TIER_P95_HIGH_MS', 250.0)
+POSE_TIER_P95_LOW_MS = _env_float('POSE_TIER_P95_LOW_MS', 100.0)
+POSE_TIER_COOLDOWN_SECONDS = _env_float('POSE_TIER_COOLDOWN_SECONDS', 5.0)
+# Sessions moved to a new tier per batch; each move rebuilds that session's graph (~120 ms)
+POSE_TIER_SWITCHES_PER_BATCH = _env_int('POSE_TIER_SWITCHES_PER_BATCH', 2)
+
+# Pose inference in worker processes fed through shared memory (tasks/shared_frames.py)
+POSE_WORKER_PROCESSES = _env_int('POSE_WORKER_PROCESSES', 0)  # 0 = inference threads in this process
+POSE_SHARED_FRAME_SLOTS = _env_int('POSE_SHARED_FRAME_SLOTS', 32)
+POSE_SHARED_FRAME_MAX_PIXELS = _env_int('POSE_SHARED_FRAME_MAX_PIXELS', 1280 * 720)
+
+# Per-session landmark history for temporal smoothing (tasks/landmark_history.py)
+POSE_HISTORY_FRAMES = _env_int('POSE_HISTORY_FRAMES', 3)
+
+# Transcript cache keyed by decoded audio (tasks/transcript_cache.py)
+TRANSCRIPT_CACHE_SIZE = _env_int('TRANSCRIPT_CACHE_SIZE', 512)  # In-memory entries; 0 = off
+TRANSCRIPT_CACHE_DB = os.environ.get('TRANSCRIPT_CACHE_DB', '')  # SQLite file; empty = memory only
+TRANSCRIPT_CACHE_DB_MAX_ENTRIES = _env_int('TRANSCRIPT_CACHE_DB_MAX_ENTRIES', 50000)
+
+# Short target-word tasks decode against their own word list instead of the full vocabulary
+SPEECH_GRAMMAR = _env_bool('SPEECH_GRAMMAR', True)
+
+# Voice activity detection before recognition (tasks/voice_activity.py)
+SPEECH_VAD = _env_bool('SPEECH_VAD', True)
+SPEECH_VAD_FRAME_MS = _env_int('SPEECH_VAD_FRAME_MS', 20)
+SPEECH_VAD_PADDING_MS = _env_int('SPEECH_VAD_PADDING_MS', 200)  # Kept around speech, both sides
+SPEECH_VAD_MIN_SPEECH_MS = _env_int('SPEECH_VAD_MIN_SPEECH_MS', 60)  # Less than this is a silent clip
+SPEECH_VAD_MIN_RMS = _env_float('SPEECH_VAD_MIN_RMS', 300.0)  # int16 amplitude
+SPEECH_VAD_ENERGY_RATIO = _env_float('SPEECH_VAD_ENERGY_RATIO', 3.0)  # Speech vs the clip's noise floor
+
+# Reusable Vosk recognizers per (model, rate, grammar) (tasks/recognizer_pool.py)
+SPEECH_RECOGNIZERS_PER_KEY = _env_int('SPEECH_RECOGNIZERS_PER_KEY', min(4, os.cpu_count() or 1))
+SPEECH_RECOGNIZER_POOL_KEYS = _env_int('SPEECH_RECOGNIZER_POOL_KEYS', 32)
+SPEECH_RECOGNIZER_WAIT_TIMEOUT = _env_float('SPEECH_RECOGNIZER_WAIT_TIMEOUT', 10.0)  # seconds
+
+# Speech assessments queued as background jobs (tasks/speech_jobs.py)
+SPEECH_JOB_WORKERS = _env_int('SPEECH_JOB_WORKERS', min(4, os.cpu_count() or 1))
+SPEECH_JOB_QUEUE_SIZE = _env_int('SPEECH_JOB_QUEUE_SIZE', 32)  # Further submissions get a 503
+SPEECH_JOB_RESULT_TTL = _env_float('SPEECH_JOB_RESULT_TTL', 300.0)  # seconds a finished job can be fetched
+SPEECH_JOB_MAX_WAIT = _env_float('SPEECH_JOB_MAX_WAIT', 30.0)  # Longest long-poll, seconds
+SPEECH_JOBS_DEFAULT = _env_bool('SPEECH_JOBS_DEFAULT', False)  # Queue requests that don't set 'async'
+
+# API response encoding (json_encoding.py)
+JSON_ENCODER = os.environ.get('JSON_ENCODER', 'auto')  # auto (orjson if installed), orjson or stdlib
+JSON_SORT_KEYS = _env_bool('JSON_SORT_KEYS', True)  # Flask's default; off is a little faster
+JSON_STREAM_MIN_ITEMS = _env_int('JSON_STREAM_MIN_ITEMS', 50)  # Longer lists are streamed
+
+# Precomputed catalogue responses (catalog_cache.py)
+CATALOG_CACHE_MAX_AGE = _env_int('CATALOG_CACHE_MAX_AGE', 300)  # seconds clients may reuse without revalidating
@@ -0,0 +1,115 @@
+"""
+JSON encoding for API responses
+install(app) swaps Flask's JSON provider for one that encodes with orjson
+when it is installed (JSON_ENCODER=auto, the default, or orjson) and with
+the standard library otherwise (JSON_ENCODER=stdlib). jsonify() and every
+route, blueprints included, pick it up unchanged. Output matches Flask's
+default provider: same key order (JSON_SORT_KEYS), dates in HTTP format,
+UUIDs, dataclasses and non-string keys handled the same way. orjson sends
+non-ASCII text as UTF-8 rather than \\u escapes (the standard library path
+keeps the escapes, which it writes faster).
+
+stream_json() encodes one large list inside a response body item by item,
+so big responses start sending before the whole list has been encoded and
+never exist as one string.
+"""
+
+import json
+import uuid
+from datetime import date
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+STREAM_CHUNK_ITEMS = 16  # List items encoded per streamed chunk
+
+
+def backend():
+    """Name of the encoder in use: 'orjson' or 'stdlib'"""
+    if config.JSON_ENCODER != 'stdlib' and orjson is not None:
+        return 'orjson'
+    return 'stdlib'
+
+
+def _orjson_default(obj):
+    # orjson would write these its own way; keep Flask's output
+    if isinstance(obj, (date, uuid.UUID)) or hasattr(obj, '__html__') or hasattr(obj, '__dataclass_fields__'):
+        return FastJSONProvider.default(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def dumps_bytes(obj, sort_keys=None, indent=False):
+    """UTF-8 JSON for obj, compact unless indent"""
+    sort_keys = config.JSON_SORT_KEYS if sort_keys is None else sort_keys
+    if backend() == 'orjson':
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=_orjson_default, option=option)
+        except (TypeError, orjson.JSONEncodeError):
+            pass  # e.g. integers beyond 64 bits; the standard library copes
+    if indent:
+        text = json.dumps(obj, default=FastJSONProvider.default, sort_keys=sort_keys, indent=2)
+    else:
+        text = json.dumps(obj, default=FastJSONProvider.default, sort_keys=sort_keys, separators=(',', ':'))
+    return text.encode()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    @property
+    def sort_keys(self):
+        return config.JSON_SORT_KEYS
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault('default', self.default)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            return json.dumps(obj, **kwargs)
+        return dumps_bytes(obj).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(dumps_bytes(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+
+def install(app):
+    """Use the fast provider for jsonify() and every route of app"""
+    app.json = FastJSONProvider(app)
+    print(f"✅ JSON responses encoded with {backend()}")
+    return app
+
+
+def stream_json(obj, key):
+    """
+    Streamed response for a dict whose obj[key] is a (possibly long) list
+    The other fields are encoded up front; the list is encoded STREAM_CHUNK_ITEMS
+    items at a time. Keys are written in the same order dumps_bytes() would use.
+    """
+    items = obj[key]
+    keys = sorted(obj) if config.JSON_SORT_KEYS else list(obj)
+    position = keys.index(key)
+    before = {k: obj[k] for k in keys[:position]}
+    after = {k: obj[k] for k in keys[position + 1:]}
+
+    def generate():
+        head = dumps_bytes(before)[:-1]  # Drop the closing brace
+        yield head + (b',' if before else b'') + dumps_bytes(key) + b':['
+        for start in range(0, len(items), STREAM_CHUNK_ITEMS):
+            chunk = b','.join(dumps_bytes(item) for item in items[start:start + STREAM_CHUNK_ITEMS])
+            yield (b',' if start else b'') + chunk
+        tail = dumps_bytes(after)[1:]  # Drop the opening brace
+        yield b']' + (b',' + tail if after else b'}') + b'\n'
+
+    return Response(generate(), mimetype='application/json')
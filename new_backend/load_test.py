@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Load-test harness for the Flask API with synthetic assessment traffic
+Drives register/login/questions/submit-assessment and the report routes in
+a realistic mix at rising concurrency and reports throughput and latency
+per level
+
+Usage:
+    # In-process Flask test client against a scratch database (loadtest.db by default)
+    python load_test.py --db loadtest.db --concurrency 1,4,16 --duration 10
+
+    # Against a running local worker
+    python load_test.py --url http://localhost:5000 --concurrency 1,8,32,64
+
+    # Log in as users created by seed_database.py instead of registering only
+    python load_test.py --seeded-users 1000000 --output load.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime, timedelta
+
+from benchmark_pipelines import summarize_latencies, peak_rss_mb
+from seed_database import AGE_GROUPS, SEED_PASSWORD, seed_email
+
+# Scenario weights - most traffic is parents finishing an assessment and
+# reading the report, with a steady trickle of new registrations
+DEFAULT_MIX = {
+    'new_parent': 0.15,
+    'returning_parent': 0.45,
+    'report_browsing': 0.40
+}
+
+
+class InProcessClient:
+    """Calls the Flask app through its test client (one per worker thread)"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None, headers=None):
+        response = self.client.open(path, method=method, json=body, headers=headers or {})
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpClient:
+    """Calls a running server over HTTP"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def request(self, method, path, body=None, headers=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        req.add_header('Content-Type', 'application/json')
+        for key, value in (headers or {}).items():
+            req.add_header(key, value)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                payload = response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            payload = e.read()
+            status = e.code
+        except (urllib.error.URLError, OSError):
+            return 0, None
+        try:
+            return status, json.loads(payload) if payload else None
+        except ValueError:
+            return status, None
+
+
+class LoadRecorder:
+    """Thread-safe latency/status collection per endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, endpoint, latency_ms, status):
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(latency_ms)
+            if status == 0 or status >= 500:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self, elapsed):
+        endpoints = {}
+        all_latencies = []
+        for endpoint, values in sorted(self.latencies.items()):
+            stats = summarize_latencies(values)
+            stats['errors'] = self.errors.get(endpoint, 0)
+            endpoints[endpoint] = stats
+            all_latencies.extend(values)
+        overall = summarize_latencies(all_latencies)
+        overall['errors'] = sum(self.errors.values())
+        overall['requests_per_second'] = round(len(all_latencies) / elapsed, 2) if elapsed > 0 else 0.0
+        return overall, endpoints
+
+
+class VirtualParent:
+    """One simulated parent session running scenarios in a loop"""
+
+    def __init__(self, client, recorder, rng, seeded_users):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.seeded_users = seeded_users
+        self.token = None
+        self.child = None
+
+    def call(self, endpoint, method, path, body=None, auth=False):
+        headers = {'Authorization': f'Bearer {self.token}'} if auth and self.token else None
+        t0 = time.perf_counter()
+        status, payload = self.client.request(method, path, body, headers)
+        self.recorder.record(endpoint, (time.perf_counter() - t0) * 1000, status)
+        return status, payload
+
+    def register(self):
+        age_group_years = self.rng.randint(0, 5)
+        birth = datetime.now() - timedelta(days=age_group_years * 365 + self.rng.randint(30, 330))
+        status, payload = self.call('register', 'POST', '/api/register', {
+            'email': f"load-{uuid.uuid4().hex}@example.com",
+            'password': 'loadtest123',
+            'parentName': 'Load Test Parent',
+            'childData': {
+                'name': 'Load Test Child',
+                'dateOfBirth': birth.strftime('%Y-%m-%d'),
+                'sex': self.rng.choice(['male', 'female'])
+            }
+        })
+        self._remember(status, payload)
+
+    def login(self):
+        if not self.seeded_users:
+            return self.register()
+        n = self.rng.randint(1, self.seeded_users)
+        status, payload = self.call('login', 'POST', '/api/login',
+                                    {'email': seed_email(n), 'password': SEED_PASSWORD})
+        self._remember(status, payload)
+
+    def _remember(self, status, payload):
+        if status in (200, 201) and payload and payload.get('token'):
+            self.token = payload['token']
+            self.child = payload.get('child')
+
+    @property
+    def age_group(self):
+        return (self.child or {}).get('ageGroup') or self.rng.choice(AGE_GROUPS)
+
+    def take_assessment(self):
+        _, payload = self.call('questions', 'GET', f'/api/questions/{self.age_group}')
+        questions = (payload or {}).get('questions', [])
+        self.call('physical_task', 'GET', f'/api/physical/{self.age_group}')
+        self.call('linguistic_task', 'GET', f'/api/linguistic/{self.age_group}')
+
+        responses = []
+        for q in questions:
+            correct = self.rng.random() < 0.6
+            options = q.get('options') or ['']
+            responses.append({
+                'question_id': q.get('id'),
+                'question': q.get('question'),
+                'user_answer': options[0] if correct else options[-1],
+                'correct_answer': options[0],
+                'correct': correct,
+                'response_time': self.rng.randint(2, 30),
+                'difficulty': 1,
+                'attempts': 1
+            })
+        physical_success = self.rng.randint(0, 8)
+        linguistic_success = self.rng.randint(0, 3)
+        _, result = self.call('submit_assessment', 'POST', '/api/submit-assessment', {
+            'age_group': self.age_group,
+            'intelligence_responses': responses,
+            'physical_details': {
+                'task_type': 'physical_assessment', 'task_name': 'Physical Development Assessment',
+                'success_count': physical_success, 'total_attempts': physical_success + 1,
+                'completion_time': self.rng.randint(10, 120), 'feedback': 'Load test',
+                'completed': True, 'skipped': False
+            },
+            'linguistic_details': {
+                'task_type': 'linguistic_assessment', 'task_name': 'Linguistic Development Assessment',
+                'success_count': linguistic_success, 'total_attempts': linguistic_success + 1,
+                'completion_time': self.rng.randint(5, 60), 'feedback': 'Load test',
+                'completed': True, 'skipped': False
+            }
+        }, auth=True)
+        return (result or {}).get('result_id')
+
+    def read_reports(self, result_id=None):
+        child_id = (self.child or {}).get('id')
+        if child_id:
+            self.call('child_responses', 'GET', f'/api/child-responses/{child_id}', auth=True)
+            self.call('progress', 'GET', f'/api/progress/{child_id}')
+        if result_id:
+            self.call('assessment_insights', 'GET', f'/api/assessment-insights/{result_id}', auth=True)
+        self.call('age_group_stats', 'GET', f'/api/age-group-stats/{self.age_group}')
+        self.call('leaderboard', 'GET', '/api/leaderboard')
+
+    def run_scenario(self, name):
+        if name == 'new_parent':
+            self.register()
+            self.read_reports(self.take_assessment())
+        elif name == 'returning_parent':
+            self.login()
+            self.read_reports(self.take_assessment())
+        else:
+            if self.token is None:
+                self.login()
+            self.read_reports()
+
+
+def run_level(make_client, concurrency, duration, mix, seeded_users, seed):
+    recorder = LoadRecorder()
+    deadline = time.perf_counter() + duration
+    scenarios = list(mix)
+    weights = [mix[s] for s in scenarios]
+    completed = [0] * concurrency
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        parent = VirtualParent(make_client(), recorder, rng, seeded_users)
+        while time.perf_counter() < deadline:
+            parent.run_scenario(rng.choices(scenarios, weights)[0])
+            completed[index] += 1
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    overall, endpoints = recorder.summary(elapsed)
+    overall['concurrency'] = concurrency
+    overall['scenarios_completed'] = sum(completed)
+    overall['scenarios_per_second'] = round(sum(completed) / elapsed, 2) if elapsed > 0 else 0.0
+    return {'overall': overall, 'endpoints': endpoints}
+
+
+def parse_mix(text):
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(','):
+        name, weight = part.split('=')
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown scenario '{name}' (expected one of {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synthetic load test for the assessment API')
+    parser.add_argument('--url', help='Base URL of a running server (default: in-process test client)')
+    parser.add_argument('--concurrency', default='1,2,4,8,16',
+                        help='Comma separated concurrency levels (default 1,2,4,8,16)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per concurrency level')
+    parser.add_argument('--mix', help='Scenario weights, e.g. new_parent=0.2,returning_parent=0.5,report_browsing=0.3')
+    parser.add_argument('--seeded-users', type=int, default=0,
+                        help='Number of seed_database.py parents available for login')
+    parser.add_argument('--db', default=os.environ.get('DATABASE_PATH', 'loadtest.db'),
+                        help='Database for in-process runs (default: $DATABASE_PATH or loadtest.db)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='Write the JSON report here (default: stdout)')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    levels = [int(c) for c in args.concurrency.split(',') if c.strip()]
+
+    if args.url:
+        make_client = lambda: HttpClient(args.url)
+        target = args.url
+    else:
+        # Registers fake parents, so never against the real database
+        if os.path.basename(args.db) == 'assessment.db':
+            print("❌ Refusing to load test assessment.db - use a separate database file", file=sys.stderr)
+            return 1
+        os.environ['DATABASE_PATH'] = args.db
+        import app as backend
+        backend.DATABASE_PATH = args.db
+        backend.init_db()
+        make_client = lambda: InProcessClient(backend.app)
+        target = f"in-process ({args.db})"
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'target': target,
+        'duration_per_level': args.duration,
+        'mix': mix,
+        'levels': []
+    }
+
+    print(f"{'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}", file=sys.stderr)
+    for concurrency in levels:
+        # The app prints debug output on every submit; keep it out of the report
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            level = run_level(make_client, concurrency, args.duration, mix, args.seeded_users, args.seed)
+        report['levels'].append(level)
+        o = level['overall']
+        print(f"{concurrency:>5} {o['requests_per_second']:>9} {o['p50_ms']:>9} {o['p95_ms']:>9} "
+              f"{o['p99_ms']:>9} {o['errors']:>7}", file=sys.stderr)
+
+    report['peak_rss_mb'] = peak_rss_mb()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
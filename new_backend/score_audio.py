@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Offline batch scorer for recorded speech clips
+Walks directories of audio, transcodes clips to 16 kHz mono PCM on a pool
+of threads, trims the silence around the speech (clips with none are
+scored as empty without reaching Vosk) and recognizes them across worker
+processes that share one vosk.Model (forked after loading; spawned
+workers load their own). Each worker keeps a single KaldiRecognizer and reuses it clip after clip.
+
+Transcripts are cached in SQLite by a hash of the file's content and the
+model name, so re-scoring after a change to analyze_story_content() or
+analyze_phonetics() only re-runs the text analysis for clips it has seen.
+
+Usage:
+    python score_audio.py clips/ --task say_mama --output scores.jsonl
+    python score_audio.py clips/ --processes 8 --cache transcripts.db
+    python score_audio.py clips/ --rescore-only   # cached transcripts only, no Vosk
+
+--task takes a task name or age group; without it the task is taken from
+the name of the directory holding each clip (e.g. clips/story_kite/).
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+AUDIO_EXTENSIONS = ('.wav', '.webm', '.ogg', '.mp3', '.m4a')
+SAMPLE_RATE = 16000
+DEFAULT_MODEL_NAME = 'vosk-model-small-en-us-0.15'
+CHUNK_BYTES = 8000  # 4000 frames, as the tasks feed Vosk
+
+# Per worker process
+_model = None
+_recognizer = None
+
+
+def find_clips(paths):
+    clips = []
+    for path in paths:
+        if os.path.isfile(path):
+            clips.append(path)
+            continue
+        for root, _, files in os.walk(path):
+            clips.extend(os.path.join(root, name) for name in files
+                         if name.lower().endswith(AUDIO_EXTENSIONS))
+    return sorted(clips)
+
+
+def linguistic_task_classes():
+    """Task classes keyed by both task name and age group"""
+    from tasks.registry import task_classes
+    return task_classes('linguistic')
+
+
+def decode_pcm(data):
+    """16 kHz mono 16-bit PCM from any clip format (pydub/ffmpeg unless already in shape)"""
+    if data.startswith(b'RIFF') and b'WAVE' in data[:20]:
+        try:
+            with wave.open(io.BytesIO(data), 'rb') as wf:
+                if (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) == (1, 2, SAMPLE_RATE):
+                    return wf.readframes(wf.getnframes())
+        except wave.Error:
+            pass
+    from pydub import AudioSegment
+
+    audio = AudioSegment.from_file(io.BytesIO(data))
+    return audio.set_channels(1).set_frame_rate(SAMPLE_RATE).set_sample_width(2).raw_data
+
+
+class Clip:
+    __slots__ = ('path', 'task_cls', 'content_hash', 'pcm', 'voice_activity', 'transcript', 'cached',
+                 'recognize_ms', 'error')
+
+    def __init__(self, path, task_cls):
+        self.path = path
+        self.task_cls = task_cls
+        self.content_hash = None
+        self.pcm = None
+        self.voice_activity = None
+        self.transcript = None
+        self.cached = False
+        self.recognize_ms = 0.0
+        self.error = None
+
+
+def prepare(clip, cached_hashes, decode):
+    """Transcoder thread: hash the file, decode and trim it only when the transcript is not cached"""
+    from tasks import voice_activity
+
+    try:
+        with open(clip.path, 'rb') as f:
+            data = f.read()
+        clip.content_hash = hashlib.sha256(data).hexdigest()
+        clip.cached = clip.content_hash in cached_hashes
+        if not clip.cached and decode:
+            clip.pcm, clip.voice_activity = voice_activity.trim(decode_pcm(data), SAMPLE_RATE)
+    except Exception as e:
+        clip.error = f'Could not read audio: {e}'
+    return clip
+
+
+class TranscriptStore:
+    """SQLite table of transcripts keyed by (content hash, model)"""
+
+    def __init__(self, path, model_name):
+        self.model_name = model_name
+        self.db = sqlite3.connect(path)
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS transcripts (
+                content_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                transcript TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (content_hash, model)
+            )
+        ''')
+        self.db.commit()
+
+    def hashes(self):
+        rows = self.db.execute('SELECT content_hash FROM transcripts WHERE model = ?', (self.model_name,))
+        return {row[0] for row in rows}
+
+    def get(self, content_hash):
+        row = self.db.execute('SELECT transcript FROM transcripts WHERE content_hash = ? AND model = ?',
+                              (content_hash, self.model_name)).fetchone()
+        return row[0] if row else None
+
+    def put(self, content_hash, transcript):
+        self.db.execute('INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?)',
+                        (content_hash, self.model_name, transcript, datetime.now().isoformat()))
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+def _init_worker(model_path):
+    global _model
+    if _model is None:  # Spawned rather than forked from the loaded parent
+        import vosk
+        vosk.SetLogLevel(-1)
+        _model = vosk.Model(model_path)
+
+
+def recognize(pcm):
+    """Worker process: transcript for one clip's PCM"""
+    global _recognizer
+    import vosk
+
+    started = time.perf_counter()
+    if _recognizer is None:
+        _recognizer = vosk.KaldiRecognizer(_model, SAMPLE_RATE)
+    parts = []
+    view = memoryview(pcm)
+    for offset in range(0, len(view), CHUNK_BYTES):
+        if _recognizer.AcceptWaveform(bytes(view[offset:offset + CHUNK_BYTES])):
+            text = json.loads(_recognizer.Result()).get('text', '').strip()
+            if text:
+                parts.append(text)
+    # FinalResult() also resets the recognizer for the next clip
+    text = json.loads(_recognizer.FinalResult()).get('text', '').strip()
+    if text:
+        parts.append(text)
+    return ' '.join(parts).strip(), (time.perf_counter() - started) * 1000
+
+
+def start_recognizers(processes, model, model_path):
+    """Worker pool sharing the parent's model via fork where the platform allows"""
+    global _model
+    if 'fork' in multiprocessing.get_all_start_methods():
+        _model = model
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context('spawn')
+    return context.Pool(processes, initializer=_init_worker, initargs=(model_path,))
+
+
+def score_clip(clip):
+    """Text analysis on a fresh task, so every clip is scored on its own"""
+    record = {'audio': clip.path, 'content_hash': clip.content_hash, 'cached': clip.cached}
+    if clip.voice_activity is not None:
+        record['voice_activity'] = clip.voice_activity
+    if clip.error:
+        record['error'] = clip.error
+        return record
+    task = clip.task_cls(load_model=False)
+    result = task.process_transcript(clip.transcript)
+    record.update({
+        'task': task.task_name,
+        'age_group': task.age_group,
+        'transcript': clip.transcript,
+        'success': bool(result['success']),
+        'confidence': round(float(result['confidence']), 4),
+        'recognize_ms': round(clip.recognize_ms, 1)
+    })
+    if 'analysis' in result:
+        record['analysis'] = result['analysis']
+    if 'matches' in result:
+        record['matches'] = result['matches']
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score recorded speech clips')
+    parser.add_argument('paths', nargs='+', help='Audio files or directories to walk')
+    parser.add_argument('--task', help='Task name or age group (default: the parent directory name)')
+    parser.add_argument('--output', help='JSONL file for the results (default: stdout)')
+    parser.add_argument('--cache', default='transcripts.db', help='SQLite transcript cache')
+    parser.add_argument('--model', help='Vosk model directory (default: wherever the tasks find it)')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help='Recognizer processes (default: one per core)')
+    parser.add_argument('--transcoders', type=int, default=os.cpu_count() or 1,
+                        help='Transcoding threads (default: one per core)')
+    parser.add_argument('--rescore-only', action='store_true',
+                        help='Only re-run text analysis on cached transcripts; skip uncached clips')
+    args = parser.parse_args()
+
+    classes = linguistic_task_classes()
+    clips, skipped = [], 0
+    for path in find_clips(args.paths):
+        name = args.task or os.path.basename(os.path.dirname(os.path.abspath(path)))
+        cls = classes.get(name)
+        if cls is None:
+            print(f"⚠️  Skipping {path}: no linguistic task called '{name}'", file=sys.stderr)
+            skipped += 1
+            continue
+        clips.append(Clip(path, cls))
+    if not clips:
+        print("Nothing to score", file=sys.stderr)
+        return 0
+
+    # One model for every worker; unless given, found where the tasks look for it
+    model, model_path = None, args.model
+    if not args.rescore_only:
+        from tasks import speech
+
+        model_path = model_path or speech.find_model_path()
+        if model_path:
+            try:
+                import vosk
+                vosk.SetLogLevel(-1)
+                model = speech.load_model(model_path)
+            except Exception as e:
+                print(f"❌ Could not load the Vosk model: {e}", file=sys.stderr)
+        if model is None:
+            print("❌ No Vosk model found (use --rescore-only to score cached transcripts)", file=sys.stderr)
+            return 1
+    model_name = os.path.basename(os.path.normpath(model_path)) if model_path else DEFAULT_MODEL_NAME
+
+    store = TranscriptStore(args.cache, model_name)
+    cached_hashes = store.hashes()
+    pool = start_recognizers(args.processes, model, model_path) if model is not None else None
+    transcoders = ThreadPoolExecutor(max_workers=max(1, args.transcoders))
+    output = open(args.output, 'w') if args.output else sys.stdout
+    stats = {'clips': 0, 'cached': 0, 'recognized': 0, 'silent': 0, 'failed': 0, 'skipped': skipped}
+
+    def emit(clip):
+        record = score_clip(clip)
+        output.write(json.dumps(record) + '\n')
+        output.flush()
+        stats['clips'] += 1
+        stats['failed'] += 'error' in record
+
+    print(f"🎙️  Scoring {len(clips)} clips ({len(cached_hashes)} transcripts cached)", file=sys.stderr)
+    started = time.perf_counter()
+    window = 2 * max(1, args.transcoders)
+    queued = deque()      # Transcoding, in file order
+    recognizing = deque()  # (clip, AsyncResult)
+    try:
+        remaining = iter(clips)
+        while True:
+            while len(queued) < window:
+                clip = next(remaining, None)
+                if clip is None:
+                    break
+                queued.append(transcoders.submit(prepare, clip, cached_hashes, pool is not None))
+            if not queued and not recognizing:
+                break
+
+            if queued and len(recognizing) < 4 * max(1, args.processes):
+                clip = queued.popleft().result()
+                if clip.error is None and clip.cached:
+                    clip.transcript = store.get(clip.content_hash)
+                    stats['cached'] += 1
+                elif clip.error is None and pool is None:
+                    stats['skipped'] += 1
+                    continue
+                elif clip.error is None and clip.voice_activity and clip.voice_activity['silent']:
+                    clip.transcript = ''
+                    store.put(clip.content_hash, '')
+                    stats['silent'] += 1
+                elif clip.error is None:
+                    recognizing.append((clip, pool.apply_async(recognize, (clip.pcm,))))
+                    clip.pcm = None
+                    continue
+                emit(clip)
+                continue
+
+            clip, pending = recognizing.popleft()
+            try:
+                clip.transcript, clip.recognize_ms = pending.get()
+                store.put(clip.content_hash, clip.transcript)
+                cached_hashes.add(clip.content_hash)
+                stats['recognized'] += 1
+            except Exception as e:
+                clip.error = f'Recognition failed: {e}'
+            emit(clip)
+    finally:
+        transcoders.shutdown(wait=False, cancel_futures=True)
+        if pool is not None:
+            pool.close()
+            pool.join()
+        store.close()
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"📊 {stats['clips']} clips in {elapsed:.1f}s: {stats['recognized']} recognized, "
+          f"{stats['cached']} from cache, {stats['silent']} silent, {stats['failed']} failed, {stats['skipped']} skipped", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Offline batch scorer for recorded physical assessments
+Walks directories of videos, decodes them on one thread and runs pose
+inference across worker processes (the shared-memory pool from
+tasks/shared_frames.py). Each video's landmarks then go through the task's
+own state machine on the video's clock, and one JSON line per video is
+appended to the output.
+
+Usage:
+    python score_videos.py recordings/ --task frog_jump --output scores.jsonl
+    python score_videos.py recordings/ --processes 8 --sample-fps 10 --resume
+
+--task takes a task name or age group; without it the task is taken from
+the name of the directory holding each video (e.g. recordings/frog_jump/).
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import cv2
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.webm')
+
+# Videos play on this clock so task timers follow video time
+VIDEO_EPOCH = datetime(2000, 1, 1)
+
+
+def find_videos(paths):
+    videos = []
+    for path in paths:
+        if os.path.isfile(path):
+            videos.append(path)
+            continue
+        for root, _, files in os.walk(path):
+            videos.extend(os.path.join(root, name) for name in files
+                          if name.lower().endswith(VIDEO_EXTENSIONS))
+    return sorted(videos)
+
+
+def physical_task_classes():
+    """Task classes keyed by both task name and age group"""
+    from tasks.registry import task_classes
+    return task_classes('physical')
+
+
+def load_scored(output):
+    """Videos already in an output file (for --resume)"""
+    scored = set()
+    if not output or not os.path.exists(output):
+        return scored
+    with open(output) as f:
+        for line in f:
+            try:
+                scored.add(json.loads(line)['video'])
+            except (ValueError, KeyError):
+                continue
+    return scored
+
+
+class VideoJob:
+    def __init__(self, index, path, task, tier):
+        self.index = index
+        self.path = path
+        self.task = task
+        self.tier = tier
+        self.capture = None
+        self.fps = 0.0
+        self.step = 1
+        self.frame_number = 0
+        self.landmarks = []
+        self.times = []
+        self.done = 0
+        self.errors = 0
+        self.decoded = False
+        self.started = time.perf_counter()
+
+
+class VideoScorer:
+    def __init__(self, processes, sample_fps, open_videos, output):
+        from tasks.shared_frames import ProcessPosePool
+        import config
+
+        self.sample_fps = sample_fps
+        self.open_videos = max(1, open_videos)
+        self.output = output
+        self.slot_timeout = config.POSE_INFERENCE_TIMEOUT
+        self.pool = ProcessPosePool(processes, config.POSE_SHARED_FRAME_SLOTS,
+                                    config.POSE_SHARED_FRAME_MAX_PIXELS, self.open_videos)
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.pending = 0  # Videos opened but not yet written
+        self.stats = {'videos': 0, 'frames': 0, 'failed': 0}
+
+    def run(self, jobs):
+        """Decode loop: round-robin over a few open videos so every worker stays busy"""
+        waiting = list(reversed(jobs))
+        active = []
+        while waiting or active:
+            while waiting and len(active) < self.open_videos:
+                job = waiting.pop()
+                if self._open(job):
+                    active.append(job)
+            self._check_workers()
+            for job in list(active):
+                if not self._submit_next(job):
+                    active.remove(job)
+                    self._decoded(job)
+
+        with self.idle:
+            while self.pending:
+                self.idle.wait(timeout=5)
+                if self.pending:
+                    self._check_workers()
+        self.pool.shutdown()
+
+    def _check_workers(self):
+        """A crashed worker loses frames, so the run fails rather than write partial scores"""
+        if self.pool.restarts or not all(p.is_alive() for p in self.pool.processes):
+            raise RuntimeError('A pose worker process died')
+
+    def _acquire_slot(self):
+        """Wait for a free shared slot, giving up if workers die or stop answering"""
+        deadline = time.perf_counter() + self.slot_timeout
+        while True:
+            try:
+                return self.pool.ring.acquire(timeout=min(1.0, self.slot_timeout))
+            except TimeoutError:
+                self._check_workers()
+                if time.perf_counter() >= deadline:
+                    raise RuntimeError(f'No shared frame slot freed up in {self.slot_timeout:g}s')
+
+    def _open(self, job):
+        capture = cv2.VideoCapture(job.path)
+        if not capture.isOpened():
+            self._write({'video': job.path, 'task': job.task.task_name, 'error': 'Could not open video'})
+            self.stats['failed'] += 1
+            return False
+        job.capture = capture
+        job.fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+        if job.fps > 0 and self.sample_fps > 0:
+            job.step = max(1, int(round(job.fps / self.sample_fps)))
+        with self.lock:
+            self.pending += 1
+        return True
+
+    def _submit_next(self, job):
+        """Send the next sampled frame to the pool; False at the end of the video"""
+        capture = job.capture
+        for _ in range(job.step - 1):
+            if not capture.grab():
+                return False
+            job.frame_number += 1
+        ok, frame = capture.read()
+        if not ok:
+            return False
+
+        if job.fps > 0:
+            seconds = job.frame_number / job.fps
+        else:
+            seconds = len(job.times) / float(self.sample_fps or 10)
+        job.frame_number += 1
+
+        position = len(job.landmarks)
+        job.landmarks.append(None)
+        job.times.append(seconds)
+        slot = self._acquire_slot()
+        self.pool.ring.write_frame(slot, frame)
+        self.pool.submit(slot, job.index, job.tier,
+                         lambda landmarks, ok: self._landed(job, position, landmarks, ok))
+        return True
+
+    def _landed(self, job, position, landmarks, ok):
+        """Pool callback for one frame"""
+        job.landmarks[position] = landmarks
+        with self.lock:
+            job.done += 1
+            if not ok:
+                job.errors += 1
+            finished = job.decoded and job.done == len(job.landmarks)
+        if finished:
+            self._finish(job)
+
+    def _decoded(self, job):
+        job.capture.release()
+        job.capture = None
+        with self.lock:
+            job.decoded = True
+            finished = job.done == len(job.landmarks)
+        if finished:
+            self._finish(job)
+
+    def _finish(self, job):
+        self.pool.drop_session(job.index)
+        try:
+            record = score_landmarks(job.task, job.landmarks, job.times)
+        except Exception as e:
+            record = {'error': str(e)}
+        record.update({
+            'video': job.path,
+            'task': job.task.task_name,
+            'age_group': job.task.age_group,
+            'fps': round(job.fps, 3),
+            'model_complexity': job.tier,
+            'inference_errors': job.errors,
+            'elapsed_ms': round((time.perf_counter() - job.started) * 1000, 1)
+        })
+        self._write(record)
+        print(f"✅ {job.path}: {record.get('success_count', 0)} successes "
+              f"({len(job.landmarks)} frames)", file=sys.stderr)
+
+        with self.idle:
+            self.stats['videos'] += 1
+            self.stats['frames'] += len(job.landmarks)
+            self.pending -= 1
+            self.idle.notify_all()
+
+    def _write(self, record):
+        line = json.dumps(record)
+        with self.lock:
+            if self.output is None:
+                sys.stdout.write(line + '\n')
+                sys.stdout.flush()
+            else:
+                self.output.write(line + '\n')
+                self.output.flush()
+
+
+def score_landmarks(task, landmarks, times):
+    """Drive a fresh task's state machine over one video's landmarks"""
+    successes = []
+    detected_frames = person_frames = 0
+    max_confidence = 0.0
+    result = {}
+    for arr, seconds in zip(landmarks, times):
+        before = task.success_count
+        result = task.process_landmarks(arr, now=VIDEO_EPOCH + timedelta(seconds=seconds))
+        if arr is not None:
+            person_frames += 1
+        if result.get('detected'):
+            detected_frames += 1
+        max_confidence = max(max_confidence, float(result.get('confidence', 0.0)))
+        if task.success_count > before:
+            successes.append(round(seconds, 3))
+
+    return {
+        'frames': len(landmarks),
+        'duration_seconds': round(times[-1], 3) if times else 0.0,
+        'person_frames': person_frames,
+        'detected_frames': detected_frames,
+        'max_confidence': round(max_confidence, 4),
+        'success_count': task.success_count,
+        'success_times': successes,
+        'final_message': result.get('message')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score recorded physical assessment videos')
+    parser.add_argument('paths', nargs='+', help='Video files or directories to walk')
+    parser.add_argument('--task', help='Task name or age group (default: the parent directory name)')
+    parser.add_argument('--output', help='JSONL file to append results to (default: stdout)')
+    parser.add_argument('--resume', action='store_true', help='Skip videos already in --output')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help='Pose worker processes (default: one per core)')
+    parser.add_argument('--sample-fps', type=float, default=10.0,
+                        help='Frames per second of video to score (0 = every frame)')
+    parser.add_argument('--open-videos', type=int,
+                        help='Videos decoded concurrently (default: 2 per process)')
+    parser.add_argument('--model-complexity', type=int, choices=(0, 1, 2),
+                        help='Pose model tier (default: the task setting, see pose_tiers)')
+    args = parser.parse_args()
+
+    from tasks.pose_tiers import task_complexity
+
+    classes = physical_task_classes()
+    scored = load_scored(args.output) if args.resume else set()
+    jobs, skipped = [], 0
+    for path in find_videos(args.paths):
+        if path in scored:
+            continue
+        name = args.task or os.path.basename(os.path.dirname(os.path.abspath(path)))
+        cls = classes.get(name)
+        if cls is None:
+            print(f"⚠️  Skipping {path}: no physical task called '{name}'", file=sys.stderr)
+            skipped += 1
+            continue
+        task = cls(create_pose=False)
+        tier = task_complexity(task.task_name) if args.model_complexity is None else args.model_complexity
+        jobs.append(VideoJob(len(jobs), path, task, tier))
+
+    if not jobs:
+        print("Nothing to score", file=sys.stderr)
+        return 0
+
+    print(f"🎬 Scoring {len(jobs)} videos with {args.processes} pose workers", file=sys.stderr)
+    output = open(args.output, 'a') if args.output else None
+    started = time.perf_counter()
+    try:
+        scorer = VideoScorer(args.processes, args.sample_fps,
+                             args.open_videos or 2 * args.processes, output)
+        scorer.run(jobs)
+    finally:
+        if output is not None:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    stats = scorer.stats
+    print(f"📊 {stats['videos']} videos, {stats['frames']} frames in {elapsed:.1f}s "
+          f"({stats['frames'] / max(elapsed, 1e-9):.1f} frames/s); "
+          f"{stats['failed']} unreadable, {skipped} skipped", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
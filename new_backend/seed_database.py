@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Fill an assessment database with synthetic parents, children and results
+so report queries can be measured against realistic table sizes
+
+Usage:
+    python seed_database.py --db loadtest.db --children 1000000
+    DATABASE_PATH=loadtest.db python load_test.py --seeded-users 1000000
+
+Every seeded parent can log in as seed<N>@example.com / loadtest123
+(N counts from 1). Never point this at the production assessment.db.
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+SEED_PASSWORD = 'loadtest123'
+AGE_GROUPS = ["0-1", "1-2", "2-3", "3-4", "4-5", "5-6"]
+QUESTION_CATEGORIES = ["scientific", "logical", "social", "creative"]
+PHYSICAL_TASK_NAMES = ["raise_hands", "one_leg", "turn_around", "stand_still", "frog_jump", "kangaroo_jump"]
+LINGUISTIC_TASK_NAMES = ["say_mama", "apple", "rhyme_cat", "fill_blank", "sentence_sun", "story_kite"]
+
+
+def seed_email(n):
+    return f"seed{n}@example.com"
+
+
+def prepare_schema(db_path):
+    """Create the schema exactly as the app does"""
+    os.environ['DATABASE_PATH'] = db_path
+    import app as backend
+    backend.DATABASE_PATH = db_path
+    backend.init_db()
+
+    conn = sqlite3.connect(db_path)
+    backend.create_detail_tables(conn.cursor())
+    conn.commit()
+    conn.close()
+
+
+def random_timestamp(rng, days_back):
+    moment = datetime.utcnow() - timedelta(seconds=rng.randint(0, days_back * 86400))
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def seed(db_path, children, results_per_child, children_per_parent, batch_size, days_back, seed_value):
+    rng = random.Random(seed_value)
+    password_hash = hashlib.sha256(SEED_PASSWORD.encode()).hexdigest()
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    # Bulk-load settings; the database is a throwaway copy
+    cursor.execute('PRAGMA journal_mode = OFF')
+    cursor.execute('PRAGMA synchronous = OFF')
+    cursor.execute('PRAGMA cache_size = -200000')
+
+    cursor.execute('SELECT COALESCE(MAX(id), 0) FROM users')
+    next_user_id = cursor.fetchone()[0] + 1
+    cursor.execute('SELECT COALESCE(MAX(id), 0) FROM children')
+    next_child_id = cursor.fetchone()[0] + 1
+    cursor.execute('SELECT COALESCE(MAX(id), 0) FROM assessment_results')
+    next_result_id = cursor.fetchone()[0] + 1
+    cursor.execute("SELECT COUNT(*) FROM users WHERE email LIKE 'seed%@example.com'")
+    seeded_so_far = cursor.fetchone()[0]
+
+    parents = max(1, children // children_per_parent)
+    start = time.perf_counter()
+    child_index = 0
+
+    for batch_start in range(0, parents, batch_size):
+        users, kids, results, questions, ai_tasks = [], [], [], [], []
+
+        for p in range(batch_start, min(parents, batch_start + batch_size)):
+            user_id = next_user_id
+            next_user_id += 1
+            users.append((user_id, seed_email(seeded_so_far + p + 1), password_hash,
+                          f"Seed Parent {seeded_so_far + p + 1}", random_timestamp(rng, days_back)))
+
+            kids_for_parent = children_per_parent if p < parents - 1 else children - child_index
+            for _ in range(max(1, kids_for_parent)):
+                child_id = next_child_id
+                next_child_id += 1
+                child_index += 1
+                age_group = rng.choice(AGE_GROUPS)
+                birth = datetime.utcnow() - timedelta(days=rng.randint(30, 6 * 365))
+                kids.append((child_id, user_id, f"Seed Child {child_id}", rng.choice(['male', 'female']),
+                             birth.strftime('%Y-%m-%d'), age_group, random_timestamp(rng, days_back)))
+
+                for _ in range(rng.randint(1, results_per_child * 2 - 1)):
+                    result_id = next_result_id
+                    next_result_id += 1
+                    completed_at = random_timestamp(rng, days_back)
+
+                    correct = [rng.random() < 0.6 for _ in QUESTION_CATEGORIES]
+                    physical_success = rng.randint(0, 8)
+                    linguistic_success = rng.randint(0, 3)
+                    physical_score = 1 if physical_success >= 5 else 0
+                    linguistic_score = 1 if linguistic_success >= 1 else 0
+                    intelligence_score = sum(correct)
+                    results.append((result_id, user_id, child_id, age_group, intelligence_score,
+                                    physical_score, linguistic_score,
+                                    intelligence_score + physical_score + linguistic_score, completed_at))
+
+                    for category, is_correct in zip(QUESTION_CATEGORIES, correct):
+                        questions.append((result_id, child_id, 'intelligence', f"{category}_{age_group}",
+                                          f"Seeded {category} question", 'Option A',
+                                          'Option A' if is_correct else 'Option B',
+                                          'true' if is_correct else 'false',
+                                          rng.randint(2, 30), 1, 1, completed_at))
+
+                    group_index = AGE_GROUPS.index(age_group)
+                    ai_tasks.append((result_id, child_id, 'physical_assessment', PHYSICAL_TASK_NAMES[group_index],
+                                     physical_success, physical_success + rng.randint(0, 3), rng.randint(10, 120),
+                                     0.0, 'Seeded physical task', 'true', 'false', completed_at))
+                    ai_tasks.append((result_id, child_id, 'linguistic_assessment', LINGUISTIC_TASK_NAMES[group_index],
+                                     linguistic_success, linguistic_success + rng.randint(0, 3), rng.randint(5, 60),
+                                     0.0, 'Seeded linguistic task', 'true', 'false', completed_at))
+
+        cursor.executemany('INSERT INTO users (id, email, password, parent_name, created_at) '
+                           'VALUES (?, ?, ?, ?, ?)', users)
+        cursor.executemany('INSERT INTO children (id, user_id, child_name, sex, birth_date, age_group, created_at) '
+                           'VALUES (?, ?, ?, ?, ?, ?, ?)', kids)
+        cursor.executemany('INSERT INTO assessment_results (id, user_id, child_id, age_group, intelligence_score, '
+                           'physical_score, linguistic_score, total_score, completed_at) '
+                           'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', results)
+        cursor.executemany('INSERT INTO question_responses (result_id, child_id, assessment_type, question_id, '
+                           'question_text, child_answer, correct_answer, is_correct, response_time_seconds, '
+                           'difficulty_level, attempts, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                           questions)
+        cursor.executemany('INSERT INTO ai_task_responses (result_id, child_id, task_type, task_name, success_count, '
+                           'total_attempts, completion_time_seconds, success_rate, ai_feedback, was_completed, '
+                           'was_skipped, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', ai_tasks)
+        conn.commit()
+
+        elapsed = time.perf_counter() - start
+        print(f"🌱 {child_index:,}/{children:,} children seeded ({child_index / elapsed:,.0f}/s)", file=sys.stderr)
+
+    # Give the query planner real statistics
+    cursor.execute('ANALYZE')
+    conn.commit()
+    conn.close()
+    return parents, child_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed an assessment database with synthetic data')
+    parser.add_argument('--db', default='loadtest.db', help='Database file to fill (default loadtest.db)')
+    parser.add_argument('--children', type=int, default=100000)
+    parser.add_argument('--results-per-child', type=int, default=2,
+                        help='Average number of assessment attempts per child')
+    parser.add_argument('--children-per-parent', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=5000, help='Parents per transaction')
+    parser.add_argument('--days-back', type=int, default=365, help='Spread timestamps over this many days')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if os.path.basename(args.db) == 'assessment.db':
+        print("❌ Refusing to seed assessment.db - use a separate database file", file=sys.stderr)
+        return 1
+
+    prepare_schema(args.db)
+    parents, children = seed(args.db, args.children, max(1, args.results_per_child),
+                             max(1, args.children_per_parent), args.batch_size, args.days_back, args.seed)
+    print(f"✅ Seeded {parents:,} parents and {children:,} children into {args.db}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
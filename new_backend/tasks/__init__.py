@@ -1,35 +1,27 @@
 """
 Enhanced Tasks Package for Child Assessment
 Provides advanced physical and linguistic assessment capabilities
+Task classes are imported on first access (see registry), not at startup
 """
 
 from .enhanced_task_manager import get_task_manager, EnhancedTaskManager
+from .registry import TASK_SPECS
 
-# Try to import individual tasks (they may fail if dependencies are missing)
-try:
-    from .physical_0_raise_hands import RaiseHandsTask
-except ImportError:
-    RaiseHandsTask = None
+_TASK_SPECS_BY_CLASS = {spec.class_name: spec for spec in TASK_SPECS if spec.implemented}
 
-try:
-    from .physical_1_one_leg_balance import OneLegBalanceTask
-except ImportError:
-    OneLegBalanceTask = None
 
-try:
-    from .physical_4_frog_jump import FrogJumpTask
-except ImportError:
-    FrogJumpTask = None
+def __getattr__(name):
+    spec = _TASK_SPECS_BY_CLASS.get(name)
+    if spec is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # A task whose dependencies are missing is None, as before
+    try:
+        cls = spec.load_class()
+    except ImportError:
+        cls = None
+    globals()[name] = cls
+    return cls
 
-try:
-    from .linguistic_0_say_mama import SayMamaTask
-except ImportError:
-    SayMamaTask = None
-
-try:
-    from .linguistic_5_story_kite import StoryKiteTask
-except ImportError:
-    StoryKiteTask = None
 
 __all__ = [
     'get_task_manager',
@@ -3,151 +3,122 @@ Enhanced Task Manager for Physical and Linguistic Assessments
 Coordinates individual task modules and provides unified API
 """
 
-import os
-import sys
-import importlib
 from datetime import datetime
 import json
+import threading
+from collections import OrderedDict
+
+import config
+from .profiling import profile_section
+from .pose_scheduler import PoseBatchScheduler, MEDIAPIPE_AVAILABLE
+from .frame_pacing import FramePacer
+from .frame_preprocess import FrameIngest
+from .motion_gate import MotionGate
+from .registry import LazyTasks, resources_state, spec_for
 
 class EnhancedTaskManager:
     def __init__(self):
-        self.physical_tasks = {}
-        self.linguistic_tasks = {}
-        self.task_modules = {}
         self.current_tasks = {}
         
-        # Load all available task modules
-        self._load_task_modules()
-    
-    def _load_task_modules(self):
-        """
-        Dynamically load all task modules from the tasks directory
-        """
-        tasks_dir = os.path.dirname(__file__)
-        
-        # Load physical tasks
-        physical_files = [f for f in os.listdir(tasks_dir) if f.startswith('physical_') and f.endswith('.py')]
-        for filename in physical_files:
-            try:
-                module_name = filename[:-3]  # Remove .py
-                module_path = f'tasks.{module_name}'
-                
-                # Import the module
-                module = importlib.import_module(module_path)
-                
-                # Find the task class (should be named like RaiseHandsTask, OneLegBalanceTask, etc.)
-                for attr_name in dir(module):
-                    attr = getattr(module, attr_name)
-                    if (isinstance(attr, type) and 
-                        hasattr(attr, 'task_name') and 
-                        hasattr(attr, 'process_frame')):
-                        
-                        # Create instance and store
-                        task_instance = attr()
-                        task_info = task_instance.get_task_info()
-                        age_group = task_info['age_group']
-                        
-                        self.physical_tasks[age_group] = task_instance
-                        self.task_modules[task_info['task_name']] = module
-                        print(f"✅ Loaded physical task: {task_info['task_name']} (Age {age_group})")
-                        break
-                        
-            except Exception as e:
-                print(f"⚠️  Failed to load physical task {filename}: {e}")
+        # Pose inference for every session goes through one micro-batching
+        # scheduler; tasks then only hold per-session scoring state
+        self.pose_scheduler = PoseBatchScheduler() if config.POSE_BATCHING and MEDIAPIPE_AVAILABLE else None
+        self.session_tasks = OrderedDict()
+        self.motion_gates = {}
+        self._session_lock = threading.Lock()
+        self.frame_pacer = FramePacer() if config.FRAME_PACING else None
         
-        # Load linguistic tasks
-        linguistic_files = [f for f in os.listdir(tasks_dir) if f.startswith('linguistic_') and f.endswith('.py')]
-        for filename in linguistic_files:
-            try:
-                module_name = filename[:-3]  # Remove .py
-                module_path = f'tasks.{module_name}'
-                
-                # Import the module
-                module = importlib.import_module(module_path)
-                
-                # Find the task class
-                for attr_name in dir(module):
-                    attr = getattr(module, attr_name)
-                    if (isinstance(attr, type) and 
-                        hasattr(attr, 'task_name') and 
-                        hasattr(attr, 'process_audio')):
-                        
-                        # Create instance and store
-                        task_instance = attr()
-                        task_info = task_instance.get_task_info()
-                        age_group = task_info['age_group']
-                        
-                        self.linguistic_tasks[age_group] = task_instance
-                        self.task_modules[task_info['task_name']] = module
-                        print(f"✅ Loaded linguistic task: {task_info['task_name']} (Age {age_group})")
-                        break
-                        
-            except Exception as e:
-                print(f"⚠️  Failed to load linguistic task {filename}: {e}")
+        # Tasks come from the declarative registry and are built on first use
+        self.physical_tasks = LazyTasks('physical', lambda cls: cls(create_pose=self.pose_scheduler is None))
+        self.linguistic_tasks = LazyTasks('linguistic', lambda cls: cls())
     
     def get_physical_task(self, age_group):
         """
         Get physical task for specific age group
         """
-        if age_group in self.physical_tasks:
-            task = self.physical_tasks[age_group]
+        task = self.physical_tasks.get(age_group)
+        if task is not None:
             return {
                 'available': True,
                 'task_info': task.get_task_info(),
                 'instance': task
             }
-        else:
-            # Fallback to basic task info
-            basic_tasks = {
-                "0-1": {"task": "raise_hands", "title": "Can baby raise both hands high?", "icon": "🖐️"},
-                "1-2": {"task": "one_leg", "title": "Can you stand on one leg?", "icon": "🦵"},
-                "2-3": {"task": "turn_around", "title": "Can you turn around in a circle?", "icon": "🔄"},
-                "3-4": {"task": "stand_still", "title": "Can you stand very still?", "icon": "🧘"},
-                "4-5": {"task": "frog_jump", "title": "Can you do a frog jump?", "icon": "🐸"},
-                "5-6": {"task": "kangaroo_jump", "title": "Can you do kangaroo jumps?", "icon": "🦘"}
-            }
-            
-            if age_group in basic_tasks:
-                return {
-                    'available': False,
-                    'task_info': basic_tasks[age_group],
-                    'instance': None
-                }
-            else:
-                return None
+        
+        # Fallback to basic task info
+        spec = spec_for('physical', age_group)
+        if spec is None:
+            return None
+        return {
+            'available': False,
+            'task_info': spec.basic_info(),
+            'instance': None
+        }
     
     def get_linguistic_task(self, age_group):
         """
         Get linguistic task for specific age group
         """
-        if age_group in self.linguistic_tasks:
-            task = self.linguistic_tasks[age_group]
+        task = self.linguistic_tasks.get(age_group)
+        if task is not None:
             return {
                 'available': True,
                 'task_info': task.get_task_info(),
                 'instance': task
             }
-        else:
-            # Fallback to basic task info
-            basic_tasks = {
-                "0-1": {"task": "say_mama", "title": "Say 'ma‑ma'", "icon": "👶", "target_words": ["ma", "mama"]},
-                "1-2": {"task": "apple", "title": "Say 'apple'", "icon": "🍎", "target_words": ["apple"]},
-                "2-3": {"task": "rhyme_cat", "title": "What rhymes with 'cat'?", "icon": "🐱", "target_words": ["bat", "hat", "mat"]},
-                "3-4": {"task": "fill_blank", "title": "Fill in the blank: 'The sun is ___'", "icon": "☀️", "target_words": ["bright", "hot", "yellow"]},
-                "4-5": {"task": "sentence_sun", "title": "Make a sentence about the sun", "icon": "🌞", "target_words": ["sun", "bright"]},
-                "5-6": {"task": "story_kite", "title": "Tell a short story about a kite", "icon": "🪁", "target_words": ["kite", "fly"]}
-            }
+        
+        # Fallback to basic task info
+        spec = spec_for('linguistic', age_group)
+        if spec is None:
+            return None
+        return {
+            'available': False,
+            'task_info': spec.basic_info(),
+            'instance': None
+        }
+    
+    def _session_task(self, age_group, task_type, session_id):
+        """
+        Task instance holding one session's progress
+        Requests without a session_id share the age group's default instance.
+        Linguistic tasks each load a speech model, so they stay shared.
+        """
+        tasks = self.physical_tasks if task_type == 'physical' else self.linguistic_tasks
+        if age_group not in tasks:
+            return None
+        if not session_id or task_type != 'physical':
+            return tasks[age_group]
+        
+        key = (age_group, session_id)
+        with self._session_lock:
+            task = self.session_tasks.get(key)
+            if task is not None:
+                self.session_tasks.move_to_end(key)
+                return task
             
-            if age_group in basic_tasks:
-                return {
-                    'available': False,
-                    'task_info': basic_tasks[age_group],
-                    'instance': None
-                }
-            else:
-                return None
+            task = type(tasks[age_group])(create_pose=self.pose_scheduler is None)
+            self.session_tasks[key] = task
+            evicted = []
+            while len(self.session_tasks) > max(1, config.MAX_TASK_SESSIONS):
+                old_key = self.session_tasks.popitem(last=False)[0]
+                self.motion_gates.pop(old_key, None)
+                evicted.append(old_key)
+        
+        if self.pose_scheduler:
+            for old_key in evicted:
+                self.pose_scheduler.drop_session(old_key)
+        return task
+    
+    def _motion_gate(self, age_group, session_id, task):
+        """Motion gate for a session of a hold-still task (None when not gated)"""
+        if not (config.MOTION_GATE and session_id and getattr(task, 'motion_gated', False)):
+            return None
+        with self._session_lock:
+            gate = self.motion_gates.get((age_group, session_id))
+            if gate is None:
+                gate = self.motion_gates[(age_group, session_id)] = MotionGate()
+            return gate
     
-    def process_physical_frame(self, age_group, frame_data):
+    def process_physical_frame(self, age_group, frame_data, session_id=None):
         """
         Process a frame for physical assessment
         """
@@ -160,36 +131,65 @@ class EnhancedTaskManager:
                 'age_group': age_group
             }
         
+        # Refuse frames from a session that is sending faster than recommended
+        pace_key = (age_group, session_id) if session_id else None
+        if self.frame_pacer:
+            retry_after = self.frame_pacer.admit(pace_key)
+            if retry_after is not None:
+                return {
+                    'throttled': True,
+                    'retry_after_ms': retry_after,
+                    'next_frame_interval_ms': self.frame_pacer.retry_interval(pace_key),
+                    'message': 'Frame arrived too soon',
+                    'age_group': age_group
+                }
+        
+        task_instance = None
         try:
-            task_instance = task_info['instance']
-            
-            # Convert frame_data to cv2 format if needed
-            import cv2
-            import numpy as np
-            import base64
+            task_instance = self._session_task(age_group, 'physical', session_id)
             
-            if isinstance(frame_data, str):
-                # Decode base64 frame
-                img_data = base64.b64decode(frame_data.split('base64,')[1])
-                np_array = np.frombuffer(img_data, np.uint8)
-                frame = cv2.imdecode(np_array, cv2.IMREAD_COLOR)
-            else:
-                frame = frame_data
+            # Decode once (at reduced scale for large JPEGs); a FrameIngest from the
+            # caller keeps the decoded frame for its fallback path
+            ingest = frame_data if isinstance(frame_data, FrameIngest) else FrameIngest(frame_data)
+            with profile_section('frame_decode'):
+                frame = ingest.frame
             
             # Process the frame
-            result = task_instance.process_frame(frame)
+            if self.pose_scheduler:
+                tier = self.pose_scheduler.tier_for(getattr(task_instance, 'model_complexity', None))
+                gate = self._motion_gate(age_group, session_id, task_instance)
+                pose_reused = gate is not None and gate.should_skip(frame)
+                if pose_reused:
+                    landmarks = gate.landmarks
+                else:
+                    with profile_section('pose_inference'):
+                        landmarks = self.pose_scheduler.infer((age_group, session_id), frame, tier)
+                    if gate is not None:
+                        gate.remember(landmarks)
+                with profile_section(f"process_landmarks:{task_info['task_info']['task_name']}"):
+                    result = task_instance.process_landmarks(landmarks)
+                result['pose_reused'] = pose_reused
+            else:
+                tier = getattr(task_instance, 'model_complexity', None)
+                with profile_section(f"process_frame:{task_info['task_info']['task_name']}"):
+                    result = task_instance.process_frame(frame)
+            result['model_complexity'] = tier
             result['enhanced'] = True
             result['age_group'] = age_group
             result['task_name'] = task_info['task_info']['task_name']
             
-            return result
-            
         except Exception as e:
-            return {
+            result = {
                 'error': f'Physical processing error: {str(e)}',
                 'fallback': True,
                 'age_group': age_group
             }
+        
+        if self.frame_pacer:
+            hint = getattr(task_instance, 'recommended_frame_interval', None)
+            result['next_frame_interval_ms'] = self.frame_pacer.finish(pace_key, hint() if hint else None)
+        
+        return result
     
     def process_linguistic_audio(self, age_group, audio_data):
         """
@@ -234,44 +234,52 @@ class EnhancedTaskManager:
             'total_linguistic': len(self.linguistic_tasks)
         }
         
-        for age_group, task in self.physical_tasks.items():
-            task_info = task.get_task_info()
-            summary['physical_tasks'][age_group] = {
-                'name': task_info['task_name'],
-                'title': task_info['title'],
-                'icon': task_info['icon'],
-                'available': task_info['available']
-            }
-        
-        for age_group, task in self.linguistic_tasks.items():
-            task_info = task.get_task_info()
-            summary['linguistic_tasks'][age_group] = {
-                'name': task_info['task_name'],
-                'title': task_info['title'],
-                'icon': task_info['icon'],
-                'available': task_info['available']
-            }
+        # Listing tasks must not build them; unbuilt ones are described from the registry
+        for domain, tasks in (('physical', self.physical_tasks), ('linguistic', self.linguistic_tasks)):
+            for age_group in tasks:
+                task = tasks.loaded(age_group)
+                if task is not None:
+                    task_info = task.get_task_info()
+                    entry = {
+                        'name': task_info['task_name'],
+                        'title': task_info['title'],
+                        'icon': task_info['icon'],
+                        'available': task_info['available']
+                    }
+                else:
+                    spec = tasks.specs[age_group]
+                    entry = {
+                        'name': spec.name,
+                        'title': spec.title,
+                        'icon': spec.icon,
+                        'available': spec.resources_available()
+                    }
+                summary[f'{domain}_tasks'][age_group] = entry
         
         return summary
     
-    def reset_task(self, age_group, task_type):
+    def tasks_version(self):
+        """Changes whenever get_all_available_tasks() could return something different"""
+        return self.physical_tasks.version, self.linguistic_tasks.version, resources_state()
+    
+    def reset_task(self, age_group, task_type, session_id=None):
         """
         Reset a specific task for a new attempt
         """
-        if task_type == 'physical' and age_group in self.physical_tasks:
-            self.physical_tasks[age_group].reset()
-            return True
-        elif task_type == 'linguistic' and age_group in self.linguistic_tasks:
-            self.linguistic_tasks[age_group].reset()
-            return True
-        return False
+        if task_type not in ('physical', 'linguistic'):
+            return False
+        task = self._session_task(age_group, task_type, session_id)
+        if task is None:
+            return False
+        task.reset()
+        return True
     
-    def get_task_progress(self, age_group, task_type):
+    def get_task_progress(self, age_group, task_type, session_id=None):
         """
         Get progress information for a specific task
         """
         if task_type == 'physical' and age_group in self.physical_tasks:
-            task = self.physical_tasks[age_group]
+            task = self._session_task(age_group, 'physical', session_id)
             return {
                 'success_count': task.success_count,
                 'total_attempts': task.total_attempts,
@@ -0,0 +1,87 @@
+"""
+Adaptive frame pacing for physical assessments
+Each response tells the client when to send its next frame: the task's own
+hint for its current phase, stretched when frames are backing up. Sessions
+that send faster than that are refused until the interval has (mostly)
+passed, so a slow client never builds up a queue in front of pose inference.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import config
+from .metrics import metrics
+
+
+class FramePacer:
+    def __init__(self, min_ms=None, max_ms=None, early_tolerance=None, max_sessions=None,
+                 workers=None, registry=None):
+        self.min_ms = config.FRAME_INTERVAL_MIN_MS if min_ms is None else min_ms
+        self.max_ms = config.FRAME_INTERVAL_MAX_MS if max_ms is None else max_ms
+        self.early_tolerance = config.FRAME_EARLY_TOLERANCE if early_tolerance is None else early_tolerance
+        self.max_sessions = max(1, config.MAX_TASK_SESSIONS if max_sessions is None else max_sessions)
+        self.workers = max(1, config.POSE_INFERENCE_WORKERS if workers is None else workers)
+        self.metrics = registry or metrics
+
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        # session_key -> [accepted_at, interval_ms, busy]
+        self.sessions = OrderedDict()
+
+    def recommend(self, hint_ms=None):
+        """Interval for the next frame given the task hint and current load"""
+        hint = config.FRAME_INTERVAL_DEFAULT_MS if hint_ms is None else hint_ms
+        # Every frame beyond one per worker is waiting for inference
+        load = max(1.0, self.in_flight / self.workers)
+        return int(min(self.max_ms, max(self.min_ms, hint * load)))
+
+    def admit(self, session_key=None):
+        """
+        Start processing a frame
+        Returns None to go ahead, or the milliseconds the session should wait.
+        Frames without a session are always admitted (nothing to pace against).
+        """
+        now = time.perf_counter()
+        with self.lock:
+            if session_key is not None:
+                state = self.sessions.get(session_key)
+                if state is not None:
+                    accepted_at, interval_ms, busy = state
+                    earliest = accepted_at + interval_ms * self.early_tolerance / 1000.0
+                    if busy:
+                        # Previous frame still in inference - don't queue behind it
+                        self.metrics.incr('frame_pacing.refused')
+                        return interval_ms or config.FRAME_INTERVAL_DEFAULT_MS
+                    if now < earliest:
+                        self.metrics.incr('frame_pacing.refused')
+                        return max(1, int(math.ceil((earliest - now) * 1000)))
+                    self.sessions.move_to_end(session_key)
+                    state[0], state[2] = now, True
+                else:
+                    self.sessions[session_key] = [now, 0, True]
+                    while len(self.sessions) > self.max_sessions:
+                        self.sessions.popitem(last=False)
+            self.in_flight += 1
+            self.metrics.gauge('frame_pacing.in_flight', self.in_flight)
+        self.metrics.incr('frame_pacing.admitted')
+        return None
+
+    def finish(self, session_key=None, hint_ms=None):
+        """Finish an admitted frame; returns the recommended next interval"""
+        with self.lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            interval = self.recommend(hint_ms)
+            state = self.sessions.get(session_key) if session_key is not None else None
+            if state is not None:
+                state[1], state[2] = interval, False
+            self.metrics.gauge('frame_pacing.in_flight', self.in_flight)
+        self.metrics.observe('frame_pacing.interval_ms', interval)
+        return interval
+
+    def retry_interval(self, session_key):
+        """Interval last recommended to a session"""
+        with self.lock:
+            state = self.sessions.get(session_key)
+            return state[1] if state and state[1] else config.FRAME_INTERVAL_DEFAULT_MS
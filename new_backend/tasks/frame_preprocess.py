@@ -0,0 +1,212 @@
+"""
+Frame preprocessing ahead of pose inference
+- FrameIngest holds one request's frame and decodes it at most once, on
+  first use, so the enhanced pipeline and the basic fallback share it and
+  frames refused by pacing are never decoded.
+- to_rgb() converts into a per-thread buffer reused from frame to frame
+  instead of allocating a fresh RGB copy for every MediaPipe call.
+- JPEGs are decoded at reduced scale (IMREAD_REDUCED_COLOR_2/4/8) as long as
+  the long side stays at or above FRAME_DECODE_MIN_SIDE. The pose model
+  only sees 256px anyway, so the full-size decode is mostly wasted work;
+  it stays off (0) by default until landmarks from full-size and reduced
+  decodes have been compared on recorded frames.
+- RoiTracker crops later frames to the last detected person's bounding box
+  plus a motion margin, and maps the landmarks back to full-frame
+  coordinates so the task rules see exactly what they saw before.
+"""
+
+import base64
+import threading
+
+import cv2
+import numpy as np
+
+import config
+from .landmark_array import X, Y, Z, VIS
+
+# Largest reduction first
+REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2)
+)
+
+# JPEG start-of-frame markers carrying the image size
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_size(data):
+    """(width, height) from a JPEG header without decoding, or None"""
+    view = memoryview(data)
+    if len(view) < 4 or view[0] != 0xFF or view[1] != 0xD8:
+        return None
+    i = 2
+    while i + 9 < len(view):
+        if view[i] != 0xFF:
+            return None
+        marker = view[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        length = (view[i + 2] << 8) | view[i + 3]
+        if marker in _SOF_MARKERS:
+            height = (view[i + 5] << 8) | view[i + 6]
+            width = (view[i + 7] << 8) | view[i + 8]
+            return width, height
+        i += 2 + length
+    return None
+
+
+def decode_flag(data, min_side=None):
+    """Smallest-scale imdecode flag that keeps the long side >= min_side"""
+    min_side = config.FRAME_DECODE_MIN_SIDE if min_side is None else min_side
+    if min_side <= 0:
+        return cv2.IMREAD_COLOR
+    size = jpeg_size(data)
+    if size is None:
+        return cv2.IMREAD_COLOR
+    long_side = max(size)
+    for factor, flag in REDUCED_DECODE_FLAGS:
+        if long_side // factor >= min_side:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def decode_image(data, min_side=None):
+    """Decode encoded image bytes to BGR at the smallest useful scale"""
+    buffer = np.frombuffer(data, np.uint8)
+    frame = cv2.imdecode(buffer, decode_flag(buffer, min_side))
+    if frame is None:
+        raise ValueError("Failed to decode image")
+    return frame
+
+
+def decode_data_url(frame_data, min_side=None):
+    """Decode a base64 data URL (or bare base64) frame"""
+    data = frame_data.split(',', 1)[1] if ',' in frame_data else frame_data
+    return decode_image(base64.b64decode(data), min_side)
+
+
+class FrameIngest:
+    """
+    A request's frame: data URL, bare base64, encoded bytes or a BGR array
+    .frame decodes on first access and keeps the result (or the error)
+    """
+    __slots__ = ('source', 'min_side', '_frame', '_error')
+
+    def __init__(self, source, min_side=None):
+        self.source = source
+        self.min_side = min_side
+        self._frame = None
+        self._error = None
+
+    @property
+    def decoded(self):
+        return self._frame is not None
+
+    @property
+    def frame(self):
+        if self._frame is None:
+            if self._error is not None:
+                raise self._error
+            try:
+                if isinstance(self.source, np.ndarray):
+                    self._frame = self.source
+                elif isinstance(self.source, (bytes, bytearray, memoryview)):
+                    self._frame = decode_image(self.source, self.min_side)
+                else:
+                    self._frame = decode_data_url(self.source, self.min_side)
+            except Exception as e:
+                self._error = ValueError(f"Frame decode error: {str(e)}")
+                raise self._error
+            self.source = None  # The encoded copy is no longer needed
+        return self._frame
+
+
+_buffers = threading.local()
+
+
+def to_rgb(frame):
+    """
+    BGR -> RGB into this thread's reusable buffer
+    Valid until the thread's next call; MediaPipe copies its input, so
+    passing the result straight to process() is safe
+    """
+    buffer = getattr(_buffers, 'rgb', None)
+    if buffer is None or buffer.shape != frame.shape:
+        buffer = _buffers.rgb = np.empty(frame.shape, dtype=np.uint8)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=buffer)
+
+
+class RoiTracker:
+    """
+    Crop window around the person for one session
+    The window only moves when the person nears its edge, so consecutive
+    frames usually share one crop and MediaPipe's own tracking stays valid.
+    A graph that is handed a different window must be reset first: its
+    tracking state is in the previous window's coordinates.
+    """
+
+    def __init__(self, margin=None, full_frame_fraction=0.8, visibility=0.3):
+        self.margin = config.POSE_ROI_MARGIN if margin is None else margin
+        self.full_frame_fraction = full_frame_fraction
+        self.visibility = visibility
+        self.window = None  # (x0, y0, x1, y1) normalized, None = full frame
+        self.graph_window = None  # Window the session's graph last ran on (it starts on the full frame)
+
+    def crop(self, frame):
+        """Return (image to run pose on, window used)"""
+        if self.window is None:
+            return frame, None
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = self.window
+        left, top = int(x0 * width), int(y0 * height)
+        right, bottom = max(left + 1, int(round(x1 * width))), max(top + 1, int(round(y1 * height)))
+        # Snap the window to whole pixels so the remap is exact
+        window = (left / width, top / height, right / width, bottom / height)
+        return frame[top:bottom, left:right], window
+
+    def switch_window(self, window):
+        """Record that the session's graph now runs on window; True if it ran on another one"""
+        previous, self.graph_window = self.graph_window, window
+        return previous != window
+
+    @staticmethod
+    def remap(arr, window):
+        """Map crop-normalized landmarks back to full-frame coordinates"""
+        if arr is None or window is None:
+            return arr
+        x0, y0, x1, y1 = window
+        out = arr.copy()
+        out[:, X] = arr[:, X] * (x1 - x0) + x0
+        out[:, Y] = arr[:, Y] * (y1 - y0) + y0
+        out[:, Z] = arr[:, Z] * (x1 - x0)  # z shares the x scale
+        return out
+
+    def update(self, arr):
+        """Move the window after a frame; arr is full-frame landmarks or None"""
+        if arr is None:
+            self.window = None
+            return
+        visible = arr[arr[:, VIS] >= self.visibility]
+        if len(visible) < 2:
+            self.window = None
+            return
+
+        bx0, by0 = visible[:, X].min(), visible[:, Y].min()
+        bx1, by1 = visible[:, X].max(), visible[:, Y].max()
+        if self.window is not None:
+            x0, y0, x1, y1 = self.window
+            pad_x, pad_y = (x1 - x0) * self.margin / 2, (y1 - y0) * self.margin / 2
+            # Still comfortably inside the current crop - keep it
+            if bx0 >= x0 + pad_x and by0 >= y0 + pad_y and bx1 <= x1 - pad_x and by1 <= y1 - pad_y:
+                return
+
+        pad = max(bx1 - bx0, by1 - by0) * self.margin
+        window = (max(0.0, float(bx0 - pad)), max(0.0, float(by0 - pad)),
+                  min(1.0, float(bx1 + pad)), min(1.0, float(by1 + pad)))
+        area = (window[2] - window[0]) * (window[3] - window[1])
+        self.window = None if area >= self.full_frame_fraction else window
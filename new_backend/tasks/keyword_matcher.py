@@ -0,0 +1,103 @@
+"""
+Compiled keyword matching for transcript analysis
+A task's vocabularies (category -> words or short phrases) are compiled
+once into a single lookup table. Analysing a transcript is then one
+tokenizing pass with a hash lookup per token, whatever the number of
+categories, and it matches whole words only, so "fly" is no longer found
+inside "butterfly".
+
+Tokens that miss the table get a second lookup with a common suffix
+stripped ("kites", "pulled", "running" -> kite, pull, run), so inflected
+words still count the way the old substring scans allowed.
+"""
+
+import re
+
+TOKEN = re.compile(r"[a-z0-9']+")
+PLAIN = re.compile(r"[a-z0-9' ]*")
+SUFFIXES = ('ing', 'es', 'ed', 's')
+MAX_CACHED_TOKENS = 10000
+
+
+def tokenize(text):
+    if not text:
+        return []
+    text = text.lower()
+    # Vosk transcripts are already plain words and spaces
+    return text.split() if PLAIN.fullmatch(text) else TOKEN.findall(text)
+
+
+def _stems(token):
+    """Candidate base forms of a token, most literal first"""
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            stem = token[:-len(suffix)]
+            yield stem
+            if len(stem) >= 3 and stem[-1] == stem[-2]:
+                yield stem[:-1]  # running -> runn -> run
+
+
+class KeywordMatcher:
+    def __init__(self, categories):
+        self.categories = tuple(categories)
+        self.table = {}  # word or phrase -> categories it belongs to
+        self.longest = 1
+        for category, words in categories.items():
+            for word in words:
+                key = ' '.join(tokenize(word))
+                if not key:
+                    continue
+                self.table.setdefault(key, []).append(category)
+                self.longest = max(self.longest, key.count(' ') + 1)
+        self.table = {key: tuple(cats) for key, cats in self.table.items()}
+        self.cache = {}  # token -> lookup() result; children's vocabularies are small
+
+    def lookup(self, token):
+        """(vocabulary word, categories) for a token, or (None, ())"""
+        categories = self.table.get(token)
+        if categories:
+            return token, categories
+        for stem in _stems(token):
+            categories = self.table.get(stem)
+            if categories:
+                return stem, categories
+        return None, ()
+
+    def analyze(self, text):
+        """
+        One pass over a transcript: {'tokens', 'counts', 'matches'}
+        counts and matches are per category and hold distinct vocabulary words
+        """
+        tokens = tokenize(text)
+        found = {category: {} for category in self.categories}  # Insertion-ordered sets
+        cache = self.cache
+        for token in dict.fromkeys(tokens):  # Each distinct token once, in order
+            hit = cache.get(token)
+            if hit is None:
+                hit = self.lookup(token)
+                if len(cache) < MAX_CACHED_TOKENS:
+                    cache[token] = hit
+            word, categories = hit
+            for category in categories:
+                found[category][word] = None
+        if self.longest > 1:
+            for i in range(len(tokens) - 1):
+                for length in range(2, min(self.longest, len(tokens) - i) + 1):
+                    phrase = ' '.join(tokens[i:i + length])
+                    for category in self.table.get(phrase, ()):
+                        found[category][phrase] = None
+        return {
+            'tokens': tokens,
+            'counts': {category: len(words) for category, words in found.items()},
+            'matches': {category: list(words) for category, words in found.items()}
+        }
+
+    def analyze_batch(self, texts):
+        """analyze() for many transcripts; repeats are analysed once and share a result"""
+        seen = {}
+        results = []
+        for text in texts:
+            if text not in seen:
+                seen[text] = self.analyze(text)
+            results.append(seen[text])
+        return results
@@ -0,0 +1,237 @@
+"""
+Compact landmark representation shared by the pose task logic
+A frame's pose is a (33, 4) float32 array of x, y, z, visibility built once
+per frame. Every rule below is a vectorized mask over (..., 33, 4), so the
+same code scores one frame, a whole recorded sequence or a batch of
+sessions at once.
+
+Rules evaluate in float64 with the same operation order as the original
+per-attribute code, so results are bit-for-bit identical (see pose_corpus).
+"""
+
+import numpy as np
+
+LANDMARK_COUNT = 33
+
+# Columns
+X, Y, Z, VIS = 0, 1, 2, 3
+
+# MediaPipe PoseLandmark indices (mirrored so no MediaPipe import is needed)
+NOSE = 0
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_ELBOW, RIGHT_ELBOW = 13, 14
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+LEFT_HIP, RIGHT_HIP = 23, 24
+LEFT_KNEE, RIGHT_KNEE = 25, 26
+LEFT_ANKLE, RIGHT_ANKLE = 27, 28
+LEFT_HEEL, RIGHT_HEEL = 29, 30
+
+VISIBILITY_THRESHOLD = 0.5
+
+# Leg codes returned by leg_lift()
+NO_LEG, LEFT_LEG, RIGHT_LEG = 0, 1, 2
+LEG_NAMES = {NO_LEG: None, LEFT_LEG: 'left', RIGHT_LEG: 'right'}
+
+
+def to_landmark_array(landmarks, out=None):
+    """
+    Build the (33, 4) float32 array for one frame
+    Accepts MediaPipe pose landmarks (anything with a .landmark list) or an
+    existing array, which is returned unchanged. Pass out= to reuse a buffer.
+    """
+    if landmarks is None:
+        return None
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    values = [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks.landmark]
+    if out is None:
+        return np.array(values, dtype=np.float32)
+    out[:] = values
+    return out
+
+
+def stack_landmarks(frames):
+    """
+    Stack per-frame landmarks into an (N, 33, 4) batch
+    Frames without a person (None) become zero rows with visibility 0, which
+    every rule treats as not visible.
+    """
+    batch = np.zeros((len(frames), LANDMARK_COUNT, 4), dtype=np.float32)
+    for i, frame in enumerate(frames):
+        if frame is None:
+            continue
+        if isinstance(frame, np.ndarray):
+            batch[i] = frame
+        else:
+            to_landmark_array(frame, out=batch[i])
+    return batch
+
+
+def _f64(arr):
+    return np.asarray(arr, dtype=np.float64)
+
+
+def visible(arr, indices, threshold=VISIBILITY_THRESHOLD):
+    """True where every listed landmark is at least `threshold` visible"""
+    return (_f64(arr)[..., indices, VIS] >= threshold).all(axis=-1)
+
+
+def mean_visibility(arr):
+    return _f64(arr)[..., VIS].mean(axis=-1)
+
+
+def _mid(a, left, right, column=Y):
+    return (a[..., left, column] + a[..., right, column]) / 2
+
+
+# ---------------------------------------------------------------------------
+# Task rules
+# ---------------------------------------------------------------------------
+
+RAISE_HANDS_LANDMARKS = [LEFT_WRIST, RIGHT_WRIST, NOSE, LEFT_SHOULDER, RIGHT_SHOULDER]
+
+
+def raised_hands(arr, confidence_threshold=0.7, head_threshold=0.08):
+    """
+    Weighted raised-hands score (RaiseHandsTask)
+    Returns (detected, confidence) arrays over the batch shape
+    """
+    a = _f64(arr)
+    nose_y = a[..., NOSE, Y]
+    lw, rw = a[..., LEFT_WRIST, :], a[..., RIGHT_WRIST, :]
+    ls, rs = a[..., LEFT_SHOULDER, :], a[..., RIGHT_SHOULDER, :]
+
+    # Factor 1: wrists above nose (40%)
+    both_above_head = (lw[..., Y] < (nose_y - head_threshold)) & (rw[..., Y] < (nose_y - head_threshold))
+    # Factor 2: wrists above shoulders (30%)
+    both_above_shoulders = (lw[..., Y] < ls[..., Y]) & (rw[..., Y] < rs[..., Y])
+    # Factor 3: arms extended upward, not out to the side (20%)
+    arms_extended = (np.abs(lw[..., X] - ls[..., X]) < 0.2) & (np.abs(rw[..., X] - rs[..., X]) < 0.2)
+    # Factor 4: both hands at a similar height (10%)
+    symmetric = np.abs(lw[..., Y] - rw[..., Y]) < 0.1
+
+    # Accumulate in the same order as the per-factor sum for identical rounding
+    confidence = np.where(both_above_head, 0.4, 0.0)
+    confidence = confidence + np.where(both_above_shoulders, 0.3, 0.0)
+    confidence = confidence + np.where(arms_extended, 0.2, 0.0)
+    confidence = confidence + np.where(symmetric, 0.1, 0.0)
+
+    ok = visible(a, RAISE_HANDS_LANDMARKS)
+    confidence = np.where(ok, confidence, 0.0)
+    return ok & (confidence >= confidence_threshold), confidence
+
+
+LEG_LIFT_LANDMARKS = [LEFT_HIP, RIGHT_HIP, LEFT_KNEE, RIGHT_KNEE,
+                      LEFT_ANKLE, RIGHT_ANKLE, LEFT_HEEL, RIGHT_HEEL]
+
+
+def leg_lift(arr, knee_lift_threshold=0.1, ankle_lift_threshold=0.15):
+    """
+    One-leg balance detection (OneLegBalanceTask)
+    Returns (detected, confidence, leg) arrays; leg holds the supporting
+    leg as NO_LEG / LEFT_LEG / RIGHT_LEG
+    """
+    a = _f64(arr)
+    avg_hip_y = _mid(a, LEFT_HIP, RIGHT_HIP)
+
+    left_knee_lift = avg_hip_y - a[..., LEFT_KNEE, Y]
+    right_knee_lift = avg_hip_y - a[..., RIGHT_KNEE, Y]
+    left_ankle_lift = avg_hip_y - a[..., LEFT_ANKLE, Y]
+    right_ankle_lift = avg_hip_y - a[..., RIGHT_ANKLE, Y]
+
+    left_raised = (left_knee_lift > knee_lift_threshold) & (left_ankle_lift > ankle_lift_threshold)
+    right_raised = (right_knee_lift > knee_lift_threshold) & (right_ankle_lift > ankle_lift_threshold)
+
+    # Supporting leg should be roughly vertical
+    left_straight = np.abs(a[..., LEFT_KNEE, X] - a[..., LEFT_ANKLE, X]) < 0.1
+    right_straight = np.abs(a[..., RIGHT_KNEE, X] - a[..., RIGHT_ANKLE, X]) < 0.1
+
+    ok = visible(a, LEG_LIFT_LANDMARKS)
+    on_right = ok & left_raised & right_straight
+    on_left = ok & ~on_right & right_raised & left_straight
+
+    confidence = np.where(on_right, np.minimum(1.0, (left_knee_lift + left_ankle_lift) * 2),
+                          np.where(on_left, np.minimum(1.0, (right_knee_lift + right_ankle_lift) * 2), 0.0))
+    # Boost confidence if the raised leg is well lifted
+    boost = (on_right & (left_ankle_lift > 0.2)) | (on_left & (right_ankle_lift > 0.2))
+    confidence = np.where(boost, np.minimum(1.0, confidence + 0.2), confidence)
+
+    leg = np.where(on_right, RIGHT_LEG, np.where(on_left, LEFT_LEG, NO_LEG))
+    return on_right | on_left, confidence, leg
+
+
+BODY_POSITION_LANDMARKS = [LEFT_HIP, RIGHT_HIP, LEFT_KNEE, RIGHT_KNEE,
+                           LEFT_ANKLE, RIGHT_ANKLE, LEFT_SHOULDER, RIGHT_SHOULDER]
+
+
+def body_position(arr, baseline_hip_y=np.nan, squat_threshold=0.3, jump_threshold=0.2):
+    """
+    Squat/jump body analysis (FrogJumpTask)
+    baseline_hip_y broadcasts over the batch; NaN entries use the frame's own
+    hip height (the first frame of a session sets the baseline). Returns a
+    dict of arrays plus a 'valid' mask for frames with all joints visible.
+    """
+    a = _f64(arr)
+    avg_hip_y = _mid(a, LEFT_HIP, RIGHT_HIP)
+    avg_knee_y = _mid(a, LEFT_KNEE, RIGHT_KNEE)
+    avg_ankle_y = _mid(a, LEFT_ANKLE, RIGHT_ANKLE)
+    avg_shoulder_y = _mid(a, LEFT_SHOULDER, RIGHT_SHOULDER)
+
+    torso_length = avg_hip_y - avg_shoulder_y
+    has_torso = torso_length > 0
+    safe_torso = np.where(has_torso, torso_length, 1.0)
+    hip_knee_ratio = np.where(has_torso, (avg_knee_y - avg_hip_y) / safe_torso, 0.0)
+    knee_ankle_ratio = np.where(has_torso, (avg_ankle_y - avg_knee_y) / safe_torso, 0.0)
+
+    baseline = _f64(baseline_hip_y)
+    baseline = np.where(np.isnan(baseline), avg_hip_y, baseline)
+    hip_movement = baseline - avg_hip_y  # Positive = higher than baseline
+
+    return {
+        'valid': visible(a, BODY_POSITION_LANDMARKS),
+        'avg_hip_y': avg_hip_y,
+        'avg_knee_y': avg_knee_y,
+        'avg_ankle_y': avg_ankle_y,
+        'hip_movement': hip_movement,
+        'hip_knee_ratio': hip_knee_ratio,
+        'knee_ankle_ratio': knee_ankle_ratio,
+        'is_squatting': hip_movement < -squat_threshold,
+        'is_jumping': hip_movement > jump_threshold,
+        'knee_bend': avg_knee_y > avg_hip_y + 0.1
+    }
+
+
+def sequence_baseline(arr):
+    """
+    Baseline hip height for an (N, 33, 4) sequence: the first frame where the
+    body is fully visible, as a live session would capture it
+    """
+    valid = visible(arr, BODY_POSITION_LANDMARKS)
+    if not valid.any():
+        return np.nan
+    return float(_mid(_f64(arr), LEFT_HIP, RIGHT_HIP)[int(np.argmax(valid))])
+
+
+# ---------------------------------------------------------------------------
+# Basic (fallback) rules used by the AI blueprint
+# ---------------------------------------------------------------------------
+
+def wrists_above_head_mask(arr, threshold=0.05):
+    a = _f64(arr)
+    nose_y = a[..., NOSE, Y]
+    ok = visible(a, [LEFT_WRIST, RIGHT_WRIST, NOSE])
+    return ok & (a[..., LEFT_WRIST, Y] < (nose_y - threshold)) & (a[..., RIGHT_WRIST, Y] < (nose_y - threshold))
+
+
+def one_leg_raised_mask(arr):
+    a = _f64(arr)
+    ok = visible(a, [LEFT_KNEE, RIGHT_KNEE, LEFT_HIP, RIGHT_HIP, LEFT_ANKLE, RIGHT_ANKLE])
+    left = (a[..., LEFT_KNEE, Y] < (a[..., LEFT_HIP, Y] - 0.08)) & (a[..., LEFT_ANKLE, Y] < (a[..., LEFT_HIP, Y] - 0.1))
+    right = (a[..., RIGHT_KNEE, Y] < (a[..., RIGHT_HIP, Y] - 0.08)) & (a[..., RIGHT_ANKLE, Y] < (a[..., RIGHT_HIP, Y] - 0.1))
+    return ok & (left | right)
+
+
+def hips_high_mask(arr, threshold=0.4):
+    a = _f64(arr)
+    ok = visible(a, [LEFT_HIP, RIGHT_HIP])
+    return ok & (_mid(a, LEFT_HIP, RIGHT_HIP) < threshold)
@@ -0,0 +1,133 @@
+"""
+Rolling landmark history for one session
+A fixed ring of the last POSE_HISTORY_FRAMES (33, 4) landmark arrays,
+allocated once. Every query is O(1) in the window length:
+
+- mean(): running sum of the whole pose, so the landmark_array rules can
+  score the smoothed pose exactly like a single frame
+- value/velocity(signal): hip, knee and wrist height (mean of the left and
+  right joints); velocity is newest minus oldest over the window's time span
+- min/max(signal): monotonic queues, amortized O(1) per frame
+
+Frames with no person are not pushed; a gap longer than max_gap seconds
+starts the history over so stale poses never mix with new ones.
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+
+import config
+from .landmark_array import (LANDMARK_COUNT, Y, LEFT_HIP, RIGHT_HIP, LEFT_KNEE, RIGHT_KNEE,
+                             LEFT_WRIST, RIGHT_WRIST)
+
+# Tracked scalar signals (image y grows downward, so smaller = higher)
+SIGNALS = {
+    'hip_y': (LEFT_HIP, RIGHT_HIP),
+    'knee_y': (LEFT_KNEE, RIGHT_KNEE),
+    'wrist_y': (LEFT_WRIST, RIGHT_WRIST),
+}
+
+
+class LandmarkHistory:
+    def __init__(self, size=None, max_gap=1.5):
+        self.size = max(1, config.POSE_HISTORY_FRAMES if size is None else size)
+        self.max_gap = max_gap
+
+        self.frames = np.zeros((self.size, LANDMARK_COUNT, 4), dtype=np.float32)
+        self.times = np.zeros(self.size, dtype=np.float64)
+        self.values = np.zeros((self.size, len(SIGNALS)), dtype=np.float64)
+        self._sum = np.zeros((LANDMARK_COUNT, 4), dtype=np.float64)
+        self._mean = np.zeros((LANDMARK_COUNT, 4), dtype=np.float64)
+        self._columns = {name: i for i, name in enumerate(SIGNALS)}
+        self._joints = list(SIGNALS.values())
+
+        # Monotonic queues of (sequence, value): front is the window min / max
+        self._mins = [deque() for _ in SIGNALS]
+        self._maxs = [deque() for _ in SIGNALS]
+        self.count = 0
+        self.seq = 0  # Frames pushed since the last clear
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def full(self):
+        return self.count == self.size
+
+    def clear(self):
+        self._sum[:] = 0.0
+        for queue in self._mins + self._maxs:
+            queue.clear()
+        self.count = 0
+        self.seq = 0
+
+    def push(self, arr, now=None):
+        """Add one frame's (33, 4) landmarks"""
+        now = time.monotonic() if now is None else now
+        if self.count and now - self.times[(self.seq - 1) % self.size] > self.max_gap:
+            self.clear()
+
+        slot = self.seq % self.size
+        if self.count == self.size:
+            self._sum -= self.frames[slot]
+        else:
+            self.count += 1
+        self.frames[slot] = arr
+        self._sum += self.frames[slot]
+        self.times[slot] = now
+
+        row = self.values[slot]
+        for column, (left, right) in enumerate(self._joints):
+            value = (float(arr[left, Y]) + float(arr[right, Y])) / 2
+            row[column] = value
+            mins, maxs = self._mins[column], self._maxs[column]
+            while mins and mins[-1][1] >= value:
+                mins.pop()
+            while maxs and maxs[-1][1] <= value:
+                maxs.pop()
+            mins.append((self.seq, value))
+            maxs.append((self.seq, value))
+            expired = self.seq - self.size
+            if mins[0][0] <= expired:
+                mins.popleft()
+            if maxs[0][0] <= expired:
+                maxs.popleft()
+        self.seq += 1
+
+    def latest(self):
+        """Newest frame (a view into the ring), or None when empty"""
+        if not self.count:
+            return None
+        return self.frames[(self.seq - 1) % self.size]
+
+    def mean(self):
+        """Mean pose over the window (a reused buffer), or None when empty"""
+        if not self.count:
+            return None
+        return np.divide(self._sum, self.count, out=self._mean)
+
+    def value(self, signal):
+        return float(self.values[(self.seq - 1) % self.size, self._columns[signal]])
+
+    def velocity(self, signal):
+        """Change per second across the window; negative = moving up"""
+        if self.count < 2:
+            return 0.0
+        newest, oldest = (self.seq - 1) % self.size, (self.seq - self.count) % self.size
+        elapsed = self.times[newest] - self.times[oldest]
+        if elapsed <= 0:
+            return 0.0
+        column = self._columns[signal]
+        return float((self.values[newest, column] - self.values[oldest, column]) / elapsed)
+
+    def min(self, signal):
+        return self._mins[self._columns[signal]][0][1] if self.count else None
+
+    def max(self, signal):
+        return self._maxs[self._columns[signal]][0][1] if self.count else None
+
+    def span(self, signal):
+        """Max minus min over the window (how much the joint moved)"""
+        return self.max(signal) - self.min(signal) if self.count else 0.0
@@ -3,13 +3,13 @@ Enhanced Linguistic Task: Say Mama (Age 0-1)
 Advanced speech recognition with phonetic analysis
 """
 
-import json
-import tempfile
-import os
-import wave
 from datetime import datetime
 import re
 
+from . import speech
+
+SYLLABLES = re.compile(r'ma+|mu+|mo+')
+
 # Try to import vosk, provide fallback if not available
 try:
     import vosk
@@ -20,7 +20,7 @@ except ImportError:
     print("WARNING: Vosk not available. Speech recognition will be disabled.")
 
 class SayMamaTask:
-    def __init__(self):
+    def __init__(self, load_model=True):
         self.task_name = "say_mama"
         self.age_group = "0-1"
         self.title = "Say 'ma‑ma'"
@@ -35,6 +35,9 @@ class SayMamaTask:
             r'\bm+u+m+\w*\b',   # mum, mumma, etc.
             r'\bm+o+m+\w*\b',   # mom, mommy, etc.
         ]
+        self.compiled_patterns = [re.compile(pattern) for pattern in self.phonetic_patterns]
+        # Decode against just these words (plus [unk]) rather than the full vocabulary
+        self.grammar = speech.task_grammar(self.target_words + ["mum", "mommy", "mamma", "mother"])
         
         # Detection parameters
         self.confidence_threshold = 0.6
@@ -42,36 +45,22 @@ class SayMamaTask:
         self.total_attempts = 0
         self.recognition_history = []
         
-        # Vosk model setup
+        # Vosk model setup (skipped for transcript-only use such as batch rescoring)
         self.model = None
         self.model_path = None
-        self._setup_model()
+        if load_model:
+            self._setup_model()
     
     def _setup_model(self):
         """Setup Vosk model for speech recognition"""
         if not VOSK_AVAILABLE:
             return
         
-        # Try different model paths with the correct nested path first
-        possible_paths = [
-            r'D:\born_genious\Final_App\new_backend\vosk-model-small-en-us-0.15\vosk-model-small-en-us-0.15',
-            r'D:\born_genious\Final_App\new_backend\vosk-model-small-en-us-0.15',
-            os.path.join(os.path.dirname(__file__), '..', 'vosk-model-small-en-us-0.15', 'vosk-model-small-en-us-0.15'),
-            os.path.join(os.path.dirname(__file__), '..', 'vosk-model-small-en-us-0.15'),
-            os.path.join(os.path.dirname(__file__), '..', 'models', 'vosk-model-small-en-us-0.15'),
-            os.path.join(os.path.dirname(__file__), '..', 'StreamlitApp', 'tasks', 'vosk-model-small-en-us-0.15'),
-            os.path.join(os.getcwd(), 'models', 'vosk-model-small-en-us-0.15')
-        ]
-        
-        for path in possible_paths:
-            abs_path = os.path.abspath(path)
-            if os.path.exists(abs_path):
-                self.model_path = abs_path
-                break
-        
+        # One model per process, shared by every linguistic task
+        self.model_path = speech.find_model_path()
         if self.model_path:
             try:
-                self.model = vosk.Model(self.model_path)
+                self.model = speech.load_model(self.model_path)
             except Exception as e:
                 print(f"Error loading Vosk model: {e}")
                 self.model = None
@@ -79,6 +68,8 @@ class SayMamaTask:
     def analyze_phonetics(self, text):
         """
         Analyze text for phonetic similarity to target words
+        Transcripts here are a few words, so the handful of C-level scans
+        below are faster than a per-word pass in Python (measured)
         """
         if not text:
             return False, 0.0, []
@@ -94,8 +85,8 @@ class SayMamaTask:
                 max_confidence = max(max_confidence, 1.0)
         
         # Phonetic pattern matching
-        for pattern in self.phonetic_patterns:
-            pattern_matches = re.findall(pattern, text_lower)
+        for pattern in self.compiled_patterns:
+            pattern_matches = pattern.findall(text_lower)
             if pattern_matches:
                 matches.extend(pattern_matches)
                 # Calculate confidence based on pattern quality
@@ -105,7 +96,7 @@ class SayMamaTask:
                         max_confidence = max(max_confidence, confidence)
         
         # Syllable analysis for baby speech
-        syllables = re.findall(r'ma+|mu+|mo+', text_lower)
+        syllables = SYLLABLES.findall(text_lower)
         if syllables:
             # Baby might say "ma ma" or "mama" - both are good
             if len(syllables) >= 1:
@@ -119,6 +110,16 @@ class SayMamaTask:
         
         return len(matches) > 0, max_confidence, matches
     
+    def analyze_phonetics_batch(self, texts):
+        """
+        analyze_phonetics() for many transcripts; repeats are analysed once
+        """
+        seen = {}
+        for text in texts:
+            if text not in seen:
+                seen[text] = self.analyze_phonetics(text)
+        return [seen[text] for text in texts]
+    
     def process_audio(self, audio_data):
         """
         Process audio data and return recognition results
@@ -138,72 +139,13 @@ class SayMamaTask:
             # Convert audio to WAV format if needed
             wav_bytes = self._convert_to_wav(audio_data)
             
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio:
-                temp_audio.write(wav_bytes)
-                temp_audio_path = temp_audio.name
+            # Process with Vosk (clips heard before come from the transcript cache)
+            heard = self._recognize_with_vosk(wav_bytes)
+            result = self.process_transcript(heard['text'])
+            if heard.get('voice_activity'):
+                result['voice_activity'] = heard['voice_activity']  # How much silence was trimmed
+            return result
             
-            try:
-                # Process with Vosk
-                transcript = self._recognize_with_vosk(temp_audio_path)
-                
-                # Analyze the transcript
-                has_match, confidence, matches = self.analyze_phonetics(transcript)
-                
-                # Track attempt
-                self.total_attempts += 1
-                if has_match:
-                    self.success_count += 1
-                
-                # Add to history
-                self.recognition_history.append({
-                    'timestamp': datetime.now(),
-                    'transcript': transcript,
-                    'confidence': confidence,
-                    'matches': matches,
-                    'success': has_match
-                })
-                
-                # Generate response
-                if has_match and confidence >= self.confidence_threshold:
-                    if confidence >= 0.9:
-                        message = f"Perfect! I heard you say '{transcript}' - that's mama!"
-                        feedback = "Excellent! You said mama very clearly!"
-                    elif confidence >= 0.7:
-                        message = f"Great job! I heard '{transcript}' - I can hear mama!"
-                        feedback = "Good work! I can hear you trying to say mama!"
-                    else:
-                        message = f"Good try! I heard '{transcript}' - keep practicing mama!"
-                        feedback = "Nice attempt! Try saying 'ma-ma' a bit more clearly."
-                else:
-                    if transcript:
-                        message = f"I heard '{transcript}'. Try saying 'ma-ma'!"
-                        feedback = "I can hear you talking! Now try saying 'mama' for me."
-                    else:
-                        message = "I couldn't hear anything clearly. Try saying 'mama'!"
-                        feedback = "Speak a little louder and say 'ma-ma' for me!"
-                
-                return {
-                    'success': has_match and confidence >= self.confidence_threshold,
-                    'confidence': confidence,
-                    'transcript': transcript,
-                    'message': message,
-                    'feedback': feedback,
-                    'matches': matches,
-                    'target_words': self.target_words,
-                    'success_count': self.success_count,
-                    'total_attempts': self.total_attempts,
-                    'available': True
-                }
-                
-            finally:
-                # Clean up temp file
-                try:
-                    if os.path.exists(temp_audio_path):
-                        os.unlink(temp_audio_path)
-                except Exception:
-                    pass
-                    
         except Exception as e:
             return {
                 'success': False,
@@ -215,6 +157,60 @@ class SayMamaTask:
                 'available': False
             }
     
+    def process_transcript(self, transcript):
+        """
+        Score one transcript and record the attempt
+        Used directly when recognition ran elsewhere (see score_audio)
+        """
+        # Analyze the transcript
+        has_match, confidence, matches = self.analyze_phonetics(transcript)
+        
+        # Track attempt
+        self.total_attempts += 1
+        if has_match:
+            self.success_count += 1
+        
+        # Add to history
+        self.recognition_history.append({
+            'timestamp': datetime.now(),
+            'transcript': transcript,
+            'confidence': confidence,
+            'matches': matches,
+            'success': has_match
+        })
+        
+        # Generate response
+        if has_match and confidence >= self.confidence_threshold:
+            if confidence >= 0.9:
+                message = f"Perfect! I heard you say '{transcript}' - that's mama!"
+                feedback = "Excellent! You said mama very clearly!"
+            elif confidence >= 0.7:
+                message = f"Great job! I heard '{transcript}' - I can hear mama!"
+                feedback = "Good work! I can hear you trying to say mama!"
+            else:
+                message = f"Good try! I heard '{transcript}' - keep practicing mama!"
+                feedback = "Nice attempt! Try saying 'ma-ma' a bit more clearly."
+        else:
+            if transcript:
+                message = f"I heard '{transcript}'. Try saying 'ma-ma'!"
+                feedback = "I can hear you talking! Now try saying 'mama' for me."
+            else:
+                message = "I couldn't hear anything clearly. Try saying 'mama'!"
+                feedback = "Speak a little louder and say 'ma-ma' for me!"
+        
+        return {
+            'success': has_match and confidence >= self.confidence_threshold,
+            'confidence': confidence,
+            'transcript': transcript,
+            'message': message,
+            'feedback': feedback,
+            'matches': matches,
+            'target_words': self.target_words,
+            'success_count': self.success_count,
+            'total_attempts': self.total_attempts,
+            'available': True
+        }
+    
     def _convert_to_wav(self, audio_data):
         """
         Convert audio data to WAV format
@@ -227,46 +223,18 @@ class SayMamaTask:
             return base64.b64decode(audio_data)
         return audio_data
     
-    def _recognize_with_vosk(self, wav_path):
+    def _recognize_with_vosk(self, wav_bytes):
         """
-        Use Vosk to recognize speech from WAV file
+        Use Vosk to recognize speech from WAV bytes
+        Silent clips come back empty without running the recognizer
         """
         try:
-            with wave.open(wav_path, 'rb') as wf:
-                # Validate audio format
-                if wf.getnchannels() != 1:
-                    raise ValueError("Audio must be mono")
-                if wf.getsampwidth() != 2:
-                    raise ValueError("Audio must be 16-bit")
-                
-                # Create recognizer
-                rec = vosk.KaldiRecognizer(self.model, wf.getframerate())
-                
-                # Process audio
-                transcript_parts = []
-                
-                while True:
-                    data = wf.readframes(4000)
-                    if len(data) == 0:
-                        break
-                    
-                    if rec.AcceptWaveform(data):
-                        result = json.loads(rec.Result())
-                        text = result.get('text', '').strip()
-                        if text:
-                            transcript_parts.append(text)
-                
-                # Get final result
-                final_result = json.loads(rec.FinalResult())
-                final_text = final_result.get('text', '').strip()
-                if final_text:
-                    transcript_parts.append(final_text)
-                
-                return ' '.join(transcript_parts).strip()
-                
+            pcm, frame_rate = speech.read_wav(wav_bytes)
+            return speech.transcribe(self.model, pcm, frame_rate, self.model_path, self.grammar)
+            
         except Exception as e:
             print(f"Vosk recognition error: {e}")
-            return ""
+            return {'text': '', 'words': [], 'voice_activity': None}
     
     def get_task_info(self):
         """
@@ -282,6 +250,7 @@ class SayMamaTask:
             'type': 'speech_recognition',
             'target_words': self.target_words,
             'confidence_threshold': self.confidence_threshold,
+            'grammar': self.grammar is not None,
             'available': VOSK_AVAILABLE and self.model is not None,
             'model_path': self.model_path
         }
@@ -3,13 +3,14 @@ Enhanced Linguistic Task: Tell a Story about a Kite (Age 5-6)
 Advanced speech recognition with narrative analysis
 """
 
-import json
-import tempfile
-import os
-import wave
 from datetime import datetime
 import re
 
+from . import speech
+from .keyword_matcher import KeywordMatcher
+
+SENTENCE_END = re.compile(r'[.!?]+')
+
 # Try to import vosk, provide fallback if not available
 try:
     import vosk
@@ -20,7 +21,7 @@ except ImportError:
     print("WARNING: Vosk not available. Speech recognition will be disabled.")
 
 class StoryKiteTask:
-    def __init__(self):
+    def __init__(self, load_model=True):
         self.task_name = "story_kite"
         self.age_group = "5-6"
         self.title = "Tell a short story about a kite"
@@ -34,6 +35,14 @@ class StoryKiteTask:
         self.action_words = ["run", "running", "pull", "hold", "catch", "string", "tail"]
         self.descriptive_words = ["colorful", "beautiful", "big", "small", "red", "blue", "yellow", "bright"]
         self.narrative_words = ["then", "next", "after", "first", "finally", "when", "because"]
+        self.matcher = KeywordMatcher({
+            'essential': self.essential_words,
+            'story': self.story_words,
+            'action': self.action_words,
+            'descriptive': self.descriptive_words,
+            'narrative': self.narrative_words
+        })
+        self.grammar = None  # Free-form story - every word counts, so keep the full vocabulary
         
         # Analysis parameters
         self.min_story_length = 5  # Minimum words for a story
@@ -45,43 +54,30 @@ class StoryKiteTask:
         self.total_attempts = 0
         self.story_history = []
         
-        # Vosk model setup
+        # Vosk model setup (skipped for transcript-only use such as batch rescoring)
         self.model = None
         self.model_path = None
-        self._setup_model()
+        if load_model:
+            self._setup_model()
     
     def _setup_model(self):
         """Setup Vosk model for speech recognition"""
         if not VOSK_AVAILABLE:
             return
         
-        # Try different model paths with the correct nested path first
-        possible_paths = [
-            r'D:\born_genious\Final_App\new_backend\vosk-model-small-en-us-0.15\vosk-model-small-en-us-0.15',
-            r'D:\born_genious\Final_App\new_backend\vosk-model-small-en-us-0.15',
-            os.path.join(os.path.dirname(__file__), '..', 'vosk-model-small-en-us-0.15', 'vosk-model-small-en-us-0.15'),
-            os.path.join(os.path.dirname(__file__), '..', 'vosk-model-small-en-us-0.15'),
-            os.path.join(os.path.dirname(__file__), '..', 'models', 'vosk-model-small-en-us-0.15'),
-            os.path.join(os.path.dirname(__file__), '..', 'StreamlitApp', 'tasks', 'vosk-model-small-en-us-0.15'),
-            os.path.join(os.getcwd(), 'models', 'vosk-model-small-en-us-0.15')
-        ]
-        
-        for path in possible_paths:
-            abs_path = os.path.abspath(path)
-            if os.path.exists(abs_path):
-                self.model_path = abs_path
-                break
-        
+        # One model per process, shared by every linguistic task
+        self.model_path = speech.find_model_path()
         if self.model_path:
             try:
-                self.model = vosk.Model(self.model_path)
+                self.model = speech.load_model(self.model_path)
             except Exception as e:
                 print(f"Error loading Vosk model: {e}")
                 self.model = None
     
-    def analyze_story_content(self, text):
+    def analyze_story_content(self, text, keywords=None):
         """
         Analyze story content for narrative elements and vocabulary
+        keywords is this text's self.matcher.analyze() result when already known
         """
         if not text or len(text.strip()) < 3:
             return {
@@ -94,20 +90,22 @@ class StoryKiteTask:
                 'feedback_points': ['Story too short']
             }
         
-        text_lower = text.lower().strip()
-        words = text_lower.split()
+        # One pass over the words counts every vocabulary category (whole words only)
+        keywords = keywords or self.matcher.analyze(text)
+        words = keywords['tokens']
+        counts = keywords['counts']
         
         # Count sentences (rough estimation)
-        sentence_count = max(1, len(re.findall(r'[.!?]+', text)))
+        sentence_count = max(1, len(SENTENCE_END.findall(text)))
         
         # Check for essential words
-        has_kite = any(word in text_lower for word in ["kite", "kites"])
+        has_kite = counts['essential'] > 0
         
         # Count vocabulary categories
-        story_word_count = sum(1 for word in self.story_words if word in text_lower)
-        action_word_count = sum(1 for word in self.action_words if word in text_lower)
-        descriptive_word_count = sum(1 for word in self.descriptive_words if word in text_lower)
-        narrative_word_count = sum(1 for word in self.narrative_words if word in text_lower)
+        story_word_count = counts['story']
+        action_word_count = counts['action']
+        descriptive_word_count = counts['descriptive']
+        narrative_word_count = counts['narrative']
         
         # Calculate scores
         vocabulary_score = min(1.0, (story_word_count * 0.3 + action_word_count * 0.2 + 
@@ -157,6 +155,13 @@ class StoryKiteTask:
             'narrative_words_used': narrative_word_count
         }
     
+    def analyze_stories(self, texts):
+        """
+        analyze_story_content() for many transcripts (e.g. re-scoring a batch)
+        """
+        keywords = self.matcher.analyze_batch(texts)
+        return [self.analyze_story_content(text, found) for text, found in zip(texts, keywords)]
+    
     def process_audio(self, audio_data):
         """
         Process audio data and return story analysis results
@@ -176,71 +181,13 @@ class StoryKiteTask:
             # Convert audio to WAV format if needed
             wav_bytes = self._convert_to_wav(audio_data)
             
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio:
-                temp_audio.write(wav_bytes)
-                temp_audio_path = temp_audio.name
+            # Process with Vosk (clips heard before come from the transcript cache)
+            heard = self._recognize_with_vosk(wav_bytes)
+            result = self.process_transcript(heard['text'])
+            if heard.get('voice_activity'):
+                result['voice_activity'] = heard['voice_activity']  # How much silence was trimmed
+            return result
             
-            try:
-                # Process with Vosk
-                transcript = self._recognize_with_vosk(temp_audio_path)
-                
-                # Analyze the story
-                analysis = self.analyze_story_content(transcript)
-                
-                # Track attempt
-                self.total_attempts += 1
-                success = analysis['overall_confidence'] >= self.confidence_threshold
-                if success:
-                    self.success_count += 1
-                
-                # Add to history
-                self.story_history.append({
-                    'timestamp': datetime.now(),
-                    'transcript': transcript,
-                    'analysis': analysis,
-                    'success': success
-                })
-                
-                # Generate response message
-                if success:
-                    if analysis['overall_confidence'] >= 0.9:
-                        message = "What an amazing story! You're a wonderful storyteller!"
-                        feedback = f"Perfect! {' '.join(analysis['feedback_points'])}"
-                    elif analysis['overall_confidence'] >= 0.7:
-                        message = "Great story! You told me about the kite beautifully!"
-                        feedback = f"Excellent work! {' '.join(analysis['feedback_points'])}"
-                    else:
-                        message = "Good story! You included the kite and some details."
-                        feedback = f"Nice job! {' '.join(analysis['feedback_points'])}"
-                else:
-                    if transcript:
-                        message = f"I heard your story! {' '.join(analysis['feedback_points'][:2])}"
-                        feedback = "Keep practicing storytelling - you're doing great!"
-                    else:
-                        message = "I couldn't hear your story clearly. Please try again!"
-                        feedback = "Speak clearly and tell me a story about flying a kite."
-                
-                return {
-                    'success': success,
-                    'confidence': analysis['overall_confidence'],
-                    'transcript': transcript,
-                    'message': message,
-                    'feedback': feedback,
-                    'analysis': analysis,
-                    'success_count': self.success_count,
-                    'total_attempts': self.total_attempts,
-                    'available': True
-                }
-                
-            finally:
-                # Clean up temp file
-                try:
-                    if os.path.exists(temp_audio_path):
-                        os.unlink(temp_audio_path)
-                except Exception:
-                    pass
-                    
         except Exception as e:
             return {
                 'success': False,
@@ -252,6 +199,59 @@ class StoryKiteTask:
                 'available': False
             }
     
+    def process_transcript(self, transcript):
+        """
+        Score one transcript and record the attempt
+        Used directly when recognition ran elsewhere (see score_audio)
+        """
+        # Analyze the story
+        analysis = self.analyze_story_content(transcript)
+        
+        # Track attempt
+        self.total_attempts += 1
+        success = analysis['overall_confidence'] >= self.confidence_threshold
+        if success:
+            self.success_count += 1
+        
+        # Add to history
+        self.story_history.append({
+            'timestamp': datetime.now(),
+            'transcript': transcript,
+            'analysis': analysis,
+            'success': success
+        })
+        
+        # Generate response message
+        if success:
+            if analysis['overall_confidence'] >= 0.9:
+                message = "What an amazing story! You're a wonderful storyteller!"
+                feedback = f"Perfect! {' '.join(analysis['feedback_points'])}"
+            elif analysis['overall_confidence'] >= 0.7:
+                message = "Great story! You told me about the kite beautifully!"
+                feedback = f"Excellent work! {' '.join(analysis['feedback_points'])}"
+            else:
+                message = "Good story! You included the kite and some details."
+                feedback = f"Nice job! {' '.join(analysis['feedback_points'])}"
+        else:
+            if transcript:
+                message = f"I heard your story! {' '.join(analysis['feedback_points'][:2])}"
+                feedback = "Keep practicing storytelling - you're doing great!"
+            else:
+                message = "I couldn't hear your story clearly. Please try again!"
+                feedback = "Speak clearly and tell me a story about flying a kite."
+        
+        return {
+            'success': success,
+            'confidence': analysis['overall_confidence'],
+            'transcript': transcript,
+            'message': message,
+            'feedback': feedback,
+            'analysis': analysis,
+            'success_count': self.success_count,
+            'total_attempts': self.total_attempts,
+            'available': True
+        }
+    
     def _convert_to_wav(self, audio_data):
         """
         Convert audio data to WAV format
@@ -264,46 +264,18 @@ class StoryKiteTask:
             return base64.b64decode(audio_data)
         return audio_data
     
-    def _recognize_with_vosk(self, wav_path):
+    def _recognize_with_vosk(self, wav_bytes):
         """
-        Use Vosk to recognize speech from WAV file
+        Use Vosk to recognize speech from WAV bytes
+        Silent clips come back empty without running the recognizer
         """
         try:
-            with wave.open(wav_path, 'rb') as wf:
-                # Validate audio format
-                if wf.getnchannels() != 1:
-                    raise ValueError("Audio must be mono")
-                if wf.getsampwidth() != 2:
-                    raise ValueError("Audio must be 16-bit")
-                
-                # Create recognizer
-                rec = vosk.KaldiRecognizer(self.model, wf.getframerate())
-                
-                # Process audio
-                transcript_parts = []
-                
-                while True:
-                    data = wf.readframes(4000)
-                    if len(data) == 0:
-                        break
-                    
-                    if rec.AcceptWaveform(data):
-                        result = json.loads(rec.Result())
-                        text = result.get('text', '').strip()
-                        if text:
-                            transcript_parts.append(text)
-                
-                # Get final result
-                final_result = json.loads(rec.FinalResult())
-                final_text = final_result.get('text', '').strip()
-                if final_text:
-                    transcript_parts.append(final_text)
-                
-                return ' '.join(transcript_parts).strip()
-                
+            pcm, frame_rate = speech.read_wav(wav_bytes)
+            return speech.transcribe(self.model, pcm, frame_rate, self.model_path, self.grammar)
+            
         except Exception as e:
             print(f"Vosk recognition error: {e}")
-            return ""
+            return {'text': '', 'words': [], 'voice_activity': None}
     
     def get_task_info(self):
         """
@@ -0,0 +1,83 @@
+"""
+In-process metrics for the AI pipeline
+Thread-safe counters, gauges and rolling latency histograms that the pose
+and speech stages record into and /api/ai/metrics reports (admin token required)
+"""
+
+import threading
+import time
+from collections import deque
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class MetricsRegistry:
+    def __init__(self, window=2048):
+        self.window = window
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def incr(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def counter(self, name):
+        with self.lock:
+            return self.counters.get(name, 0)
+
+    def gauge(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+
+    def observe(self, name, value):
+        """Record one sample; only the most recent `window` samples are kept"""
+        with self.lock:
+            samples = self.histograms.get(name)
+            if samples is None:
+                samples = self.histograms[name] = deque(maxlen=self.window)
+            samples.append(value)
+
+    def summarize(self, name):
+        with self.lock:
+            ordered = sorted(self.histograms.get(name, ()))
+        if not ordered:
+            return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+        return {
+            'count': len(ordered),
+            'mean': round(sum(ordered) / len(ordered), 3),
+            'p50': round(_percentile(ordered, 50), 3),
+            'p95': round(_percentile(ordered, 95), 3),
+            'p99': round(_percentile(ordered, 99), 3),
+            'max': round(ordered[-1], 3)
+        }
+
+    def snapshot(self):
+        with self.lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            names = list(self.histograms)
+        return {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'counters': counters,
+            'gauges': gauges,
+            'histograms': {name: self.summarize(name) for name in names}
+        }
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+
+# Global registry
+metrics = MetricsRegistry()
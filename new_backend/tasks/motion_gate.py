@@ -0,0 +1,73 @@
+"""
+Motion gate for pose inference on static scenes
+A tiny grayscale thumbnail of each frame is compared with the thumbnail of
+the last frame that actually went through pose inference. While the mean
+difference stays under MOTION_GATE_THRESHOLD the previous landmarks are
+reused, up to MOTION_GATE_MAX_SKIPS frames in a row, so a child holding a
+pose costs a resize instead of a model run.
+"""
+
+import threading
+
+import cv2
+import numpy as np
+
+import config
+from .metrics import metrics
+
+THUMBNAIL_SIZE = (32, 24)
+
+
+def thumbnail(frame):
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    return cv2.resize(gray, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+class MotionGate:
+    def __init__(self, threshold=None, max_skips=None, registry=None):
+        self.threshold = config.MOTION_GATE_THRESHOLD if threshold is None else threshold
+        self.max_skips = config.MOTION_GATE_MAX_SKIPS if max_skips is None else max_skips
+        self.metrics = registry or metrics
+        self.lock = threading.Lock()
+        self.reference = None  # Thumbnail of the last inferred frame
+        self.landmarks = None
+        self.consecutive_skips = 0
+        self._pending = None
+
+    def should_skip(self, frame):
+        """
+        True when the scene has not changed since the last inferred frame and
+        the previous landmarks (self.landmarks) can be reused
+        """
+        thumb = thumbnail(frame)
+        with self.lock:
+            skip = False
+            if self.reference is not None and self.consecutive_skips < self.max_skips:
+                difference = float(np.abs(thumb - self.reference).mean())
+                self.metrics.observe('motion_gate.difference', difference)
+                skip = difference < self.threshold
+            if skip:
+                self.consecutive_skips += 1
+            else:
+                self._pending = thumb
+        self.metrics.incr('motion_gate.checked')
+        if skip:
+            self.metrics.incr('motion_gate.skipped')
+        checked = self.metrics.counter('motion_gate.checked')
+        self.metrics.gauge('motion_gate.skip_rate', round(self.metrics.counter('motion_gate.skipped') / checked, 4))
+        return skip
+
+    def remember(self, landmarks):
+        """Record the result of a frame that went through inference"""
+        with self.lock:
+            self.reference = self._pending
+            self.landmarks = landmarks
+            self.consecutive_skips = 0
+            self._pending = None
+
+    def reset(self):
+        with self.lock:
+            self.reference = None
+            self.landmarks = None
+            self.consecutive_skips = 0
+            self._pending = None
@@ -8,6 +8,11 @@ import numpy as np
 import mediapipe as mp
 from datetime import datetime
 
+from . import landmark_array
+from .frame_preprocess import to_rgb
+from .pose_tiers import task_complexity
+from .profiling import profile_section
+
 # MediaPipe setup
 try:
     mp_pose = mp.solutions.pose
@@ -19,7 +24,7 @@ except ImportError:
     print("WARNING: MediaPipe not available for physical assessments")
 
 class RaiseHandsTask:
-    def __init__(self):
+    def __init__(self, create_pose=True):
         self.task_name = "raise_hands"
         self.age_group = "0-1"
         self.title = "Can baby raise both hands high?"
@@ -30,16 +35,18 @@ class RaiseHandsTask:
         # Detection parameters
         self.min_detection_time = 2.0  # seconds
         self.confidence_threshold = 0.7
+        self.motion_gated = True  # Holding still - reuse landmarks while the scene is unchanged
         self.success_count = 0
         self.total_attempts = 0
         self.start_time = None
         self.detection_start = None
         
-        # Pose detector
-        if MEDIAPIPE_AVAILABLE:
+        # Pose detector (skipped for landmark-only use such as corpus replay)
+        self.model_complexity = task_complexity(self.task_name)
+        if MEDIAPIPE_AVAILABLE and create_pose:
             self.pose = mp_pose.Pose(
                 static_image_mode=False,
-                model_complexity=1,
+                model_complexity=self.model_complexity,
                 enable_segmentation=False,
                 min_detection_confidence=0.6,
                 min_tracking_confidence=0.5
@@ -51,63 +58,13 @@ class RaiseHandsTask:
         """
         Enhanced detection for raised hands with multiple criteria
         """
-        if not landmarks or not MEDIAPIPE_AVAILABLE:
+        if landmarks is None:
             return False, 0.0
         
         try:
-            # Get key landmarks
-            nose = landmarks.landmark[POSE_LMS.NOSE]
-            left_wrist = landmarks.landmark[POSE_LMS.LEFT_WRIST]
-            right_wrist = landmarks.landmark[POSE_LMS.RIGHT_WRIST]
-            left_shoulder = landmarks.landmark[POSE_LMS.LEFT_SHOULDER]
-            right_shoulder = landmarks.landmark[POSE_LMS.RIGHT_SHOULDER]
-            
-            # Check visibility
-            if (left_wrist.visibility < 0.5 or right_wrist.visibility < 0.5 or
-                nose.visibility < 0.5 or left_shoulder.visibility < 0.5 or
-                right_shoulder.visibility < 0.5):
-                return False, 0.0
-            
-            # Calculate confidence based on multiple factors
-            confidence_factors = []
-            
-            # Factor 1: Wrists above nose (primary)
-            head_threshold = 0.08
-            left_above_head = left_wrist.y < (nose.y - head_threshold)
-            right_above_head = right_wrist.y < (nose.y - head_threshold)
-            both_above_head = left_above_head and right_above_head
-            
-            if both_above_head:
-                confidence_factors.append(0.4)  # 40% weight
-            
-            # Factor 2: Wrists above shoulders
-            left_above_shoulder = left_wrist.y < left_shoulder.y
-            right_above_shoulder = right_wrist.y < right_shoulder.y
-            both_above_shoulders = left_above_shoulder and right_above_shoulder
-            
-            if both_above_shoulders:
-                confidence_factors.append(0.3)  # 30% weight
-            
-            # Factor 3: Arm extension (check if arms are extended upward)
-            left_extended = abs(left_wrist.x - left_shoulder.x) < 0.2  # Not too far from shoulder horizontally
-            right_extended = abs(right_wrist.x - right_shoulder.x) < 0.2
-            arms_extended = left_extended and right_extended
-            
-            if arms_extended:
-                confidence_factors.append(0.2)  # 20% weight
-            
-            # Factor 4: Symmetry (both hands at similar height)
-            height_diff = abs(left_wrist.y - right_wrist.y)
-            symmetric = height_diff < 0.1
-            
-            if symmetric:
-                confidence_factors.append(0.1)  # 10% weight
-            
-            # Calculate total confidence
-            total_confidence = sum(confidence_factors)
-            success = total_confidence >= self.confidence_threshold
-            
-            return success, total_confidence
+            arr = landmark_array.to_landmark_array(landmarks)
+            detected, confidence = landmark_array.raised_hands(arr, self.confidence_threshold)
+            return bool(detected), float(confidence)
             
         except Exception as e:
             print(f"Raised hands detection error: {e}")
@@ -126,17 +83,37 @@ class RaiseHandsTask:
             }
         
         try:
-            # Convert BGR to RGB
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Convert BGR to RGB (into a buffer reused across frames)
+            rgb = to_rgb(frame)
             
             # Process the frame
-            results = self.pose.process(rgb)
+            with profile_section('mediapipe'):
+                results = self.pose.process(rgb)
+            
+            return self.process_landmarks(results.pose_landmarks)
             
-            if results.pose_landmarks:
-                detected, confidence = self.detect_raised_hands(results.pose_landmarks)
+        except Exception as e:
+            return {
+                'detected': False,
+                'confidence': 0.0,
+                'message': f'Detection error: {str(e)}',
+                'feedback': 'There was a problem with the camera. Please try again.',
+                'success_count': self.success_count,
+                'detection_duration': 0
+            }
+    
+    def process_landmarks(self, landmarks, now=None):
+        """
+        Score one frame's pose landmarks (None when nobody is in view)
+        Used directly when inference runs elsewhere (see pose_scheduler);
+        now= replays recorded frames on their own clock (see score_videos)
+        """
+        try:
+            if landmarks is not None:
+                detected, confidence = self.detect_raised_hands(landmarks)
                 
                 # Track detection timing
-                current_time = datetime.now()
+                current_time = now or datetime.now()
                 
                 if detected:
                     if self.detection_start is None:
@@ -186,6 +163,13 @@ class RaiseHandsTask:
                 'detection_duration': 0
             }
     
+    def recommended_frame_interval(self):
+        """
+        Milliseconds until the next frame is useful
+        Sample quickly to catch the hands going up, then just confirm the hold
+        """
+        return 500 if self.detection_start is not None else 250
+    
     def get_task_info(self):
         """
         Return task configuration information
@@ -9,6 +9,12 @@ import mediapipe as mp
 from datetime import datetime
 import math
 
+from . import landmark_array
+from .frame_preprocess import to_rgb
+from .landmark_history import LandmarkHistory
+from .pose_tiers import task_complexity
+from .profiling import profile_section
+
 # MediaPipe setup
 try:
     mp_pose = mp.solutions.pose
@@ -20,7 +26,7 @@ except ImportError:
     print("WARNING: MediaPipe not available for physical assessments")
 
 class OneLegBalanceTask:
-    def __init__(self):
+    def __init__(self, create_pose=True):
         self.task_name = "one_leg_balance"
         self.age_group = "1-2"
         self.title = "Can you stand on one leg?"
@@ -31,17 +37,20 @@ class OneLegBalanceTask:
         # Detection parameters
         self.min_balance_time = 3.0  # seconds
         self.confidence_threshold = 0.75
+        self.motion_gated = True  # Holding still - reuse landmarks while the scene is unchanged
         self.success_count = 0
         self.total_attempts = 0
         self.start_time = None
         self.balance_start = None
         self.last_balance_leg = None  # Track which leg was being balanced on
+        self.history = LandmarkHistory()  # Recent frames so one noisy frame cannot end a hold
         
-        # Pose detector
-        if MEDIAPIPE_AVAILABLE:
+        # Pose detector (skipped for landmark-only use such as corpus replay)
+        self.model_complexity = task_complexity(self.task_name)
+        if MEDIAPIPE_AVAILABLE and create_pose:
             self.pose = mp_pose.Pose(
                 static_image_mode=False,
-                model_complexity=1,
+                model_complexity=self.model_complexity,
                 enable_segmentation=False,
                 min_detection_confidence=0.6,
                 min_tracking_confidence=0.5
@@ -53,73 +62,13 @@ class OneLegBalanceTask:
         """
         Calculate how much each leg is lifted and determine balance
         """
-        if not landmarks or not MEDIAPIPE_AVAILABLE:
+        if landmarks is None:
             return False, 0.0, None
         
         try:
-            # Get key landmarks
-            left_hip = landmarks.landmark[POSE_LMS.LEFT_HIP]
-            right_hip = landmarks.landmark[POSE_LMS.RIGHT_HIP]
-            left_knee = landmarks.landmark[POSE_LMS.LEFT_KNEE]
-            right_knee = landmarks.landmark[POSE_LMS.RIGHT_KNEE]
-            left_ankle = landmarks.landmark[POSE_LMS.LEFT_ANKLE]
-            right_ankle = landmarks.landmark[POSE_LMS.RIGHT_ANKLE]
-            left_heel = landmarks.landmark[POSE_LMS.LEFT_HEEL]
-            right_heel = landmarks.landmark[POSE_LMS.RIGHT_HEEL]
-            
-            # Check visibility
-            required_landmarks = [left_hip, right_hip, left_knee, right_knee, 
-                                left_ankle, right_ankle, left_heel, right_heel]
-            if any(lm.visibility < 0.5 for lm in required_landmarks):
-                return False, 0.0, None
-            
-            # Calculate average hip height as reference
-            avg_hip_y = (left_hip.y + right_hip.y) / 2
-            
-            # Calculate leg lift metrics
-            left_knee_lift = avg_hip_y - left_knee.y  # Positive if knee is above hip level
-            right_knee_lift = avg_hip_y - right_knee.y
-            
-            left_ankle_lift = avg_hip_y - left_ankle.y  # How high the ankle is
-            right_ankle_lift = avg_hip_y - right_ankle.y
-            
-            # Determine if a leg is significantly raised
-            knee_lift_threshold = 0.1  # Knee should be at least this much above average
-            ankle_lift_threshold = 0.15  # Ankle should be this much above average
-            
-            left_leg_raised = (left_knee_lift > knee_lift_threshold and 
-                             left_ankle_lift > ankle_lift_threshold)
-            right_leg_raised = (right_knee_lift > knee_lift_threshold and 
-                              right_ankle_lift > ankle_lift_threshold)
-            
-            # Additional stability check - supporting leg should be relatively straight
-            left_leg_straight = abs(left_knee.x - left_ankle.x) < 0.1  # Vertical alignment
-            right_leg_straight = abs(right_knee.x - right_ankle.x) < 0.1
-            
-            # Determine balance state
-            balance_detected = False
-            confidence = 0.0
-            balanced_leg = None
-            
-            if left_leg_raised and right_leg_straight:
-                # Standing on right leg
-                balance_detected = True
-                balanced_leg = 'right'
-                confidence = min(1.0, (left_knee_lift + left_ankle_lift) * 2)
-            elif right_leg_raised and left_leg_straight:
-                # Standing on left leg
-                balance_detected = True
-                balanced_leg = 'left'
-                confidence = min(1.0, (right_knee_lift + right_ankle_lift) * 2)
-            
-            # Boost confidence if leg is well lifted
-            if balance_detected:
-                if balanced_leg == 'right' and left_ankle_lift > 0.2:
-                    confidence = min(1.0, confidence + 0.2)
-                elif balanced_leg == 'left' and right_ankle_lift > 0.2:
-                    confidence = min(1.0, confidence + 0.2)
-            
-            return balance_detected, confidence, balanced_leg
+            arr = landmark_array.to_landmark_array(landmarks)
+            detected, confidence, leg = landmark_array.leg_lift(arr)
+            return bool(detected), float(confidence), landmark_array.LEG_NAMES[int(leg)]
             
         except Exception as e:
             print(f"Leg balance calculation error: {e}")
@@ -138,17 +87,46 @@ class OneLegBalanceTask:
             }
         
         try:
-            # Convert BGR to RGB
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Convert BGR to RGB (into a buffer reused across frames)
+            rgb = to_rgb(frame)
             
             # Process the frame
-            results = self.pose.process(rgb)
+            with profile_section('mediapipe'):
+                results = self.pose.process(rgb)
             
-            if results.pose_landmarks:
-                detected, confidence, balanced_leg = self.calculate_leg_lift(results.pose_landmarks)
-                
+            return self.process_landmarks(results.pose_landmarks)
+            
+        except Exception as e:
+            return {
+                'detected': False,
+                'confidence': 0.0,
+                'message': f'Detection error: {str(e)}',
+                'feedback': 'There was a problem with the camera. Please try again.',
+                'success_count': self.success_count,
+                'balanced_leg': None,
+                'balance_duration': 0
+            }
+    
+    def process_landmarks(self, landmarks, now=None):
+        """
+        Score one frame's pose landmarks (None when nobody is in view)
+        Used directly when inference runs elsewhere (see pose_scheduler);
+        now= replays recorded frames on their own clock (see score_videos)
+        """
+        try:
+            if landmarks is not None:
                 # Track balance timing
-                current_time = datetime.now()
+                current_time = now or datetime.now()
+                arr = landmark_array.to_landmark_array(landmarks)
+                detected, confidence, balanced_leg = self.calculate_leg_lift(arr)
+                self.history.push(arr, now=current_time.timestamp())
+                
+                # Mid-hold, fall back to the smoothed pose before giving up on the balance
+                if self.balance_start is not None and not (detected and confidence >= self.confidence_threshold):
+                    held, held_confidence, held_leg = landmark_array.leg_lift(self.history.mean())
+                    held_leg = landmark_array.LEG_NAMES[int(held_leg)]
+                    if held and held_confidence >= self.confidence_threshold and held_leg == self.last_balance_leg:
+                        detected, confidence, balanced_leg = True, float(held_confidence), held_leg
                 
                 if detected and confidence >= self.confidence_threshold:
                     if self.balance_start is None or self.last_balance_leg != balanced_leg:
@@ -208,6 +186,13 @@ class OneLegBalanceTask:
                 'balance_duration': 0
             }
     
+    def recommended_frame_interval(self):
+        """
+        Milliseconds until the next frame is useful
+        Balance is slow movement - a few frames a second is plenty
+        """
+        return 600 if self.balance_start is not None else 400
+    
     def get_task_info(self):
         """
         Return task configuration information
@@ -234,3 +219,4 @@ class OneLegBalanceTask:
         self.start_time = None
         self.balance_start = None
         self.last_balance_leg = None
+        self.history.clear()
@@ -9,6 +9,12 @@ import mediapipe as mp
 from datetime import datetime
 import math
 
+from . import landmark_array
+from .frame_preprocess import to_rgb
+from .landmark_history import LandmarkHistory
+from .pose_tiers import task_complexity
+from .profiling import profile_section
+
 # MediaPipe setup
 try:
     mp_pose = mp.solutions.pose
@@ -19,8 +25,16 @@ except ImportError:
     MEDIAPIPE_AVAILABLE = False
     print("WARNING: MediaPipe not available for physical assessments")
 
+# Recommended ms between frames per jump phase
+FRAME_INTERVALS = {
+    "waiting": 250,
+    "squatting": 100,
+    "jumping": 100,
+    "landed": 500
+}
+
 class FrogJumpTask:
-    def __init__(self):
+    def __init__(self, create_pose=True):
         self.task_name = "frog_jump"
         self.age_group = "4-5"
         self.title = "Can you do a frog jump?"
@@ -40,17 +54,20 @@ class FrogJumpTask:
         self.jump_threshold = 0.2   # How high hips need to be for jumping
         self.min_squat_time = 0.5   # Minimum time in squat position
         self.jump_timeout = 2.0     # Max time to complete jump after squat
+        self.steady_tolerance = 0.02  # Hip wobble allowed while re-anchoring the baseline
         
         # State tracking
         self.baseline_hip_y = None
+        self.history = LandmarkHistory()  # Recent frames for smoothed posture and hip velocity
         self.squat_detected = False
         self.jump_detected = False
         
-        # Pose detector
-        if MEDIAPIPE_AVAILABLE:
+        # Pose detector (skipped for landmark-only use such as corpus replay)
+        self.model_complexity = task_complexity(self.task_name)
+        if MEDIAPIPE_AVAILABLE and create_pose:
             self.pose = mp_pose.Pose(
                 static_image_mode=False,
-                model_complexity=1,
+                model_complexity=self.model_complexity,
                 enable_segmentation=False,
                 min_detection_confidence=0.6,
                 min_tracking_confidence=0.5
@@ -62,64 +79,68 @@ class FrogJumpTask:
         """
         Analyze body position to detect squat and jump phases
         """
-        if not landmarks or not MEDIAPIPE_AVAILABLE:
+        if landmarks is None:
             return None
         
         try:
-            # Get key landmarks
-            left_hip = landmarks.landmark[POSE_LMS.LEFT_HIP]
-            right_hip = landmarks.landmark[POSE_LMS.RIGHT_HIP]
-            left_knee = landmarks.landmark[POSE_LMS.LEFT_KNEE]
-            right_knee = landmarks.landmark[POSE_LMS.RIGHT_KNEE]
-            left_ankle = landmarks.landmark[POSE_LMS.LEFT_ANKLE]
-            right_ankle = landmarks.landmark[POSE_LMS.RIGHT_ANKLE]
-            left_shoulder = landmarks.landmark[POSE_LMS.LEFT_SHOULDER]
-            right_shoulder = landmarks.landmark[POSE_LMS.RIGHT_SHOULDER]
-            
-            # Check visibility
-            required_landmarks = [left_hip, right_hip, left_knee, right_knee, 
-                                left_ankle, right_ankle, left_shoulder, right_shoulder]
-            if any(lm.visibility < 0.5 for lm in required_landmarks):
+            arr = landmark_array.to_landmark_array(landmarks)
+            baseline = self.baseline_hip_y if self.baseline_hip_y is not None else np.nan
+            analysis = landmark_array.body_position(arr, baseline, self.squat_threshold, self.jump_threshold)
+            if not analysis['valid']:
                 return None
             
-            # Calculate average positions
-            avg_hip_y = (left_hip.y + right_hip.y) / 2
-            avg_knee_y = (left_knee.y + right_knee.y) / 2
-            avg_ankle_y = (left_ankle.y + right_ankle.y) / 2
-            avg_shoulder_y = (left_shoulder.y + right_shoulder.y) / 2
-            
-            # Calculate body ratios for position analysis
-            torso_length = avg_hip_y - avg_shoulder_y
-            thigh_length = avg_knee_y - avg_hip_y
-            shin_length = avg_ankle_y - avg_knee_y
-            
-            # Detect squatting (hips low, knees bent)
-            hip_knee_ratio = (avg_knee_y - avg_hip_y) / torso_length if torso_length > 0 else 0
-            knee_ankle_ratio = (avg_ankle_y - avg_knee_y) / torso_length if torso_length > 0 else 0
-            
             # Initialize baseline if not set
             if self.baseline_hip_y is None:
-                self.baseline_hip_y = avg_hip_y
-            
-            # Calculate relative hip position
-            hip_movement = self.baseline_hip_y - avg_hip_y  # Positive = higher than baseline
+                self.baseline_hip_y = float(analysis['avg_hip_y'])
             
             return {
-                'avg_hip_y': avg_hip_y,
-                'avg_knee_y': avg_knee_y,
-                'avg_ankle_y': avg_ankle_y,
-                'hip_movement': hip_movement,
-                'hip_knee_ratio': hip_knee_ratio,
-                'knee_ankle_ratio': knee_ankle_ratio,
-                'is_squatting': hip_movement < -self.squat_threshold,  # Hips below baseline
-                'is_jumping': hip_movement > self.jump_threshold,      # Hips above baseline
-                'knee_bend': avg_knee_y > avg_hip_y + 0.1  # Knees below hips indicates bend
+                'avg_hip_y': float(analysis['avg_hip_y']),
+                'avg_knee_y': float(analysis['avg_knee_y']),
+                'avg_ankle_y': float(analysis['avg_ankle_y']),
+                'hip_movement': float(analysis['hip_movement']),  # Positive = higher than baseline
+                'hip_knee_ratio': float(analysis['hip_knee_ratio']),
+                'knee_ankle_ratio': float(analysis['knee_ankle_ratio']),
+                'is_squatting': bool(analysis['is_squatting']),  # Hips below baseline
+                'is_jumping': bool(analysis['is_jumping']),      # Hips above baseline
+                'knee_bend': bool(analysis['knee_bend'])         # Knees below hips indicates bend
             }
             
         except Exception as e:
             print(f"Body position analysis error: {e}")
             return None
     
+    def smoothed_body_position(self, arr, frame_analysis, current_time):
+        """
+        Squat posture from the rolling mean pose, jump take-off from the
+        current frame confirmed by upward hip velocity; the landing is read
+        from the current frame alone, since hips slow and fall while still
+        in the air
+        """
+        history = self.history
+        history.push(arr, now=current_time.timestamp())
+        mean = history.mean()
+        hip_y = float((mean[landmark_array.LEFT_HIP, landmark_array.Y] +
+                       mean[landmark_array.RIGHT_HIP, landmark_array.Y]) / 2)
+        
+        # Re-anchor the standing height while the child waits still and upright,
+        # so stepping closer to the camera does not read as a squat or a jump
+        if (self.jump_state == "waiting" and history.full and
+                history.span('hip_y') < self.steady_tolerance and
+                not frame_analysis['knee_bend'] and
+                abs(hip_y - self.baseline_hip_y) < self.squat_threshold / 2):
+            self.baseline_hip_y = hip_y
+        
+        smoothed = landmark_array.body_position(mean, self.baseline_hip_y, self.squat_threshold,
+                                                self.jump_threshold)
+        hip_velocity = history.velocity('hip_y')
+        return dict(
+            frame_analysis,
+            is_squatting=bool(smoothed['is_squatting']),
+            knee_bend=bool(smoothed['knee_bend']),
+            is_taking_off=frame_analysis['is_jumping'] and hip_velocity < 0,
+            hip_velocity=hip_velocity
+        )
+    
     def update_jump_state(self, body_analysis, current_time):
         """
         Update the jump state machine based on body analysis
@@ -138,7 +159,7 @@ class FrogJumpTask:
                 return "waiting", "Squat down low like a frog preparing to jump"
         
         elif self.jump_state == "squatting":
-            if body_analysis['is_jumping']:
+            if body_analysis['is_taking_off']:
                 self.jump_state = "jumping"
                 self.state_start_time = current_time
                 return "jumping", "Fantastic jump! You're flying like a frog!"
@@ -188,20 +209,42 @@ class FrogJumpTask:
             }
         
         try:
-            # Convert BGR to RGB
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Convert BGR to RGB (into a buffer reused across frames)
+            rgb = to_rgb(frame)
             
             # Process the frame
-            results = self.pose.process(rgb)
+            with profile_section('mediapipe'):
+                results = self.pose.process(rgb)
             
-            current_time = datetime.now()
+            return self.process_landmarks(results.pose_landmarks)
+            
+        except Exception as e:
+            return {
+                'detected': False,
+                'confidence': 0.0,
+                'message': f'Detection error: {str(e)}',
+                'feedback': 'There was a problem with the camera. Please try again.',
+                'success_count': self.success_count,
+                'jump_state': 'error'
+            }
+    
+    def process_landmarks(self, landmarks, now=None):
+        """
+        Score one frame's pose landmarks (None when nobody is in view)
+        Used directly when inference runs elsewhere (see pose_scheduler);
+        now= replays recorded frames on their own clock (see score_videos)
+        """
+        try:
+            current_time = now or datetime.now()
             if self.state_start_time is None:
                 self.state_start_time = current_time
             
-            if results.pose_landmarks:
-                body_analysis = self.analyze_body_position(results.pose_landmarks)
+            if landmarks is not None:
+                arr = landmark_array.to_landmark_array(landmarks)
+                body_analysis = self.analyze_body_position(arr)
                 
                 if body_analysis:
+                    body_analysis = self.smoothed_body_position(arr, body_analysis, current_time)
                     new_state, message = self.update_jump_state(body_analysis, current_time)
                     
                     # Calculate confidence based on state and movement quality
@@ -234,7 +277,8 @@ class FrogJumpTask:
                         'jump_state': new_state,
                         'hip_movement': body_analysis['hip_movement'],
                         'is_squatting': body_analysis['is_squatting'],
-                        'is_jumping': body_analysis['is_jumping']
+                        'is_jumping': body_analysis['is_jumping'],
+                        'hip_velocity': round(body_analysis['hip_velocity'], 3)
                     }
                 else:
                     return {
@@ -265,6 +309,13 @@ class FrogJumpTask:
                 'jump_state': 'error'
             }
     
+    def recommended_frame_interval(self):
+        """
+        Milliseconds until the next frame is useful
+        The squat-to-jump transition is fast, so sample densely around it
+        """
+        return FRAME_INTERVALS.get(self.jump_state, 250)
+    
     def get_task_info(self):
         """
         Return task configuration information
@@ -291,5 +342,6 @@ class FrogJumpTask:
         self.jump_state = "waiting"
         self.state_start_time = None
         self.baseline_hip_y = None
+        self.history.clear()
         self.squat_detected = False
         self.jump_detected = False
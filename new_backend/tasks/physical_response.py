@@ -0,0 +1,134 @@
+"""
+Response bodies for the physical assessment endpoint
+full_body() is the original per-frame response: the main fields followed
+by the whole task result again under additional_data.
+
+Streaming clients can ask for compact responses instead ("compact": true).
+A compact body holds every task result field once, under the short keys
+in SHORT_KEYS (other fields keep their names), with floats rounded to
+FLOAT_DIGITS. With a session_id the server remembers the last body it sent
+per session and task, and answers with only the fields that changed:
+
+    {"s": 12, "c": 0.87, "m": "Great!"}      delta against response 11
+    {"s": 1, "r": 1, "ok": false, ...}       full snapshot ("r" = reset)
+
+The client sends back the "s" of the last response it applied as "seq";
+anything else (first frame, a dropped response, an evicted session) gets a
+full snapshot. A field that disappears is sent as null. Bodies are JSON,
+or msgpack when the client accepts application/msgpack and the msgpack
+package is installed.
+"""
+
+import threading
+from collections import OrderedDict
+
+import config
+from json_encoding import dumps_bytes
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+SHORT_KEYS = {
+    'detected': 'ok',
+    'message': 'm',
+    'feedback': 'f',
+    'confidence': 'c',
+    'task_name': 't',
+    'age_group': 'a',
+    'enhanced': 'e',
+    'success_count': 'n',
+    'detection_duration': 'd',
+    'balance_duration': 'b',
+    'balanced_leg': 'l',
+    'jump_state': 'j',
+    'next_frame_interval_ms': 'i',
+    'model_complexity': 'x',
+    'pose_reused': 'p'
+}
+SEQ_KEY = 's'
+RESET_KEY = 'r'
+FLOAT_DIGITS = 3
+_MISSING = object()
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+JSON_MIMETYPE = 'application/json'
+
+
+def full_body(result, task_type, age_group):
+    """The original enhanced response, with the task result repeated under additional_data"""
+    return {
+        'success': result.get('detected', False),
+        'message': result.get('message', 'Processing...'),
+        'feedback': result.get('feedback', ''),
+        'confidence': result.get('confidence', 0.0),
+        'enhanced': True,
+        'task_name': result.get('task_name', task_type),
+        'age_group': age_group,
+        'success_count': result.get('success_count', 0),
+        'detection_duration': result.get('detection_duration', 0),
+        'balanced_leg': result.get('balanced_leg'),
+        'jump_state': result.get('jump_state'),
+        'next_frame_interval_ms': result.get('next_frame_interval_ms', config.FRAME_INTERVAL_DEFAULT_MS),
+        'model_complexity': result.get('model_complexity'),
+        'additional_data': {
+            k: v for k, v in result.items()
+            if k not in ['detected', 'message', 'feedback', 'confidence']
+        }
+    }
+
+
+def compact_body(result):
+    """Every task result field once, short keys, rounded floats, no nulls"""
+    body = {}
+    for key, value in result.items():
+        if value is None:
+            continue
+        if isinstance(value, float):
+            value = round(value, FLOAT_DIGITS)
+        body[SHORT_KEYS.get(key, key)] = value
+    return body
+
+
+class ResponseDeltas:
+    """Last compact body sent per stream, to answer with only what changed"""
+
+    def __init__(self, max_streams=None):
+        self.max_streams = config.MAX_TASK_SESSIONS if max_streams is None else max_streams
+        self.lock = threading.Lock()
+        self.streams = OrderedDict()  # stream key -> (seq, body)
+
+    def encode(self, stream, body, client_seq=None):
+        """Delta against the client's last applied response, else a full snapshot"""
+        if stream is None:
+            return {**body, RESET_KEY: 1}
+
+        with self.lock:
+            seq, last = self.streams.get(stream, (0, None))
+            seq += 1
+            self.streams[stream] = (seq, body)
+            self.streams.move_to_end(stream)
+            while len(self.streams) > self.max_streams:
+                self.streams.popitem(last=False)
+
+        if last is None or client_seq != seq - 1:
+            return {**body, SEQ_KEY: seq, RESET_KEY: 1}
+        delta = {key: value for key, value in body.items() if last.get(key, _MISSING) != value}
+        delta.update((key, None) for key in last if key not in body)
+        delta[SEQ_KEY] = seq
+        return delta
+
+
+def serialize(body, use_msgpack=False):
+    """(bytes, mimetype) for a compact body"""
+    if use_msgpack and msgpack is not None:
+        return msgpack.packb(body), MSGPACK_MIMETYPE
+    return dumps_bytes(body, sort_keys=False), JSON_MIMETYPE
+
+
+_deltas = ResponseDeltas()
+
+
+def get_response_deltas():
+    return _deltas
@@ -0,0 +1,450 @@
+"""
+Golden-output regression corpus for the pose detectors
+Replays recorded landmark sequences (33x4 float32 per frame: x, y, z,
+visibility) through the task detection logic without running MediaPipe, so
+fast paths can be verified bit-for-bit and the classification logic can be
+benchmarked on its own
+
+Usage:
+    python -m tasks.pose_corpus record clip.mp4 pose_corpus/clip.npz
+    python -m tasks.pose_corpus synthesize pose_corpus
+    python -m tasks.pose_corpus bless pose_corpus/clip.npz
+    python -m tasks.pose_corpus verify [pose_corpus/...] [--batched]
+    python -m tasks.pose_corpus bench [pose_corpus/...] --repeat 20
+
+A corpus file is an .npz holding 'landmarks' (N, 33, 4) float32 and
+'present' (N,) bool (False where no person was detected). 'bless' adds the
+expected per-frame detector outputs computed by the current implementation.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+
+LANDMARK_COUNT = 33
+CORPUS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'pose_corpus'))
+
+FROG_FLOAT_FIELDS = ['avg_hip_y', 'avg_knee_y', 'avg_ankle_y', 'hip_movement',
+                     'hip_knee_ratio', 'knee_ankle_ratio']
+FROG_BOOL_FIELDS = ['is_squatting', 'is_jumping', 'knee_bend']
+
+
+class ReplayLandmark:
+    """Stand-in for a MediaPipe NormalizedLandmark"""
+    __slots__ = ('x', 'y', 'z', 'visibility')
+
+    def __init__(self, x, y, z, visibility):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+
+class ReplayLandmarks:
+    """Stand-in for results.pose_landmarks built from a (33, 4) array"""
+    __slots__ = ('landmark',)
+
+    def __init__(self, frame_array):
+        # float() of a float32 gives exactly the value MediaPipe hands back
+        self.landmark = [ReplayLandmark(float(x), float(y), float(z), float(v))
+                         for x, y, z, v in frame_array]
+
+
+def landmarks_to_array(pose_landmarks):
+    """Pack MediaPipe pose landmarks into a (33, 4) float32 array"""
+    return np.array([[lm.x, lm.y, lm.z, lm.visibility] for lm in pose_landmarks.landmark],
+                    dtype=np.float32)
+
+
+def load_corpus(path):
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
+
+
+def save_corpus(path, corpus):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.savez_compressed(path, **corpus)
+
+
+def replay_frames(corpus):
+    """Landmark objects per frame (None where no person was detected)"""
+    return [ReplayLandmarks(frame) if present else None
+            for frame, present in zip(corpus['landmarks'], corpus['present'])]
+
+
+def _new_tasks():
+    from .physical_0_raise_hands import RaiseHandsTask
+    from .physical_1_one_leg_balance import OneLegBalanceTask
+    from .physical_4_frog_jump import FrogJumpTask
+
+    return (RaiseHandsTask(create_pose=False),
+            OneLegBalanceTask(create_pose=False),
+            FrogJumpTask(create_pose=False))
+
+
+def run_detectors(frames):
+    """
+    Run every detector over a replayed sequence and collect per-frame outputs
+    The frog detector is stateful (baseline hip height), so frames are fed in order
+    to a fresh task instance.
+    """
+    raise_hands, one_leg, frog = _new_tasks()
+    count = len(frames)
+    out = {
+        'raise_hands_detected': np.zeros(count, dtype=bool),
+        'raise_hands_confidence': np.zeros(count, dtype=np.float64),
+        'one_leg_balance_detected': np.zeros(count, dtype=bool),
+        'one_leg_balance_confidence': np.zeros(count, dtype=np.float64),
+        'one_leg_balance_leg': np.full(count, '', dtype='<U5'),
+        'frog_jump_valid': np.zeros(count, dtype=bool)
+    }
+    for field in FROG_FLOAT_FIELDS:
+        out[f'frog_jump_{field}'] = np.full(count, np.nan, dtype=np.float64)
+    for field in FROG_BOOL_FIELDS:
+        out[f'frog_jump_{field}'] = np.zeros(count, dtype=bool)
+
+    for i, landmarks in enumerate(frames):
+        detected, confidence = raise_hands.detect_raised_hands(landmarks)
+        out['raise_hands_detected'][i] = detected
+        out['raise_hands_confidence'][i] = confidence
+
+        detected, confidence, leg = one_leg.calculate_leg_lift(landmarks)
+        out['one_leg_balance_detected'][i] = detected
+        out['one_leg_balance_confidence'][i] = confidence
+        out['one_leg_balance_leg'][i] = leg or ''
+
+        analysis = frog.analyze_body_position(landmarks)
+        if analysis:
+            out['frog_jump_valid'][i] = True
+            for field in FROG_FLOAT_FIELDS:
+                out[f'frog_jump_{field}'][i] = analysis[field]
+            for field in FROG_BOOL_FIELDS:
+                out[f'frog_jump_{field}'][i] = analysis[field]
+    return out
+
+
+def run_detectors_batched(corpus):
+    """
+    Same outputs as run_detectors(), evaluated on the whole (N, 33, 4)
+    sequence at once with the vectorized landmark rules
+    """
+    from . import landmark_array as la
+
+    arr = np.where(corpus['present'][:, None, None], corpus['landmarks'], 0.0).astype(np.float32)
+    out = {}
+
+    detected, confidence = la.raised_hands(arr)
+    out['raise_hands_detected'] = detected
+    out['raise_hands_confidence'] = confidence
+
+    detected, confidence, leg = la.leg_lift(arr)
+    out['one_leg_balance_detected'] = detected
+    out['one_leg_balance_confidence'] = confidence
+    out['one_leg_balance_leg'] = np.array([la.LEG_NAMES[int(code)] or '' for code in leg], dtype='<U5')
+
+    analysis = la.body_position(arr, la.sequence_baseline(arr))
+    valid = analysis['valid']
+    out['frog_jump_valid'] = valid
+    for field in FROG_FLOAT_FIELDS:
+        out[f'frog_jump_{field}'] = np.where(valid, analysis[field], np.nan)
+    for field in FROG_BOOL_FIELDS:
+        out[f'frog_jump_{field}'] = valid & analysis[field]
+    return out
+
+
+def bless(path):
+    """Record the current detector outputs as the expected outputs"""
+    corpus = load_corpus(path)
+    corpus = {'landmarks': corpus['landmarks'], 'present': corpus['present']}
+    for key, values in run_detectors(replay_frames(corpus)).items():
+        corpus[f'expected_{key}'] = values
+    save_corpus(path, corpus)
+    return len(corpus['landmarks'])
+
+
+def verify(path, batched=False):
+    """
+    Compare detector outputs with the blessed expectations
+    Returns a list of (output_name, first_mismatching_frame, expected, actual)
+    """
+    corpus = load_corpus(path)
+    expected_keys = [k for k in corpus if k.startswith('expected_')]
+    if not expected_keys:
+        raise ValueError(f"{path} has no expected outputs - run 'bless' first")
+
+    actual = run_detectors_batched(corpus) if batched else run_detectors(replay_frames(corpus))
+    mismatches = []
+    for key in sorted(expected_keys):
+        name = key[len('expected_'):]
+        expected_values = corpus[key]
+        actual_values = actual[name]
+        equal_nan = expected_values.dtype.kind == 'f'
+        if not np.array_equal(expected_values, actual_values, equal_nan=equal_nan):
+            differs = expected_values != actual_values
+            if equal_nan:
+                differs &= ~(np.isnan(expected_values) & np.isnan(actual_values))
+            frame = int(np.argmax(differs))
+            mismatches.append((name, frame, expected_values[frame], actual_values[frame]))
+    return mismatches
+
+
+def bench(paths, repeat=10):
+    """Frames/s of each detector over the corpus (landmark objects prebuilt)"""
+    frames = []
+    for path in paths:
+        frames.extend(replay_frames(load_corpus(path)))
+
+    raise_hands, one_leg, _ = _new_tasks()
+    detectors = {
+        'raise_hands': raise_hands.detect_raised_hands,
+        'one_leg_balance': one_leg.calculate_leg_lift
+    }
+    results = {}
+    for name, detector in detectors.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for landmarks in frames:
+                detector(landmarks)
+        elapsed = time.perf_counter() - start
+        results[name] = round(len(frames) * repeat / elapsed, 1) if elapsed > 0 else 0.0
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        # Fresh task per pass so the baseline matches a real session
+        frog = _new_tasks()[2]
+        for landmarks in frames:
+            frog.analyze_body_position(landmarks)
+    elapsed = time.perf_counter() - start
+    results['frog_jump'] = round(len(frames) * repeat / elapsed, 1) if elapsed > 0 else 0.0
+
+    # All detectors over the whole corpus as one vectorized batch
+    corpus = {
+        'landmarks': np.concatenate([load_corpus(p)['landmarks'] for p in paths]),
+        'present': np.concatenate([load_corpus(p)['present'] for p in paths])
+    }
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run_detectors_batched(corpus)
+    elapsed = time.perf_counter() - start
+    results['all_batched'] = round(len(frames) * repeat / elapsed, 1) if elapsed > 0 else 0.0
+    return len(frames), results
+
+
+def record(video_path, out_path, model_complexity=1):
+    """Extract a landmark corpus from a recorded video with MediaPipe"""
+    import cv2
+    import mediapipe as mp
+
+    pose = mp.solutions.pose.Pose(
+        static_image_mode=False,
+        model_complexity=model_complexity,
+        enable_segmentation=False,
+        min_detection_confidence=0.6,
+        min_tracking_confidence=0.5
+    )
+    capture = cv2.VideoCapture(video_path)
+    landmarks, present = [], []
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if results.pose_landmarks:
+                landmarks.append(landmarks_to_array(results.pose_landmarks))
+                present.append(True)
+            else:
+                landmarks.append(np.zeros((LANDMARK_COUNT, 4), dtype=np.float32))
+                present.append(False)
+    finally:
+        capture.release()
+        pose.close()
+
+    save_corpus(out_path, {
+        'landmarks': np.array(landmarks, dtype=np.float32).reshape(-1, LANDMARK_COUNT, 4),
+        'present': np.array(present, dtype=bool)
+    })
+    return len(landmarks)
+
+
+# ---------------------------------------------------------------------------
+# Synthetic sequences (for when no recorded video is at hand)
+# ---------------------------------------------------------------------------
+
+# Standing child facing the camera, normalized image coordinates (x, y)
+_STANDING = np.array([
+    (0.50, 0.20),                                             # nose
+    (0.49, 0.18), (0.48, 0.18), (0.47, 0.18),                 # left eye inner/eye/outer
+    (0.51, 0.18), (0.52, 0.18), (0.53, 0.18),                 # right eye inner/eye/outer
+    (0.46, 0.19), (0.54, 0.19),                               # ears
+    (0.49, 0.23), (0.51, 0.23),                               # mouth
+    (0.58, 0.32), (0.42, 0.32),                               # shoulders
+    (0.60, 0.44), (0.40, 0.44),                               # elbows
+    (0.61, 0.55), (0.39, 0.55),                               # wrists
+    (0.62, 0.57), (0.38, 0.57),                               # pinkies
+    (0.61, 0.58), (0.39, 0.58),                               # index fingers
+    (0.60, 0.57), (0.40, 0.57),                               # thumbs
+    (0.55, 0.55), (0.45, 0.55),                               # hips
+    (0.55, 0.72), (0.45, 0.72),                               # knees
+    (0.55, 0.88), (0.45, 0.88),                               # ankles
+    (0.55, 0.90), (0.45, 0.90),                               # heels
+    (0.56, 0.92), (0.44, 0.92),                               # foot index
+], dtype=np.float64)
+
+
+def _with(base, **points):
+    pose = base.copy()
+    index = {
+        'l_elbow': 13, 'r_elbow': 14, 'l_wrist': 15, 'r_wrist': 16,
+        'l_knee': 25, 'r_knee': 26, 'l_ankle': 27, 'r_ankle': 28,
+        'l_heel': 29, 'r_heel': 30, 'l_foot': 31, 'r_foot': 32
+    }
+    for name, xy in points.items():
+        pose[index[name]] = xy
+        if name.endswith('wrist'):
+            # Hand points follow the wrist
+            side = 0 if name.startswith('l') else 1
+            for hand in (17, 19, 21):
+                pose[hand + side] = (xy[0], xy[1] - 0.02)
+    return pose
+
+
+def _frog(base, dy, squat=False):
+    pose = base * 0.7 + np.array([0.15, 0.0])
+    pose[:, 1] += dy
+    if squat:
+        hip_y = pose[23, 1]
+        pose[25:27, 1] = hip_y + 0.12
+        pose[25, 0] += 0.06
+        pose[26, 0] -= 0.06
+        pose[27:33, 1] = hip_y + 0.21
+    return pose
+
+
+SYNTHETIC_POSES = {
+    'stand': _STANDING,
+    'hands_up': _with(_STANDING, l_elbow=(0.60, 0.18), r_elbow=(0.40, 0.18),
+                      l_wrist=(0.59, 0.06), r_wrist=(0.41, 0.06)),
+    'hands_half': _with(_STANDING, l_elbow=(0.66, 0.30), r_elbow=(0.34, 0.30),
+                        l_wrist=(0.64, 0.22), r_wrist=(0.36, 0.26)),
+    'hands_wide': _with(_STANDING, l_elbow=(0.72, 0.20), r_elbow=(0.28, 0.20),
+                        l_wrist=(0.82, 0.08), r_wrist=(0.18, 0.08)),
+    'left_leg_up': _with(_STANDING, l_knee=(0.57, 0.40), l_ankle=(0.60, 0.38),
+                         l_heel=(0.60, 0.40), l_foot=(0.62, 0.37)),
+    'left_leg_high': _with(_STANDING, l_knee=(0.57, 0.35), l_ankle=(0.60, 0.32),
+                           l_heel=(0.60, 0.34), l_foot=(0.62, 0.31)),
+    'right_leg_high': _with(_STANDING, r_knee=(0.43, 0.35), r_ankle=(0.40, 0.32),
+                            r_heel=(0.40, 0.34), r_foot=(0.38, 0.31)),
+    'frog_stand': _frog(_STANDING, -0.05),
+    'frog_squat': _frog(_STANDING, 0.32, squat=True),
+    'frog_jump': _frog(_STANDING, -0.30),
+}
+
+SYNTHETIC_SCRIPTS = {
+    'synthetic_raise_hands': ['stand', 'hands_up', 'hands_up', 'hands_half', 'hands_up',
+                              'hands_wide', 'stand', 'hands_up'],
+    'synthetic_one_leg': ['stand', 'left_leg_up', 'left_leg_high', 'left_leg_high', 'stand',
+                          'right_leg_high', 'right_leg_high', 'stand'],
+    'synthetic_frog_jump': ['frog_stand', 'frog_squat', 'frog_jump', 'frog_stand', 'frog_squat',
+                            'frog_stand', 'frog_squat', 'frog_jump', 'frog_stand'],
+}
+
+
+def synthesize(script, hold=12, transition=6, seed=0, jitter=0.008, dropout=0.03, absent=0.02):
+    """
+    Build a synthetic sequence by holding and blending between key poses
+    Jitter, joint dropouts (low visibility) and missing frames make the
+    detectors cross their thresholds in both directions.
+    """
+    rng = np.random.default_rng(seed)
+    keyframes = [SYNTHETIC_POSES[name] for name in script]
+    coords = []
+    for i, pose in enumerate(keyframes):
+        coords.extend([pose] * hold)
+        if i + 1 < len(keyframes):
+            for step in range(1, transition + 1):
+                t = step / (transition + 1)
+                coords.append(pose * (1 - t) + keyframes[i + 1] * t)
+
+    count = len(coords)
+    landmarks = np.zeros((count, LANDMARK_COUNT, 4), dtype=np.float32)
+    landmarks[:, :, :2] = np.array(coords) + rng.normal(0.0, jitter, size=(count, LANDMARK_COUNT, 2))
+    landmarks[:, :, 2] = rng.normal(0.0, 0.05, size=(count, LANDMARK_COUNT))
+    visibility = rng.uniform(0.8, 1.0, size=(count, LANDMARK_COUNT))
+    visibility[rng.random((count, LANDMARK_COUNT)) < dropout] = 0.3
+    landmarks[:, :, 3] = visibility
+    present = rng.random(count) >= absent
+    landmarks[~present] = 0.0
+    return {'landmarks': landmarks, 'present': present}
+
+
+def _corpus_paths(paths):
+    if paths:
+        return paths
+    return sorted(glob.glob(os.path.join(CORPUS_DIR, '*.npz')))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pose detector golden-output corpus')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('record', help='Extract landmarks from a video with MediaPipe')
+    p.add_argument('video')
+    p.add_argument('output')
+    p.add_argument('--model-complexity', type=int, default=1)
+
+    p = sub.add_parser('synthesize', help='Write the synthetic sequences')
+    p.add_argument('directory', nargs='?', default=CORPUS_DIR)
+    p.add_argument('--seed', type=int, default=0)
+
+    p = sub.add_parser('bless', help='Store current detector outputs as expected')
+    p.add_argument('paths', nargs='*')
+
+    p = sub.add_parser('verify', help='Check detector outputs bit-for-bit')
+    p.add_argument('paths', nargs='*')
+    p.add_argument('--batched', action='store_true', help='Verify the vectorized batch path')
+
+    p = sub.add_parser('bench', help='Benchmark the detectors without MediaPipe')
+    p.add_argument('paths', nargs='*')
+    p.add_argument('--repeat', type=int, default=10)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        count = record(args.video, args.output, args.model_complexity)
+        print(f"✅ Recorded {count} frames to {args.output} (run 'bless' to add expected outputs)")
+    elif args.command == 'synthesize':
+        for i, (name, script) in enumerate(sorted(SYNTHETIC_SCRIPTS.items())):
+            path = os.path.join(args.directory, f'{name}.npz')
+            save_corpus(path, synthesize(script, seed=args.seed + i))
+            print(f"✅ Wrote {path}")
+    elif args.command == 'bless':
+        for path in _corpus_paths(args.paths):
+            print(f"✅ Blessed {path} ({bless(path)} frames)")
+    elif args.command == 'verify':
+        failed = False
+        for path in _corpus_paths(args.paths):
+            mismatches = verify(path, args.batched)
+            if mismatches:
+                failed = True
+                print(f"❌ {path}")
+                for name, frame, expected, actual in mismatches:
+                    print(f"   {name}: frame {frame} expected {expected!r} got {actual!r}")
+            else:
+                print(f"✅ {path}")
+        return 1 if failed else 0
+    elif args.command == 'bench':
+        paths = _corpus_paths(args.paths)
+        count, results = bench(paths, args.repeat)
+        print(f"⏱️  {count} frames x {args.repeat} from {len(paths)} corpus files")
+        for name, fps in results.items():
+            print(f"   {name}: {fps:,.0f} frames/s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,385 @@
+"""
+Micro-batching scheduler in front of MediaPipe pose inference
+Frames from concurrent sessions wait at most POSE_BATCH_WINDOW_MS (or until
+POSE_BATCH_MAX_FRAMES are queued), run as one batch, and each caller gets
+its (33, 4) landmark array back to score with its own task state.
+
+The MediaPipe Pose solution takes one image per call, so a batch is spread
+over a small pool of inference threads (the graph runs outside the GIL).
+Each session keeps its own graph so tracking never mixes two children, and
+a session's frames run in arrival order. Sessions finish independently: the
+next batch is collected while slow ones are still running, and a session's
+later frames queue behind its own earlier ones only. With POSE_ROI_CROP
+a session's frames are cropped to the area around its last detection.
+Requests name a model complexity tier; TierController lowers it under load
+(see pose_tiers). With POSE_WORKER_PROCESSES > 0 inference moves to worker
+processes fed through shared memory (see shared_frames).
+"""
+
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+import config
+from . import landmark_array
+from .frame_preprocess import RoiTracker, to_rgb
+from .metrics import metrics
+from .pose_tiers import TierController, TIER_NAMES
+from .shared_frames import ProcessPosePool
+
+try:
+    import mediapipe as mp
+    mp_pose = mp.solutions.pose
+    MEDIAPIPE_AVAILABLE = True
+except (ImportError, AttributeError):
+    MEDIAPIPE_AVAILABLE = False
+
+# A session counts as active for batching if it sent a frame this recently
+ACTIVE_SESSION_SECONDS = 2.0
+
+
+def create_pose_graph(model_complexity=None):
+    """Pose graph with the settings the physical tasks use"""
+    if model_complexity is None:
+        model_complexity = config.POSE_MODEL_COMPLEXITY
+    return mp_pose.Pose(
+        static_image_mode=False,
+        model_complexity=model_complexity,
+        enable_segmentation=False,
+        min_detection_confidence=0.6,
+        min_tracking_confidence=0.5
+    )
+
+
+class PoseRequest:
+    __slots__ = ('session_key', 'tier', 'frame', 'slot', 'window', 'reset', 'enqueued', 'done', 'landmarks',
+                 'error')
+
+    def __init__(self, session_key, frame, tier):
+        self.session_key = session_key
+        self.tier = tier
+        self.frame = frame
+        self.slot = None  # Shared frame slot when running in worker processes
+        self.window = None
+        self.reset = False  # Crop window changed: the graph must drop its tracking state
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.landmarks = None
+        self.error = None
+
+
+class PoseBatchScheduler:
+    def __init__(self, pose_factory=None, window_ms=None, max_batch=None, workers=None,
+                 max_sessions=None, roi_crop=None, tiers=None, processes=None, tier_switches=None, registry=None):
+        self.pose_factory = pose_factory or create_pose_graph
+        self.window = (config.POSE_BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000.0
+        self.max_batch = max(1, config.POSE_BATCH_MAX_FRAMES if max_batch is None else max_batch)
+        self.workers = max(1, config.POSE_INFERENCE_WORKERS if workers is None else workers)
+        self.max_sessions = max(1, config.POSE_MAX_SESSION_GRAPHS if max_sessions is None else max_sessions)
+        self.roi_crop = config.POSE_ROI_CROP if roi_crop is None else roi_crop
+        self.metrics = registry or metrics
+        self.tiers = tiers or TierController(registry=self.metrics)
+        self.tier_switches = config.POSE_TIER_SWITCHES_PER_BATCH if tier_switches is None else tier_switches
+
+        self._queue = queue.Queue()
+        self._graphs = OrderedDict()  # session_key -> (tier, graph); a tier change replaces the graph
+        self._session_tiers = {}  # session_key -> tier its frames currently run at
+        self._graphs_lock = threading.Lock()
+        self._rois = {}  # session_key -> RoiTracker, evicted with the graph
+        self._running = {}  # session_key -> request groups waiting behind its running group
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='pose-infer') if self.workers > 1 else None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._last_seen = {}  # session_key -> perf_counter of its last frame
+
+        self.processes = config.POSE_WORKER_PROCESSES if processes is None else processes
+        self._pool = None
+
+    def start(self):
+        with self._start_lock:
+            if self.processes > 0 and self._pool is None:
+                self._pool = ProcessPosePool(self.processes, config.POSE_SHARED_FRAME_SLOTS,
+                                             config.POSE_SHARED_FRAME_MAX_PIXELS, self.max_sessions,
+                                             graph_factory=None if self.pose_factory is create_pose_graph
+                                             else self.pose_factory)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='pose-batcher', daemon=True)
+                self._thread.start()
+
+    def tier_for(self, requested=None):
+        """Model complexity to use for a task asking for `requested` right now"""
+        return self.tiers.effective(config.POSE_MODEL_COMPLEXITY if requested is None else requested)
+
+    def infer(self, session_key, frame, tier=None, timeout=None):
+        """
+        Queue one BGR frame and wait for its landmarks
+        Returns a (33, 4) float32 array, or None when no person was found
+        """
+        request = PoseRequest(session_key, frame, self.tier_for() if tier is None else tier)
+        self.start()
+        if self._pool is not None:
+            self._stage_shared(request, timeout)
+        self._queue.put(request)
+        self.metrics.gauge('pose_batch.queue_depth', self._queue.qsize())
+
+        timeout = config.POSE_INFERENCE_TIMEOUT if timeout is None else timeout
+        if not request.done.wait(timeout):
+            self.metrics.incr('pose_batch.timeouts')
+            raise TimeoutError(f'Pose inference timed out after {timeout:.1f}s')
+        latency_ms = (time.perf_counter() - request.enqueued) * 1000
+        self.metrics.observe('pose_batch.latency_ms', latency_ms)
+        self.tiers.record(latency_ms)
+        if request.error is not None:
+            raise request.error
+        return request.landmarks
+
+    def drop_session(self, session_key):
+        """Release the graph held for a finished session"""
+        with self._graphs_lock:
+            entry = self._graphs.pop(session_key, None)
+            self._rois.pop(session_key, None)
+            self._session_tiers.pop(session_key, None)
+        if entry is not None:
+            entry[1].close()
+        if self._pool is not None:
+            self._pool.drop_session(session_key)
+
+    def shutdown(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        with self._graphs_lock:
+            graphs = [graph for _, graph in self._graphs.values()]
+            self._graphs.clear()
+        for graph in graphs:
+            graph.close()
+
+    def _active_sessions(self, now):
+        """Sessions that sent a frame recently - no point waiting for more than these"""
+        stale = [key for key, seen in self._last_seen.items() if now - seen > ACTIVE_SESSION_SECONDS]
+        for key in stale:
+            del self._last_seen[key]
+        return max(1, len(self._last_seen))
+
+    def _collect(self):
+        """
+        Block for the first frame, then fill the batch until the window
+        closes or every recently active session has a frame in it
+        """
+        batch = [self._queue.get()]
+        now = time.perf_counter()
+        if batch[0] is not None:
+            self._last_seen[batch[0].session_key] = now
+        target = min(self.max_batch, self._active_sessions(now))
+        deadline = now + self.window
+        while len(batch) < target and batch[-1] is not None:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            if request is not None:
+                self._last_seen[request.session_key] = time.perf_counter()
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            stop = batch[-1] is None
+            batch = [r for r in batch if r is not None]
+            if batch:
+                self._run_batch(batch)
+            if stop:
+                return
+
+    def _graph_for(self, session_key, tier):
+        """A session's graph at its tier; a missing one is built outside the lock"""
+        with self._graphs_lock:
+            entry = self._graphs.get(session_key)
+            if entry is not None and entry[0] == tier:
+                self._graphs.move_to_end(session_key)
+                return entry[1]
+
+        graph = self.pose_factory(tier)
+        with self._graphs_lock:
+            replaced = self._graphs.pop(session_key, None)
+            self._graphs[session_key] = (tier, graph)
+            # Evict least recently used sessions, never one that is running
+            evicted = [replaced[1]] if replaced is not None else []
+            for key in list(self._graphs):
+                if len(self._graphs) <= self.max_sessions:
+                    break
+                if key != session_key and key not in self._running:
+                    evicted.append(self._graphs.pop(key)[1])
+                    self._rois.pop(key, None)
+                    self._session_tiers.pop(key, None)
+            count = len(self._graphs)
+        for old in evicted:
+            old.close()
+        self.metrics.incr('pose_batch.graph_builds')
+        self.metrics.gauge('pose_batch.graphs', count)
+        return graph
+
+    def _assign_tiers(self, batch):
+        """
+        Move at most tier_switches sessions to a new tier per batch; the rest
+        keep their current graph until a later batch has room for them
+        """
+        switches = 0
+        with self._graphs_lock:
+            for request in batch:
+                current = self._session_tiers.get(request.session_key)
+                if current is not None and current != request.tier:
+                    if switches < self.tier_switches:
+                        switches += 1
+                    else:
+                        request.tier = current
+                        self.metrics.incr('pose_tier.deferred_switches')
+                self._session_tiers[request.session_key] = request.tier
+        if switches:
+            self.metrics.incr('pose_tier.session_switches', switches)
+
+    def _roi_for(self, session_key):
+        roi = self._rois.get(session_key)
+        if roi is None:
+            roi = self._rois.setdefault(session_key, RoiTracker())
+        return roi
+
+    def _stage_shared(self, request, timeout):
+        """Crop and write the frame into a shared slot from the caller's thread"""
+        frame = request.frame
+        if self.roi_crop:
+            roi = self._roi_for(request.session_key)
+            frame, request.window = roi.crop(frame)
+            request.reset = roi.switch_window(request.window)
+        request.slot = self._pool.ring.acquire(config.POSE_INFERENCE_TIMEOUT if timeout is None else timeout)
+        self._pool.ring.write_frame(request.slot, frame)
+        request.frame = None
+
+    def _finish_shared(self, request, landmarks, ok):
+        """Completion callback from the worker pool's result thread"""
+        if not ok:
+            request.error = RuntimeError('Pose worker failed on this frame')
+        elif self.roi_crop:
+            if request.window is not None:
+                self.metrics.incr('pose_roi.cropped')
+                if landmarks is None:
+                    self.metrics.incr('pose_roi.lost')
+            landmarks = RoiTracker.remap(landmarks, request.window)
+            self._roi_for(request.session_key).update(landmarks)
+        request.landmarks = landmarks
+        request.done.set()
+
+    def _run_batch(self, batch):
+        started = time.perf_counter()
+        self._assign_tiers(batch)
+        groups = OrderedDict()
+        for request in batch:
+            groups.setdefault((request.session_key, request.tier), []).append(request)
+            self.metrics.incr(f'pose_tier.frames.{TIER_NAMES[request.tier]}')
+            self.metrics.observe('pose_batch.queue_wait_ms', (started - request.enqueued) * 1000)
+
+        if self._pool is not None:
+            # Workers run the batch; each session always lands on the same worker, in order
+            for request in batch:
+                self._pool.submit(request.slot, request.session_key, request.tier,
+                                  lambda landmarks, ok, request=request: self._finish_shared(request, landmarks, ok),
+                                  reset=request.reset)
+            self.metrics.observe('pose_batch.size', len(batch))
+            self.metrics.observe('pose_batch.sessions', len(groups))
+            self.metrics.incr('pose_batch.batches')
+            self.metrics.incr('pose_batch.frames', len(batch))
+            self.metrics.gauge('pose_batch.queue_depth', self._queue.qsize())
+            self.tiers.update(self._queue.qsize())
+            return
+
+        sessions = OrderedDict()
+        for request in batch:
+            sessions.setdefault(request.session_key, []).append(request)
+        for session_key, requests in sessions.items():
+            if self._executor is None:
+                self._infer_group(session_key, requests)
+            else:
+                self._dispatch(session_key, requests)
+
+        self.metrics.observe('pose_batch.size', len(batch))
+        self.metrics.observe('pose_batch.sessions', len(groups))
+        self.metrics.incr('pose_batch.batches')
+        self.metrics.incr('pose_batch.frames', len(batch))
+        self.metrics.gauge('pose_batch.queue_depth', self._queue.qsize())
+        self.tiers.update(self._queue.qsize())
+
+    def _dispatch(self, session_key, requests):
+        """Run a session's frames after its earlier ones, without waiting for other sessions"""
+        with self._graphs_lock:
+            waiting = self._running.get(session_key)
+            if waiting is not None:
+                waiting.append(requests)
+                return
+            self._running[session_key] = deque()
+        self._executor.submit(self._run_session, session_key, requests)
+
+    def _run_session(self, session_key, requests):
+        """Executor job: one session's groups in order until none are waiting"""
+        while requests is not None:
+            self._infer_group(session_key, requests)
+            with self._graphs_lock:
+                waiting = self._running[session_key]
+                if waiting:
+                    requests = waiting.popleft()
+                else:
+                    del self._running[session_key]
+                    requests = None
+
+    def _detect(self, graph, image):
+        results = graph.process(to_rgb(image))
+        return landmark_array.to_landmark_array(results.pose_landmarks)
+
+    def _reset_graph(self, graph):
+        """Drop a graph's tracking state before it sees another crop window"""
+        graph.reset()
+        self.metrics.incr('pose_roi.graph_resets')
+
+    def _infer_group(self, session_key, requests):
+        started = time.perf_counter()
+        roi = self._roi_for(session_key) if self.roi_crop and requests else None
+        for request in requests:
+            try:
+                graph = self._graph_for(session_key, request.tier)
+                if roi is None:
+                    request.landmarks = self._detect(graph, request.frame)
+                    continue
+                image, window = roi.crop(request.frame)
+                if roi.switch_window(window):
+                    self._reset_graph(graph)
+                landmarks = self._detect(graph, image)
+                if window is not None:
+                    self.metrics.incr('pose_roi.cropped')
+                    if landmarks is None:
+                        # Person left the crop - look at the whole frame again
+                        self.metrics.incr('pose_roi.lost')
+                        window = None
+                        roi.switch_window(None)
+                        self._reset_graph(graph)
+                        landmarks = self._detect(graph, request.frame)
+                landmarks = RoiTracker.remap(landmarks, window)
+                roi.update(landmarks)
+                request.landmarks = landmarks
+            except Exception as e:
+                request.error = e
+            finally:
+                request.frame = None
+                request.done.set()
+        self.metrics.observe('pose_batch.inference_ms', (time.perf_counter() - started) * 1000)
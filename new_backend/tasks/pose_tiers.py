@@ -0,0 +1,92 @@
+"""
+MediaPipe Pose model complexity tiers
+Each task asks for a tier (0 = lite, 1 = full, 2 = heavy; see
+POSE_MODEL_COMPLEXITY / POSE_TASK_COMPLEXITY). TierController caps that
+request by server load: when the inference queue or recent p95 latency
+crosses the high-water marks the ceiling steps down one tier, and once
+both stay under the low-water marks for a cooldown period it steps back up.
+"""
+
+import threading
+import time
+from collections import deque
+
+import config
+from .metrics import metrics
+
+TIERS = (0, 1, 2)
+TIER_NAMES = {0: 'lite', 1: 'full', 2: 'heavy'}
+
+
+def task_complexity(task_name):
+    """Configured tier for a task"""
+    tier = config.POSE_TASK_COMPLEXITY.get(task_name, config.POSE_MODEL_COMPLEXITY)
+    return min(max(int(tier), TIERS[0]), TIERS[-1])
+
+
+class TierController:
+    def __init__(self, enabled=None, queue_high=None, queue_low=None, p95_high_ms=None, p95_low_ms=None,
+                 cooldown=None, window=64, registry=None):
+        self.enabled = config.POSE_TIER_AUTO if enabled is None else enabled
+        self.queue_high = config.POSE_TIER_QUEUE_HIGH if queue_high is None else queue_high
+        self.queue_low = config.POSE_TIER_QUEUE_LOW if queue_low is None else queue_low
+        self.p95_high_ms = config.POSE_TIER_P95_HIGH_MS if p95_high_ms is None else p95_high_ms
+        self.p95_low_ms = config.POSE_TIER_P95_LOW_MS if p95_low_ms is None else p95_low_ms
+        self.cooldown = config.POSE_TIER_COOLDOWN_SECONDS if cooldown is None else cooldown
+        self.metrics = registry or metrics
+
+        self.lock = threading.Lock()
+        self.ceiling = TIERS[-1]
+        self.highest_requested = TIERS[0]  # Steps above this would change nothing
+        self.latencies = deque(maxlen=window)
+        self.last_change = time.monotonic()
+        self.metrics.gauge('pose_tier.ceiling', self.ceiling)
+
+    def effective(self, requested):
+        """Tier to run a task that asked for `requested` at the current load"""
+        with self.lock:
+            if requested > self.highest_requested:
+                self.highest_requested = requested
+            return min(requested, self.ceiling)
+
+    def record(self, latency_ms):
+        with self.lock:
+            self.latencies.append(latency_ms)
+
+    def p95(self):
+        with self.lock:
+            ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+    def update(self, queue_depth, now=None):
+        """Re-evaluate the ceiling; returns the new ceiling"""
+        if not self.enabled:
+            return self.ceiling
+        now = time.monotonic() if now is None else now
+        if now - self.last_change < self.cooldown:
+            return self.ceiling
+
+        p95 = self.p95()
+        overloaded = queue_depth > self.queue_high or p95 > self.p95_high_ms
+        relaxed = queue_depth <= self.queue_low and p95 < self.p95_low_ms
+
+        with self.lock:
+            top = min(self.ceiling, self.highest_requested)
+            if overloaded and top > TIERS[0]:
+                self.ceiling = top - 1
+                self.metrics.incr('pose_tier.downgrades')
+            elif relaxed and self.ceiling < self.highest_requested:
+                self.ceiling += 1
+                self.metrics.incr('pose_tier.upgrades')
+            else:
+                return self.ceiling
+            # Judge the new tier on its own latencies
+            self.latencies.clear()
+            self.last_change = now
+            ceiling = self.ceiling
+
+        self.metrics.gauge('pose_tier.ceiling', ceiling)
+        print(f"⚙️  Pose model ceiling -> {TIER_NAMES[ceiling]} (queue {queue_depth}, p95 {p95:.0f} ms)")
+        return ceiling
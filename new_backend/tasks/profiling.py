@@ -0,0 +1,166 @@
+"""
+Opt-in per-request profiler for the AI endpoints
+Captures a cProfile trace plus named section timings and keeps the most
+recent traces in a bounded on-disk ring buffer. Asking for a trace with the
+X-Profile header takes the admin token too; otherwise only sampling
+(PROFILE_SAMPLE_RATE) profiles a request.
+"""
+
+import cProfile
+import hmac
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import config
+
+_local = threading.local()
+_TRACE_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+def admin_token_valid(headers):
+    """Whether the X-Admin-Token header matches ADMIN_TOKEN (never when none is set)"""
+    if not config.ADMIN_TOKEN:
+        return False
+    return hmac.compare_digest(headers.get('X-Admin-Token', ''), config.ADMIN_TOKEN)
+
+
+@contextmanager
+def profile_section(name):
+    """
+    Time a named stage (frame decode, MediaPipe call, process_frame...)
+    Does nothing unless the current request is being profiled
+    """
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        yield
+        return
+
+    trace['stack'].append(name)
+    path = '/'.join(trace['stack'])
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        trace['stack'].pop()
+        section = trace['sections'].setdefault(path, {'calls': 0, 'total_ms': 0.0})
+        section['calls'] += 1
+        section['total_ms'] = round(section['total_ms'] + elapsed_ms, 3)
+
+
+class RequestProfiler:
+    def __init__(self, trace_dir=None, max_traces=None, sample_rate=None):
+        self.trace_dir = trace_dir or config.PROFILE_DIR
+        self.max_traces = max_traces if max_traces is not None else config.PROFILE_MAX_TRACES
+        self.sample_rate = sample_rate if sample_rate is not None else config.PROFILE_SAMPLE_RATE
+        self._lock = threading.Lock()
+
+    def should_profile(self, headers):
+        """
+        Profile when an admin asks for it or when the request is sampled
+        A bare X-Profile header is ignored: a trace costs CPU and disk, and
+        would push real traces out of the ring buffer.
+        """
+        if (headers.get(config.PROFILE_HEADER, '').strip().lower() in ('1', 'true', 'yes') and
+                admin_token_valid(headers)):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    @contextmanager
+    def profile(self, endpoint):
+        """
+        Profile the enclosed block and store the trace
+        Yields the trace metadata dict; 'trace_id' is filled in on exit
+        """
+        if getattr(_local, 'trace', None) is not None:
+            # Already profiling this thread (nested call) - just run the block
+            yield _local.trace
+            return
+
+        trace = {
+            'trace_id': uuid.uuid4().hex,
+            'endpoint': endpoint,
+            'started_at': datetime.now().isoformat(),
+            'sections': {},
+            'stack': []
+        }
+        profiler = cProfile.Profile()
+        _local.trace = trace
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield trace
+        finally:
+            profiler.disable()
+            trace['duration_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            _local.trace = None
+            del trace['stack']
+            try:
+                self._store(trace, profiler)
+            except OSError as e:
+                print(f"Profile trace write error: {e}")
+
+    def _store(self, trace, profiler):
+        """
+        Write the pstats dump and metadata, then trim the ring buffer
+        """
+        with self._lock:
+            os.makedirs(self.trace_dir, exist_ok=True)
+            base = os.path.join(self.trace_dir, trace['trace_id'])
+            profiler.dump_stats(base + '.prof')
+            with open(base + '.json', 'w') as f:
+                json.dump(trace, f)
+            self._trim()
+
+    def _trim(self):
+        traces = self._trace_files()
+        excess = len(traces) - max(self.max_traces, 1)
+        for meta_path in traces[:max(excess, 0)]:
+            for path in (meta_path, meta_path[:-5] + '.prof'):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    def _trace_files(self):
+        """
+        Metadata files, oldest first
+        """
+        if not os.path.isdir(self.trace_dir):
+            return []
+        paths = [os.path.join(self.trace_dir, name) for name in os.listdir(self.trace_dir)
+                 if name.endswith('.json')]
+        return sorted(paths, key=os.path.getmtime)
+
+    def list_traces(self):
+        """
+        Metadata for the stored traces, newest first
+        """
+        traces = []
+        for meta_path in reversed(self._trace_files()):
+            try:
+                with open(meta_path) as f:
+                    traces.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return traces
+
+    def trace_path(self, trace_id):
+        """
+        Path of the .prof file for a trace, or None if it does not exist
+        """
+        if not _TRACE_ID_RE.match(trace_id or ''):
+            return None
+        path = os.path.join(self.trace_dir, trace_id + '.prof')
+        return path if os.path.exists(path) else None
+
+
+# Global instance
+request_profiler = RequestProfiler()
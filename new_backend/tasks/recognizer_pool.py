@@ -0,0 +1,161 @@
+"""
+Pool of reusable Vosk recognizers
+A KaldiRecognizer holds decoder state for one stream at a time and, with a
+grammar, a compiled grammar graph that is slow to build. Recognizers are
+kept per (model, sample rate, grammar): a request checks one out, decodes
+its clip and returns it, and FinalResult() leaves it reset for the next
+clip. Up to SPEECH_RECOGNIZERS_PER_KEY are built per key; further requests
+wait (at most SPEECH_RECOGNIZER_WAIT_TIMEOUT seconds) for one to come back.
+A recognizer whose decode raised is dropped rather than returned.
+
+Occupancy and waits are recorded in metrics as recognizer_pool.*.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import config
+from .metrics import metrics
+
+
+def create_recognizer(model, sample_rate, grammar=None):
+    import vosk
+
+    if grammar:
+        rec = vosk.KaldiRecognizer(model, sample_rate, grammar)
+    else:
+        rec = vosk.KaldiRecognizer(model, sample_rate)
+    rec.SetWords(True)
+    return rec
+
+
+class _Slot:
+    """Recognizers for one (model, rate, grammar)"""
+    __slots__ = ('model', 'idle', 'created', 'in_use')
+
+    def __init__(self, model):
+        self.model = model  # Held so id(model) in the key cannot be reused
+        self.idle = []
+        self.created = 0
+        self.in_use = 0
+
+
+class RecognizerPool:
+    def __init__(self, max_per_key=None, max_keys=None, timeout=None, factory=None, registry=None):
+        self.max_per_key = max(1, config.SPEECH_RECOGNIZERS_PER_KEY if max_per_key is None else max_per_key)
+        self.max_keys = max(1, config.SPEECH_RECOGNIZER_POOL_KEYS if max_keys is None else max_keys)
+        self.timeout = config.SPEECH_RECOGNIZER_WAIT_TIMEOUT if timeout is None else timeout
+        self.factory = factory or create_recognizer
+        self.metrics = registry or metrics
+        self.lock = threading.Lock()
+        self.returned = threading.Condition(self.lock)
+        self.slots = OrderedDict()  # (id(model), rate, grammar) -> _Slot
+
+    def checkout(self, model, sample_rate, grammar=None):
+        """An idle recognizer for the key, building or waiting for one as needed"""
+        key = (id(model), sample_rate, grammar)
+        started = time.perf_counter()
+        waited = False
+        with self.lock:
+            while True:
+                slot = self._slot(key, model)
+                if slot.idle:
+                    rec = slot.idle.pop()
+                    break
+                if slot.created < self.max_per_key:
+                    slot.created += 1
+                    rec = None
+                    break
+                remaining = self.timeout - (time.perf_counter() - started)
+                if remaining <= 0:
+                    self.metrics.incr('recognizer_pool.timeouts')
+                    raise TimeoutError(f'No recognizer free after {self.timeout:.1f}s')
+                waited = True
+                self.returned.wait(remaining)
+            slot.in_use += 1
+            self._record_occupancy()
+
+        if waited:
+            self.metrics.incr('recognizer_pool.waits')
+        self.metrics.observe('recognizer_pool.wait_ms', (time.perf_counter() - started) * 1000)
+        if rec is None:
+            try:
+                rec = self.factory(model, sample_rate, grammar)
+            except Exception:
+                self._release(key, None)
+                raise
+            self.metrics.incr('recognizer_pool.created')
+        return rec
+
+    def checkin(self, model, sample_rate, grammar, rec, reusable=True):
+        """Hand a recognizer back; reusable=False drops it (e.g. after a failed decode)"""
+        self._release((id(model), sample_rate, grammar), rec if reusable else None)
+
+    @contextmanager
+    def recognizer(self, model, sample_rate, grammar=None):
+        rec = self.checkout(model, sample_rate, grammar)
+        try:
+            yield rec
+        except BaseException:
+            self.checkin(model, sample_rate, grammar, rec, reusable=False)
+            raise
+        self.checkin(model, sample_rate, grammar, rec)
+
+    def clear(self):
+        """Drop idle recognizers, e.g. after reloading a model"""
+        with self.lock:
+            for key in list(self.slots):
+                slot = self.slots[key]
+                slot.created -= len(slot.idle)
+                slot.idle.clear()
+                if not slot.in_use:
+                    del self.slots[key]
+            self._record_occupancy()
+
+    def _slot(self, key, model):
+        """Slot for a key (lock held), evicting the least recently used idle keys"""
+        slot = self.slots.get(key)
+        if slot is None or slot.model is not model:
+            slot = self.slots[key] = _Slot(model)
+        self.slots.move_to_end(key)
+        for old in list(self.slots):
+            if len(self.slots) <= self.max_keys:
+                break
+            if old != key and not self.slots[old].in_use:
+                del self.slots[old]
+        return slot
+
+    def _release(self, key, rec):
+        with self.lock:
+            slot = self.slots.get(key)
+            if slot is None:
+                return
+            slot.in_use -= 1
+            if rec is not None:
+                slot.idle.append(rec)
+            else:
+                slot.created -= 1
+            self._record_occupancy()
+            self.returned.notify_all()
+
+    def _record_occupancy(self):
+        """Gauges for recognizers checked out and idle (lock held)"""
+        self.metrics.gauge('recognizer_pool.in_use', sum(s.in_use for s in self.slots.values()))
+        self.metrics.gauge('recognizer_pool.idle', sum(len(s.idle) for s in self.slots.values()))
+        self.metrics.gauge('recognizer_pool.keys', len(self.slots))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_recognizer_pool():
+    """Process-wide pool shared by the linguistic tasks and the AI blueprint"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = RecognizerPool()
+    return _pool
@@ -0,0 +1,172 @@
+"""
+Declarative registry of assessment tasks
+Every (domain, age group) is declared here once: the module and class that
+implement it, the resources it needs and the basic info the API falls back
+to when it is not implemented or cannot run. Nothing in this table is
+imported or built at startup. LazyTasks constructs a task the first time
+its age group is asked for, so declaring another task (say the 2-3 and 3-4
+ones) costs nothing until a child reaches it.
+"""
+
+import importlib
+import importlib.util
+import threading
+from collections.abc import Mapping
+
+
+class TaskSpec:
+    __slots__ = ('domain', 'age_group', 'name', 'title', 'icon', 'module', 'class_name', 'needs',
+                 'target_words', 'fallback_name', 'free_form')
+
+    def __init__(self, domain, age_group, name, title, icon, module=None, class_name=None, needs=(),
+                 target_words=None, fallback_name=None, free_form=False):
+        self.domain = domain
+        self.age_group = age_group
+        self.name = name
+        self.title = title
+        self.icon = icon
+        self.module = module
+        self.class_name = class_name
+        self.needs = needs
+        self.target_words = target_words
+        self.fallback_name = fallback_name  # Task id the basic (non-enhanced) flow knows it by
+        self.free_form = free_form  # Answer is a sentence or story, not one of the target words
+
+    @property
+    def implemented(self):
+        return self.module is not None
+
+    def load_class(self):
+        module = importlib.import_module(f'{__package__}.{self.module}')
+        return getattr(module, self.class_name)
+
+    def basic_info(self):
+        """Task info for the basic flow"""
+        info = {'task': self.fallback_name or self.name, 'title': self.title, 'icon': self.icon}
+        if self.target_words is not None:
+            info['target_words'] = list(self.target_words)
+        return info
+
+    def resources_available(self):
+        """Whether everything in needs is present, without building the task"""
+        return all(RESOURCE_CHECKS[need]() for need in self.needs)
+
+
+def _pose_available():
+    return importlib.util.find_spec('mediapipe') is not None
+
+
+def _speech_model_available():
+    from . import speech
+    return importlib.util.find_spec('vosk') is not None and speech.find_model_path() is not None
+
+
+RESOURCE_CHECKS = {
+    'pose': _pose_available,
+    'speech_model': _speech_model_available
+}
+
+
+def resources_state():
+    """Availability of every resource, e.g. to notice a speech model being installed"""
+    return tuple(check() for check in RESOURCE_CHECKS.values())
+
+TASK_SPECS = (
+    TaskSpec('physical', '0-1', 'raise_hands', "Can baby raise both hands high?", '🖐️',
+             'physical_0_raise_hands', 'RaiseHandsTask', needs=('pose',)),
+    TaskSpec('physical', '1-2', 'one_leg_balance', "Can you stand on one leg?", '🦵',
+             'physical_1_one_leg_balance', 'OneLegBalanceTask', needs=('pose',), fallback_name='one_leg'),
+    TaskSpec('physical', '2-3', 'turn_around', "Can you turn around in a circle?", '🔄'),
+    TaskSpec('physical', '3-4', 'stand_still', "Can you stand very still?", '🧘'),
+    TaskSpec('physical', '4-5', 'frog_jump', "Can you do a frog jump?", '🐸',
+             'physical_4_frog_jump', 'FrogJumpTask', needs=('pose',)),
+    TaskSpec('physical', '5-6', 'kangaroo_jump', "Can you do kangaroo jumps?", '🦘'),
+
+    TaskSpec('linguistic', '0-1', 'say_mama', "Say 'ma‑ma'", '👶',
+             'linguistic_0_say_mama', 'SayMamaTask', needs=('speech_model',), target_words=['ma', 'mama']),
+    TaskSpec('linguistic', '1-2', 'apple', "Say 'apple'", '🍎', target_words=['apple']),
+    TaskSpec('linguistic', '2-3', 'rhyme_cat', "What rhymes with 'cat'?", '🐱', target_words=['bat', 'hat', 'mat']),
+    TaskSpec('linguistic', '3-4', 'fill_blank', "Fill in the blank: 'The sun is ___'", '☀️',
+             target_words=['bright', 'hot', 'yellow']),
+    TaskSpec('linguistic', '4-5', 'sentence_sun', "Make a sentence about the sun", '🌞', target_words=['sun', 'bright'],
+             free_form=True),
+    TaskSpec('linguistic', '5-6', 'story_kite', "Tell a short story about a kite", '🪁',
+             'linguistic_5_story_kite', 'StoryKiteTask', needs=('speech_model',), target_words=['kite', 'fly'],
+             free_form=True),
+)
+
+
+def spec_for(domain, age_group):
+    for spec in TASK_SPECS:
+        if spec.domain == domain and spec.age_group == age_group:
+            return spec
+    return None
+
+
+def spec_for_task(domain, task_name):
+    """Spec a client's task_type refers to, by task name or the basic flow's name"""
+    for spec in TASK_SPECS:
+        if spec.domain == domain and task_name in (spec.name, spec.fallback_name):
+            return spec
+    return None
+
+
+def task_classes(domain):
+    """Implemented task classes keyed by both task name and age group (imports them, builds nothing)"""
+    classes = {}
+    for spec in TASK_SPECS:
+        if spec.domain != domain or not spec.implemented:
+            continue
+        try:
+            cls = spec.load_class()
+        except ImportError as e:
+            print(f"⚠️  {domain.capitalize()} task {spec.name} unavailable: {e}")
+            continue
+        classes[spec.name] = classes[spec.age_group] = cls
+    return classes
+
+
+class LazyTasks(Mapping):
+    """Age group -> task instance for one domain, each built on first access"""
+
+    def __init__(self, domain, build, specs=TASK_SPECS):
+        self.domain = domain
+        self.build = build  # cls -> instance
+        self.specs = {spec.age_group: spec for spec in specs if spec.domain == domain and spec.implemented}
+        self.instances = {}
+        self.failed = set()
+        self.version = 0  # Bumped whenever a task is built or fails to build
+        self.lock = threading.Lock()
+
+    def __getitem__(self, age_group):
+        task = self.instances.get(age_group)
+        if task is not None:
+            return task
+        spec = self.specs.get(age_group)
+        if spec is None or age_group in self.failed:
+            raise KeyError(age_group)
+
+        with self.lock:
+            task = self.instances.get(age_group)
+            if task is None:
+                try:
+                    task = self.build(spec.load_class())
+                except Exception as e:
+                    print(f"⚠️  Failed to load {self.domain} task {spec.name}: {e}")
+                    self.failed.add(age_group)
+                    self.version += 1
+                    raise KeyError(age_group) from e
+                self.instances[age_group] = task
+                self.version += 1
+                print(f"✅ Loaded {self.domain} task: {spec.name} (Age {age_group})")
+        return task
+
+    def __iter__(self):
+        return (age_group for age_group in self.specs if age_group not in self.failed)
+
+    def __len__(self):
+        return len(self.specs) - len(self.failed)
+
+    def loaded(self, age_group):
+        """The task if it has been built already, else None (never builds)"""
+        return self.instances.get(age_group)
@@ -0,0 +1,270 @@
+"""
+Shared-memory frame transport to pose worker processes
+With POSE_WORKER_PROCESSES > 0 pose inference runs in separate processes.
+Frames never cross a pipe: one multiprocessing.shared_memory block holds a
+ring of frame slots plus a (slots, 33, 4) landmark array and a small
+per-slot header. The request thread converts its decoded frame to RGB
+directly into a free slot (cv2.cvtColor with dst=, which also replaces the
+worker's own colour conversion) and only (slot, session, tier) goes to the
+worker. The worker writes landmarks into the slot's row in place and
+answers with the slot index.
+
+A session always goes to the same worker so its tracking graph stays warm.
+The result thread also watches the workers: when one dies, its in-flight
+frames fail, their slots go back to the ring and a fresh worker takes over.
+"""
+
+import atexit
+import math
+import multiprocessing
+import queue
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from .landmark_array import LANDMARK_COUNT
+
+# Per-slot header
+SLOT_DTYPE = np.dtype([('height', np.int32), ('width', np.int32), ('status', np.int8)])
+STATUS_EMPTY, STATUS_PERSON, STATUS_ERROR = 0, 1, -1
+
+# How often the result thread checks that every worker is still alive
+WORKER_CHECK_SECONDS = 0.5
+
+
+class FrameRing:
+    """Fixed pool of RGB frame slots and landmark results in shared memory"""
+
+    def __init__(self, slots, max_pixels, name=None):
+        self.slots = slots
+        self.max_pixels = max_pixels
+        self.frame_bytes = max_pixels * 3
+        frames_size = slots * self.frame_bytes
+        header_size = slots * SLOT_DTYPE.itemsize
+        landmarks_size = slots * LANDMARK_COUNT * 4 * 4
+        size = frames_size + header_size + landmarks_size
+
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self.name = self.shm.name
+
+        buf = self.shm.buf
+        self.frames = np.ndarray((slots, self.frame_bytes), dtype=np.uint8, buffer=buf)
+        self.header = np.ndarray((slots,), dtype=SLOT_DTYPE, buffer=buf, offset=frames_size)
+        self.landmarks = np.ndarray((slots, LANDMARK_COUNT, 4), dtype=np.float32, buffer=buf,
+                                    offset=frames_size + header_size)
+
+        self._free = queue.Queue()
+        if self.owner:
+            for slot in range(slots):
+                self._free.put(slot)
+
+    @classmethod
+    def attach(cls, name, slots, max_pixels):
+        return cls(slots, max_pixels, name=name)
+
+    def acquire(self, timeout=None):
+        """Reserve a free slot (blocks while every slot is in flight)"""
+        try:
+            return self._free.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError('No free shared frame slot')
+
+    def release(self, slot):
+        self._free.put(slot)
+
+    def write_frame(self, slot, bgr):
+        """Convert a BGR frame to RGB straight into the slot"""
+        height, width = bgr.shape[:2]
+        if height * width > self.max_pixels:
+            scale = math.sqrt(self.max_pixels / float(height * width))
+            width, height = max(1, int(width * scale)), max(1, int(height * scale))
+            bgr = cv2.resize(bgr, (width, height), interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=self.frame(slot, height, width))
+        self.header[slot] = (height, width, STATUS_EMPTY)
+
+    def frame(self, slot, height=None, width=None):
+        """Contiguous (height, width, 3) view of a slot"""
+        if height is None:
+            height, width = int(self.header['height'][slot]), int(self.header['width'][slot])
+        return self.frames[slot, :height * width * 3].reshape(height, width, 3)
+
+    def close(self):
+        self.frames = self.header = self.landmarks = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def pose_worker(ring_name, slots, max_pixels, requests, responses, max_sessions, graph_factory):
+    """Worker process loop: run pose on slots and write landmarks back in place"""
+    if graph_factory is None:
+        from .pose_scheduler import create_pose_graph as graph_factory
+    ring = FrameRing.attach(ring_name, slots, max_pixels)
+    graphs = OrderedDict()
+
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+        if message[0] == 'drop':
+            entry = graphs.pop(message[1], None)
+            if entry is not None:
+                entry[1].close()
+            continue
+
+        slot, ticket, session_key, tier, reset = message
+        status = STATUS_ERROR
+        try:
+            entry = graphs.get(session_key)
+            if entry is None or entry[0] != tier:
+                if entry is not None:
+                    entry[1].close()  # One graph per session: a tier change replaces it
+                graph = graph_factory(tier)
+                graphs[session_key] = (tier, graph)
+                graphs.move_to_end(session_key)
+                while len(graphs) > max_sessions:
+                    graphs.popitem(last=False)[1][1].close()
+            else:
+                graph = entry[1]
+                graphs.move_to_end(session_key)
+                if reset:
+                    graph.reset()  # Tracking state belongs to the previous crop window
+
+            results = graph.process(ring.frame(slot))
+            status = STATUS_EMPTY
+            if results.pose_landmarks is not None:
+                out = ring.landmarks[slot]
+                for i, lm in enumerate(results.pose_landmarks.landmark):
+                    out[i] = (lm.x, lm.y, lm.z, lm.visibility)
+                status = STATUS_PERSON
+        except Exception as e:
+            print(f"⚠️  Pose worker error: {e}")
+        ring.header['status'][slot] = status
+        responses.put((slot, ticket))
+
+    for _, graph in graphs.values():
+        graph.close()
+    ring.close()
+
+
+class ProcessPosePool:
+    """Pose worker processes fed through a FrameRing"""
+
+    def __init__(self, processes, slots, max_pixels, max_sessions, graph_factory=None):
+        self._context = multiprocessing.get_context('spawn')  # MediaPipe is not fork-safe
+        self.ring = FrameRing(slots, max_pixels)
+        self.responses = self._context.Queue()
+        self._pending = {}  # slot -> (ticket, worker index, callback)
+        self._tickets = 0
+        self._lock = threading.Lock()
+        self._closing = False
+        self._worker_args = (max(1, math.ceil(max_sessions / processes)), graph_factory)
+        self.restarts = 0
+
+        self.requests = [None] * processes
+        self.processes = [None] * processes
+        for i in range(processes):
+            self._spawn(i)
+
+        self._reader = threading.Thread(target=self._read_responses, name='pose-results', daemon=True)
+        self._reader.start()
+        atexit.register(self.shutdown)
+
+    def _spawn(self, index):
+        """Start worker `index` on a fresh request queue"""
+        per_worker, graph_factory = self._worker_args
+        self.requests[index] = self._context.Queue()
+        self.processes[index] = self._context.Process(
+            target=pose_worker, name=f'pose-worker-{index}', daemon=True,
+            args=(self.ring.name, self.ring.slots, self.ring.max_pixels, self.requests[index], self.responses,
+                  per_worker, graph_factory))
+        self.processes[index].start()
+
+    def _worker_for(self, session_key):
+        return hash(session_key) % len(self.requests)
+
+    def submit(self, slot, session_key, tier, callback, reset=False):
+        """
+        Run pose on a filled slot; callback(landmarks or None, ok) runs on completion
+        reset drops the session graph's tracking state first (its crop window moved)
+        """
+        index = self._worker_for(session_key)
+        with self._lock:
+            # Under the lock so a worker restart cannot strand the message on the dead worker's queue
+            self._tickets += 1
+            self._pending[slot] = (self._tickets, index, callback)
+            self.requests[index].put((slot, self._tickets, session_key, tier, reset))
+
+    def drop_session(self, session_key):
+        with self._lock:
+            self.requests[self._worker_for(session_key)].put(('drop', session_key))
+
+    def _read_responses(self):
+        checked = time.monotonic()
+        while True:
+            try:
+                response = self.responses.get(timeout=WORKER_CHECK_SECONDS)
+            except queue.Empty:
+                response = ()
+            except (EOFError, OSError):
+                return
+            if response is None:
+                return
+            if response:
+                self._respond(*response)
+            if time.monotonic() - checked >= WORKER_CHECK_SECONDS:
+                self._check_workers()
+                checked = time.monotonic()
+
+    def _respond(self, slot, ticket):
+        with self._lock:
+            pending = self._pending.get(slot)
+            if pending is None or pending[0] != ticket:
+                return  # Answer from a worker that has since died; the slot was already failed
+            del self._pending[slot]
+        status = int(self.ring.header['status'][slot])
+        # The caller keeps its own 528-byte copy; the slot goes straight back to the ring
+        landmarks = self.ring.landmarks[slot].copy() if status == STATUS_PERSON else None
+        self.ring.release(slot)
+        pending[2](landmarks, status != STATUS_ERROR)
+
+    def _check_workers(self):
+        """Fail a dead worker's in-flight frames, free their slots and start a replacement"""
+        failed = []
+        with self._lock:
+            if self._closing:
+                return
+            for index, process in enumerate(self.processes):
+                if process.is_alive():
+                    continue
+                print(f"⚠️  Pose worker {index} died (exit code {process.exitcode}), restarting")
+                for slot, (_, worker, callback) in list(self._pending.items()):
+                    if worker == index:
+                        del self._pending[slot]
+                        failed.append((slot, callback))
+                self._spawn(index)
+                self.restarts += 1
+        for slot, callback in failed:
+            self.ring.release(slot)
+            callback(None, False)
+
+    def shutdown(self):
+        if self.ring is None:
+            return
+        with self._lock:
+            self._closing = True
+        for requests in self.requests:
+            requests.put(None)
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.responses.put(None)
+        self._reader.join(timeout=5)
+        self.ring.close()
+        self.ring = None
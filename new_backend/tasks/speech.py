@@ -0,0 +1,139 @@
+"""
+Speech recognition shared by the linguistic tasks and the AI blueprint
+Reads 16-bit mono PCM out of WAV bytes, trims the silence around the speech
+(tasks/voice_activity.py) and runs Vosk over what is left, asking the
+transcript cache first so a clip that was heard before is not decoded again.
+
+Tasks that only listen for a few words pass them as a grammar: the
+recognizer then only chooses between those words and [unk], which decodes
+faster and hears toddler speech better than the full vocabulary.
+Recognizers come from a pool per (model, rate, grammar) and are reused
+clip after clip (see recognizer_pool).
+"""
+
+import io
+import json
+import os
+import threading
+import wave
+
+import config
+from . import voice_activity
+from .recognizer_pool import get_recognizer_pool
+from .transcript_cache import get_transcript_cache
+
+CHUNK_FRAMES = 4000
+UNKNOWN_WORD = '[unk]'
+
+_models = {}
+_lock = threading.Lock()
+
+_here = os.path.dirname(__file__)
+MODEL_SEARCH_PATHS = [
+    r'D:\born_genious\Final_App\new_backend\vosk-model-small-en-us-0.15\vosk-model-small-en-us-0.15',
+    r'D:\born_genious\Final_App\new_backend\vosk-model-small-en-us-0.15',
+    os.path.join(_here, '..', 'vosk-model-small-en-us-0.15', 'vosk-model-small-en-us-0.15'),
+    os.path.join(_here, '..', 'vosk-model-small-en-us-0.15'),
+    os.path.join(_here, '..', 'models', 'vosk-model-small-en-us-0.15'),
+    os.path.join(_here, '..', 'StreamlitApp', 'tasks', 'vosk-model-small-en-us-0.15'),
+    os.path.join(os.getcwd(), 'models', 'vosk-model-small-en-us-0.15')
+]
+
+
+def read_wav(wav_bytes):
+    """(pcm, frame_rate) from WAV bytes; ValueError unless mono 16-bit"""
+    with wave.open(io.BytesIO(wav_bytes), 'rb') as wf:
+        if wf.getnchannels() != 1:
+            raise ValueError("Audio must be mono")
+        if wf.getsampwidth() != 2:
+            raise ValueError("Audio must be 16-bit")
+        return wf.readframes(wf.getnframes()), wf.getframerate()
+
+
+def model_name(model_path):
+    """Cache namespace for a model directory"""
+    return os.path.basename(os.path.normpath(model_path)) if model_path else ''
+
+
+def find_model_path():
+    """First Vosk model directory that exists (nested layout first), or None"""
+    for path in MODEL_SEARCH_PATHS:
+        abs_path = os.path.abspath(path)
+        if os.path.exists(abs_path):
+            return abs_path
+    return None
+
+
+def load_model(model_path):
+    """vosk.Model for a directory, loaded once per process"""
+    import vosk
+
+    with _lock:
+        model = _models.get(model_path)
+        if model is None:
+            model = _models[model_path] = vosk.Model(model_path)
+        return model
+
+
+def grammar_json(words):
+    """Canonical Vosk grammar for a word list (None = full vocabulary)"""
+    if not words:
+        return None
+    phrases = sorted({w.strip().lower() for w in words if w and w.strip()} - {UNKNOWN_WORD})
+    return json.dumps(phrases + [UNKNOWN_WORD]) if phrases else None
+
+
+def task_grammar(words, free_form=False):
+    """
+    Grammar a task should decode with, unless SPEECH_GRAMMAR is off
+    Free-form answers (a sentence, a story) are scored on every word, so they
+    keep the full vocabulary
+    """
+    if free_form or not config.SPEECH_GRAMMAR:
+        return None
+    return grammar_json(words)
+
+
+def recognize_pcm(model, pcm, sample_rate, grammar=None):
+    """Run Vosk over PCM; returns {'text', 'words'} with per-word timings"""
+    parts, words = [], []
+
+    def collect(result):
+        result = json.loads(result)
+        text = ' '.join(w for w in result.get('text', '').split() if w != UNKNOWN_WORD)
+        if text:
+            parts.append(text)
+        words.extend(w for w in result.get('result', []) if w.get('word') != UNKNOWN_WORD)
+
+    chunk = CHUNK_FRAMES * 2
+    view = memoryview(pcm)
+    with get_recognizer_pool().recognizer(model, sample_rate, grammar) as rec:
+        for offset in range(0, len(view), chunk):
+            if rec.AcceptWaveform(bytes(view[offset:offset + chunk])):
+                collect(rec.Result())
+        # FinalResult() also resets the recognizer for the next clip
+        collect(rec.FinalResult())
+    return {'text': ' '.join(parts).strip(), 'words': words}
+
+
+def transcribe(model, pcm, sample_rate, model_path=None, grammar=None):
+    """
+    Cached transcript for a clip: {'text', 'words', 'cached', 'voice_activity'}
+    Silence is trimmed first (word timings are relative to the trimmed audio)
+    and clips with no speech never reach Vosk. With model=None the model at
+    model_path is only loaded on a cache miss.
+    """
+    pcm, activity = voice_activity.trim(pcm, sample_rate)
+    if activity is not None and activity['silent']:
+        return {'text': '', 'words': [], 'cached': False, 'voice_activity': activity}
+
+    cache = get_transcript_cache()
+    key = cache.key(pcm, sample_rate, model_name(model_path), grammar)
+    entry = cache.get(key) if cache.enabled else None
+    if entry is not None:
+        return dict(entry, cached=True, voice_activity=activity)
+
+    entry = recognize_pcm(model or load_model(model_path), pcm, sample_rate, grammar)
+    if cache.enabled:
+        cache.put(key, entry['text'], entry['words'])
+    return dict(entry, cached=False, voice_activity=activity)
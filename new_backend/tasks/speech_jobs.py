@@ -0,0 +1,187 @@
+"""
+Background queue for speech assessments
+A long clip (a 5-6 year old's kite story) holds a request for the whole
+conversion and Vosk run. In job mode the request only queues the work and
+returns a job id; SPEECH_JOB_WORKERS threads take jobs off a queue of at
+most SPEECH_JOB_QUEUE_SIZE, and the client polls for the result, or
+long-polls by waiting up to SPEECH_JOB_MAX_WAIT seconds on one request.
+
+A full queue rejects new jobs straight away (queue.Full) with a hint of
+how long to wait, rather than letting the backlog grow without bound.
+Finished jobs are kept for SPEECH_JOB_RESULT_TTL seconds.
+
+Depth, in-flight jobs and the age of the oldest queued job are reported by
+stats() and recorded in metrics as speech_jobs.*.
+"""
+
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+import config
+from .metrics import metrics
+
+
+class SpeechJob:
+    __slots__ = ('id', 'payload', 'state', 'created', 'started', 'finished', 'result', 'status_code',
+                 'done')
+
+    def __init__(self, payload):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.state = 'queued'
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.status_code = None
+        self.done = threading.Event()
+
+    def describe(self, now=None):
+        """Status body for a poll; includes the result once the job has finished"""
+        now = time.time() if now is None else now
+        info = {
+            'job_id': self.id,
+            'status': self.state,
+            'age_ms': round((now - self.created) * 1000, 1)
+        }
+        if self.started is not None:
+            info['queued_ms'] = round((self.started - self.created) * 1000, 1)
+        if self.finished is not None:
+            info['run_ms'] = round((self.finished - self.started) * 1000, 1)
+            info['result'] = self.result
+        return info
+
+
+class SpeechJobQueue:
+    def __init__(self, handler, workers=None, max_queued=None, result_ttl=None, registry=None):
+        self.handler = handler  # payload -> (body, status_code)
+        self.workers = max(1, config.SPEECH_JOB_WORKERS if workers is None else workers)
+        self.max_queued = max(1, config.SPEECH_JOB_QUEUE_SIZE if max_queued is None else max_queued)
+        self.result_ttl = config.SPEECH_JOB_RESULT_TTL if result_ttl is None else result_ttl
+        self.metrics = registry or metrics
+        self.queue = queue.Queue(maxsize=self.max_queued)
+        self.jobs = {}  # job id -> SpeechJob, until its result expires
+        self.waiting = OrderedDict()  # Queued jobs in submit order, for the oldest's age
+        self.expiry = deque()  # (finished, job id) in finishing order
+        self.lock = threading.Lock()
+        self.running = 0
+        self.threads = []
+
+    def submit(self, payload):
+        """Queue a job and return it; raises queue.Full when the queue is at capacity"""
+        self._start()
+        job = SpeechJob(payload)
+        with self.lock:
+            self._expire(job.created)
+            try:
+                self.queue.put_nowait(job)
+            except queue.Full:
+                self.metrics.incr('speech_jobs.rejected')
+                raise
+            self.jobs[job.id] = self.waiting[job.id] = job
+        self.metrics.incr('speech_jobs.submitted')
+        self._record_depth()
+        return job
+
+    def get(self, job_id, wait=0.0):
+        """The job, after waiting up to `wait` seconds for it to finish; None if unknown or expired"""
+        with self.lock:
+            self._expire(time.time())
+            job = self.jobs.get(job_id)
+        if job is not None and wait > 0:
+            job.done.wait(min(wait, config.SPEECH_JOB_MAX_WAIT))
+        return job
+
+    def retry_after(self):
+        """Seconds a rejected client should wait, from the recent run time and the backlog"""
+        run_ms = self.metrics.summarize('speech_jobs.run_ms')['p50'] or 1000.0
+        backlog = self.queue.qsize() + self.running
+        return max(1, int(round(run_ms / 1000.0 * backlog / self.workers)))
+
+    def stats(self):
+        now = time.time()
+        with self.lock:
+            self._expire(now)
+            oldest = next(iter(self.waiting.values()), None)
+            stats = {
+                'workers': self.workers,
+                'capacity': self.max_queued,
+                'queued': len(self.waiting),
+                'running': self.running,
+                'finished': len(self.expiry),
+                'oldest_queued_ms': round((now - oldest.created) * 1000, 1) if oldest else 0.0
+            }
+        self.metrics.gauge('speech_jobs.oldest_queued_ms', stats['oldest_queued_ms'])
+        return stats
+
+    def _start(self):
+        if self.threads:
+            return
+        with self.lock:
+            while len(self.threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f'speech-job-{len(self.threads)}', daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            with self.lock:
+                job.started = time.time()
+                job.state = 'running'
+                self.waiting.pop(job.id, None)
+                self.running += 1
+            self.metrics.observe('speech_jobs.queue_wait_ms', (job.started - job.created) * 1000)
+            self._record_depth()
+            try:
+                body, status = self.handler(job.payload)
+                state = 'done' if status < 500 else 'failed'
+            except Exception as e:
+                print(f"Speech job {job.id} failed: {e}")
+                body, status, state = {'error': f'Speech assessment error: {str(e)}', 'success': False}, 500, 'failed'
+
+            with self.lock:
+                job.payload = None  # The audio is no longer needed
+                job.result, job.status_code = body, status
+                job.finished = time.time()
+                job.state = state
+                self.running -= 1
+                self.expiry.append((job.finished, job.id))
+            job.done.set()
+            self.metrics.incr('speech_jobs.completed' if state == 'done' else 'speech_jobs.failed')
+            self.metrics.observe('speech_jobs.run_ms', (job.finished - job.started) * 1000)
+            self._record_depth()
+            self.queue.task_done()
+
+    def _expire(self, now):
+        """Forget finished jobs older than the result TTL (lock held)"""
+        while self.expiry and now - self.expiry[0][0] > self.result_ttl:
+            _, job_id = self.expiry.popleft()
+            del self.jobs[job_id]
+            self.metrics.incr('speech_jobs.expired')
+
+    def _record_depth(self):
+        self.metrics.gauge('speech_jobs.queued', self.queue.qsize())
+        self.metrics.gauge('speech_jobs.running', self.running)
+
+
+_jobs = None
+_jobs_lock = threading.Lock()
+
+
+def get_speech_jobs(handler):
+    """Process-wide queue; the handler given on first use runs every job"""
+    global _jobs
+    if _jobs is None:
+        with _jobs_lock:
+            if _jobs is None:
+                _jobs = SpeechJobQueue(handler)
+    return _jobs
+
+
+def active_speech_jobs():
+    """The process-wide queue if job mode has been used, else None"""
+    return _jobs
@@ -0,0 +1,169 @@
+"""
+Content-addressed transcript cache for speech recognition
+Keys are a hash of the decoded 16-bit PCM plus sample rate, model and
+grammar, so a retried or resubmitted clip skips recognition whatever
+container it came in. Entries hold the transcript and Vosk word timings.
+
+An in-memory LRU (TRANSCRIPT_CACHE_SIZE entries) sits in front of an
+optional SQLite tier (TRANSCRIPT_CACHE_DB) that survives restarts and is
+shared by every worker on the host. Hits and misses per tier are recorded
+in metrics as transcript_cache.*.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import config
+from .metrics import metrics
+
+# Pruning goes this fraction below the bound, so the next prune is many puts away
+PRUNE_SLACK = 0.1
+
+
+class TranscriptCache:
+    def __init__(self, max_entries=None, db_path=None, db_max_entries=None, registry=None):
+        self.max_entries = config.TRANSCRIPT_CACHE_SIZE if max_entries is None else max_entries
+        self.db_max_entries = config.TRANSCRIPT_CACHE_DB_MAX_ENTRIES if db_max_entries is None else db_max_entries
+        self.metrics = registry or metrics
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+        self.db = None
+        self.db_rows = 0  # Rows as of the last count plus puts since (replacements over-count)
+        db_path = config.TRANSCRIPT_CACHE_DB if db_path is None else db_path
+        if db_path:
+            try:
+                self.db = sqlite3.connect(db_path, check_same_thread=False)
+                self.db.execute('''
+                    CREATE TABLE IF NOT EXISTS transcripts (
+                        key TEXT PRIMARY KEY,
+                        text TEXT NOT NULL,
+                        words TEXT NOT NULL,
+                        used_at REAL NOT NULL
+                    )
+                ''')
+                self.db.execute('CREATE INDEX IF NOT EXISTS idx_transcripts_used_at ON transcripts(used_at)')
+                self.db.commit()
+                self.db_rows = self.db.execute('SELECT COUNT(*) FROM transcripts').fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"⚠️  Transcript cache database unavailable ({e}); using memory only")
+                self.db = None
+
+    @staticmethod
+    def key(pcm, sample_rate, model='', grammar=None):
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f'{model}|{sample_rate}|{grammar or ""}|'.encode())
+        digest.update(pcm)
+        return digest.hexdigest()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 or self.db is not None
+
+    def get(self, key):
+        """Cached {'text', 'words'} for a key, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+        if entry is not None:
+            self._record('memory_hits')
+            return entry
+
+        entry = self._db_get(key)
+        if entry is not None:
+            self._remember(key, entry)
+            self._record('disk_hits')
+            return entry
+        self._record('misses')
+        return None
+
+    def put(self, key, text, words=None):
+        entry = {'text': text, 'words': words or []}
+        self._remember(key, entry)
+        if self.db is not None:
+            with self.lock:
+                try:
+                    self.db.execute('INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?)',
+                                    (key, text, json.dumps(entry['words']), time.time()))
+                    self.db_rows += 1
+                    if 0 < self.db_max_entries < self.db_rows:
+                        self._prune()
+                    self.db.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️  Transcript cache write failed: {e}")
+        return entry
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            if self.db is not None:
+                self.db.execute('DELETE FROM transcripts')
+                self.db.commit()
+                self.db_rows = 0
+        self.metrics.gauge('transcript_cache.entries', 0)
+
+    def _remember(self, key, entry):
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            size = len(self.entries)
+        self.metrics.gauge('transcript_cache.entries', size)
+
+    def _db_get(self, key):
+        if self.db is None:
+            return None
+        with self.lock:
+            try:
+                row = self.db.execute('SELECT text, words FROM transcripts WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    return None
+                self.db.execute('UPDATE transcripts SET used_at = ? WHERE key = ?', (time.time(), key))
+                self.db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  Transcript cache read failed: {e}")
+                return None
+        return {'text': row[0], 'words': json.loads(row[1])}
+
+    def _prune(self):
+        """
+        Drop the least recently used rows once the running count passes the bound (lock held)
+        The count is re-read first: replaced keys and other workers' rows make it an estimate.
+        """
+        count = self.db.execute('SELECT COUNT(*) FROM transcripts').fetchone()[0]
+        if count > self.db_max_entries:
+            keep = self.db_max_entries - int(self.db_max_entries * PRUNE_SLACK)
+            self.db.execute('DELETE FROM transcripts WHERE key IN '
+                            '(SELECT key FROM transcripts ORDER BY used_at LIMIT ?)',
+                            (count - keep,))
+            count = keep
+        self.db_rows = count
+
+    def _record(self, outcome):
+        self.metrics.incr(f'transcript_cache.{outcome}')
+        hits = (self.metrics.counter('transcript_cache.memory_hits') +
+                self.metrics.counter('transcript_cache.disk_hits'))
+        total = hits + self.metrics.counter('transcript_cache.misses')
+        self.metrics.gauge('transcript_cache.hit_rate', round(hits / total, 4) if total else 0.0)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_transcript_cache():
+    """Process-wide cache shared by the linguistic tasks and the AI blueprint"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TranscriptCache()
+    return _cache
@@ -0,0 +1,91 @@
+"""
+Voice activity detection for speech clips
+Children's recordings are mostly silence around a word or two. The clip is
+cut into SPEECH_VAD_FRAME_MS frames and each one is classed as speech by
+its energy against the clip's own noise floor, with the zero-crossing rate
+catching quiet fricatives ("s", "f") that energy alone misses. Speech is
+padded by SPEECH_VAD_PADDING_MS on both sides (which also merges words
+separated by short pauses) and everything else is dropped before the
+audio reaches Vosk. Clips with less than SPEECH_VAD_MIN_SPEECH_MS of
+speech are reported as silent and not recognized at all.
+"""
+
+import numpy as np
+
+import config
+from .metrics import metrics
+
+NOISE_FLOOR_PERCENTILE = 10
+PEAK_FRACTION = 0.1  # Energy threshold never above this share of the loudest frame
+UNVOICED_MIN_ZCR = 0.25  # Fraction of sample pairs that change sign
+
+
+def speech_mask(samples, sample_rate, frame_ms=None):
+    """Per-frame speech flags for int16 samples, plus the frame length in samples"""
+    frame_ms = config.SPEECH_VAD_FRAME_MS if frame_ms is None else frame_ms
+    frame = max(2, int(sample_rate * frame_ms / 1000))
+    count = len(samples) // frame
+    if count == 0:
+        return np.zeros(0, dtype=bool), frame
+
+    frames = samples[:count * frame].reshape(count, frame).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame - 1)
+
+    floor = float(np.percentile(rms, NOISE_FLOOR_PERCENTILE))
+    # A clip that is speech throughout has no silence to measure a floor from
+    relative = min(floor * config.SPEECH_VAD_ENERGY_RATIO, float(rms.max()) * PEAK_FRACTION)
+    voiced = rms > max(config.SPEECH_VAD_MIN_RMS, relative)
+    # Hiss sits at the noise floor with a high ZCR too, so fricatives still need some energy
+    unvoiced = (zcr > UNVOICED_MIN_ZCR) & (rms > max(config.SPEECH_VAD_MIN_RMS / 2, floor * 2))
+    return voiced | unvoiced, frame
+
+
+def trim(pcm, sample_rate, registry=None):
+    """
+    (speech_pcm, report) for 16-bit mono PCM; report is None when SPEECH_VAD is off
+    report holds duration_ms, speech_ms, trimmed_ms, segments and silent
+    """
+    if not config.SPEECH_VAD:
+        return pcm, None
+    registry = registry or metrics
+
+    samples = np.frombuffer(pcm, dtype='<i2', count=len(pcm) // 2)
+    mask, frame = speech_mask(samples, sample_rate)
+    frame_ms = 1000.0 * frame / sample_rate
+    duration_ms = 1000.0 * len(samples) / sample_rate
+    speech_ms = float(np.count_nonzero(mask)) * frame_ms
+
+    if speech_ms < config.SPEECH_VAD_MIN_SPEECH_MS:
+        registry.incr('speech.silent_clips')
+        return b'', {
+            'duration_ms': round(duration_ms, 1),
+            'speech_ms': 0.0,
+            'trimmed_ms': round(duration_ms, 1),
+            'segments': 0,
+            'silent': True
+        }
+
+    pad = int(round(config.SPEECH_VAD_PADDING_MS / frame_ms))
+    if pad:
+        # 'same' would return the kernel's length for clips shorter than it
+        mask = np.convolve(mask, np.ones(2 * pad + 1, dtype=np.int32))[pad:pad + len(mask)] > 0
+    edges = np.flatnonzero(np.diff(mask.astype(np.int8), prepend=0, append=0))
+    starts, ends = edges[0::2] * frame, edges[1::2] * frame
+    if ends[-1] >= len(mask) * frame:
+        ends[-1] = len(samples)  # Keep the tail shorter than one frame
+
+    if len(starts) == 1 and starts[0] == 0 and ends[0] == len(samples):
+        kept = pcm
+    else:
+        kept = b''.join(samples[s:e].tobytes() for s, e in zip(starts, ends))
+    kept_ms = 1000.0 * (len(kept) // 2) / sample_rate
+    registry.incr('speech.trimmed_ms', duration_ms - kept_ms)
+    return kept, {
+        'duration_ms': round(duration_ms, 1),
+        'speech_ms': round(speech_ms, 1),
+        'trimmed_ms': round(duration_ms - kept_ms, 1),
+        'segments': len(starts),
+        'silent': False
+    }
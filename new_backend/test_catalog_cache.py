@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Check the precomputed catalogue responses: same content as before, strong
+ETags, 304 on revalidation, gzip when accepted and the enhanced task
+listing being re-encoded only when the tasks change
+"""
+
+import gzip
+import json
+
+from flask import Flask
+
+from catalog_cache import CachedBody, VersionedBody
+
+
+def catalog_client():
+    from app import app
+    return app.test_client()
+
+
+def test_catalogue_bodies_and_etags():
+    from app import INTELLIGENCE_QUESTIONS, PHYSICAL_TASKS
+
+    client = catalog_client()
+    response = client.get('/api/questions/0-1')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['age_group'] == '0-1'
+    assert len(body['questions']) == len(INTELLIGENCE_QUESTIONS['0-1'])
+    assert body['questions'][0]['points'] == 1
+    assert response.headers['Cache-Control'].startswith('public, max-age=')
+    etag = response.headers['ETag']
+    assert etag.startswith('"') and not etag.startswith('W/')
+
+    assert client.get('/api/questions/0-1').headers['ETag'] == etag
+    assert client.get('/api/questions/5-6').headers['ETag'] != etag
+    assert client.get('/api/physical/1-2').get_json()['task'] == PHYSICAL_TASKS['1-2']
+    assert client.get('/api/linguistic/9-10').status_code == 404
+
+
+def test_revalidation_and_gzip():
+    client = catalog_client()
+    first = client.get('/api/questions/3-4')
+    etag = first.headers['ETag']
+
+    cached = client.get('/api/questions/3-4', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+    assert cached.headers['ETag'] == etag
+
+    assert client.get('/api/questions/3-4', headers={'If-None-Match': '"stale"'}).status_code == 200
+
+    compressed = client.get('/api/questions/3-4', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['Vary'] == 'Accept-Encoding'
+    assert json.loads(gzip.decompress(compressed.data)) == first.get_json()
+    assert compressed.headers['ETag'] != etag
+    revalidated = client.get('/api/questions/3-4', headers={'Accept-Encoding': 'gzip',
+                                                           'If-None-Match': compressed.headers['ETag']})
+    assert revalidated.status_code == 304
+
+
+def test_small_bodies_are_not_compressed():
+    cached = CachedBody({'age_group': '0-1'})
+    assert cached.gzipped is None
+    assert cached.body.endswith(b'\n')
+
+
+def test_versioned_body_rebuilds_on_change():
+    built = []
+
+    def render():
+        built.append(1)
+        return {'count': len(built)}
+
+    versioned = VersionedBody()
+    first = versioned.get(1, render)
+    assert versioned.get(1, render) is first
+    second = versioned.get(2, render)
+    assert second is not first and second.etag != first.etag
+    assert len(built) == 2
+
+
+def test_enhanced_tasks_listing():
+    from ai_assessment_routes_improved import _enhanced_tasks_body, assessment_ai_bp
+    from tasks import get_task_manager
+
+    app = Flask('catalog_cache_test')
+    app.register_blueprint(assessment_ai_bp)
+    client = app.test_client()
+
+    first = client.get('/api/ai/enhanced-tasks')
+    assert first.status_code == 200 and first.get_json()['available'] is True
+    assert first.headers['Cache-Control'] == 'public, max-age=0'
+    etag = first.headers['ETag']
+    assert client.get('/api/ai/enhanced-tasks', headers={'If-None-Match': etag}).status_code == 304
+
+    # Building a task bumps the version, so the listing is re-encoded; the ETag
+    # only changes if the content did
+    manager = get_task_manager()
+    version = manager.tasks_version()
+    unbuilt = [age for age in manager.physical_tasks if manager.physical_tasks.loaded(age) is None]
+    if unbuilt:
+        manager.physical_tasks.get(unbuilt[0])  # A failed build bumps it too
+        assert manager.tasks_version() != version
+        again = client.get('/api/ai/enhanced-tasks', headers={'If-None-Match': etag})
+        current_version, cached = _enhanced_tasks_body.current
+        assert current_version == manager.tasks_version()
+        assert again.headers['ETag'] == f'"{cached.etag}"'
+        assert again.status_code == (304 if cached.etag == etag.strip('"') else 200)
+
+
+if __name__ == "__main__":
+    print("🧪 Catalogue response cache")
+    test_catalogue_bodies_and_etags()
+    test_revalidation_and_gzip()
+    test_small_bodies_are_not_compressed()
+    print("✅ Catalogues are served from precomputed bodies with ETags and 304s")
+    test_versioned_body_rebuilds_on_change()
+    test_enhanced_tasks_listing()
+    print("✅ The enhanced task listing is re-encoded only when the tasks change")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Check adaptive frame pacing: early frames are refused and the recommended
+interval follows the task hint and the inference backlog
+"""
+
+import time
+
+from tasks.frame_pacing import FramePacer
+from tasks.metrics import MetricsRegistry
+
+
+def make_pacer(**kwargs):
+    options = dict(min_ms=100, max_ms=2000, early_tolerance=0.5, max_sessions=8, workers=1,
+                   registry=MetricsRegistry())
+    options.update(kwargs)
+    return FramePacer(**options)
+
+
+def test_early_frames_are_refused():
+    pacer = make_pacer()
+    assert pacer.admit('a') is None
+    assert pacer.finish('a', 400) == 400
+
+    retry_after = pacer.admit('a')
+    assert retry_after is not None and 0 < retry_after <= 200
+    # Other sessions and anonymous frames are not affected
+    assert pacer.admit('b') is None
+    assert pacer.admit(None) is None
+    assert pacer.metrics.snapshot()['counters']['frame_pacing.refused'] == 1
+
+
+def test_frame_is_admitted_after_tolerance():
+    pacer = make_pacer(early_tolerance=0.1)
+    pacer.admit('a')
+    pacer.finish('a', 100)
+    time.sleep(0.02)
+    assert pacer.admit('a') is None
+
+
+def test_busy_session_is_refused():
+    pacer = make_pacer()
+    assert pacer.admit('a') is None
+    assert pacer.admit('a') is not None
+
+
+def test_interval_stretches_with_backlog():
+    pacer = make_pacer(workers=2)
+    assert pacer.recommend(200) == 200
+    for key in range(6):
+        pacer.admit(key)
+    assert pacer.recommend(200) == 600
+    assert pacer.recommend(1000) == 2000  # Capped at max_ms
+    assert pacer.recommend(10) == 100  # Never below min_ms
+
+
+if __name__ == "__main__":
+    print("🧪 Frame pacing")
+    test_early_frames_are_refused()
+    print("✅ Frames sent too soon are refused")
+    test_frame_is_admitted_after_tolerance()
+    test_busy_session_is_refused()
+    print("✅ Sessions are admitted once the interval has passed")
+    test_interval_stretches_with_backlog()
+    print("✅ Recommended interval follows the backlog")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Check reduced-scale JPEG decoding, the shared frame ingest and the ROI
+crop/remap used before pose inference - no MediaPipe model needed
+"""
+
+import base64
+
+import cv2
+import numpy as np
+
+from tasks.frame_preprocess import FrameIngest, RoiTracker, decode_flag, decode_image, jpeg_size, to_rgb
+from tasks.landmark_array import VIS, X, Y
+
+
+def encode_jpeg(width, height):
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    cv2.rectangle(image, (width // 4, height // 4), (width // 2, height // 2), (0, 200, 255), -1)
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+def test_jpeg_size_reads_header():
+    assert jpeg_size(encode_jpeg(640, 480)) == (640, 480)
+    assert jpeg_size(b'not a jpeg') is None
+
+
+def test_decode_keeps_long_side_above_minimum():
+    data = encode_jpeg(640, 480)
+    assert decode_flag(data, min_side=256) == cv2.IMREAD_REDUCED_COLOR_2
+    assert decode_flag(data, min_side=100) == cv2.IMREAD_REDUCED_COLOR_4
+    assert decode_flag(data, min_side=0) == cv2.IMREAD_COLOR
+    assert decode_image(data, min_side=256).shape == (240, 320, 3)
+    assert decode_image(encode_jpeg(320, 240), min_side=256).shape == (240, 320, 3)
+    png = cv2.imencode('.png', np.zeros((480, 640, 3), dtype=np.uint8))[1].tobytes()
+    assert decode_image(png, min_side=256).shape == (480, 640, 3)
+
+
+def person(x0, y0, x1, y1):
+    arr = np.zeros((33, 4), dtype=np.float32)
+    arr[:, X] = np.linspace(x0, x1, 33)
+    arr[:, Y] = np.linspace(y0, y1, 33)
+    arr[:, VIS] = 0.9
+    return arr
+
+
+def test_crop_remap_matches_full_frame_coordinates():
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    roi = RoiTracker(margin=0.25)
+    roi.update(person(0.4, 0.3, 0.6, 0.7))
+    crop, window = roi.crop(frame)
+    assert crop.shape[0] < 480 and crop.shape[1] < 640
+
+    full = person(0.45, 0.35, 0.55, 0.65)
+    left, top = window[0] * 640, window[1] * 480
+    in_crop = full.copy()
+    in_crop[:, X] = (full[:, X] * 640 - left) / crop.shape[1]
+    in_crop[:, Y] = (full[:, Y] * 480 - top) / crop.shape[0]
+    np.testing.assert_allclose(RoiTracker.remap(in_crop, window)[:, :2], full[:, :2], atol=1e-6)
+
+
+def test_window_is_sticky_until_person_nears_edge():
+    roi = RoiTracker(margin=0.25)
+    roi.update(person(0.4, 0.3, 0.6, 0.7))
+    window = roi.window
+    roi.update(person(0.41, 0.31, 0.61, 0.71))
+    assert roi.window == window
+    roi.update(person(0.6, 0.3, 0.8, 0.7))
+    assert roi.window != window
+    roi.update(None)
+    assert roi.window is None
+    # Person fills the frame - cropping would not help
+    roi.update(person(0.05, 0.05, 0.95, 0.95))
+    assert roi.window is None
+
+
+def test_ingest_decodes_once():
+    data_url = 'data:image/jpeg;base64,' + base64.b64encode(encode_jpeg(320, 240)).decode()
+    ingest = FrameIngest(data_url)
+    assert not ingest.decoded
+    frame = ingest.frame
+    assert frame.shape == (240, 320, 3)
+    assert ingest.frame is frame
+    assert ingest.source is None
+
+
+def test_ingest_passes_arrays_through_and_caches_errors():
+    image = np.zeros((48, 64, 3), dtype=np.uint8)
+    assert FrameIngest(image).frame is image
+
+    ingest = FrameIngest('data:image/jpeg;base64,bm90IGFuIGltYWdl')
+    for _ in range(2):
+        try:
+            ingest.frame
+        except ValueError as e:
+            assert 'Frame decode error' in str(e)
+        else:
+            raise AssertionError('undecodable frame accepted')
+
+
+def test_to_rgb_reuses_buffer():
+    image = np.zeros((48, 64, 3), dtype=np.uint8)
+    image[..., 0] = 255  # Blue in BGR
+    first = to_rgb(image)
+    assert first[0, 0].tolist() == [0, 0, 255]
+    assert to_rgb(image) is first
+    assert to_rgb(np.zeros((24, 32, 3), dtype=np.uint8)).shape == (24, 32, 3)
+
+
+if __name__ == "__main__":
+    print("🧪 Frame preprocessing")
+    test_jpeg_size_reads_header()
+    test_decode_keeps_long_side_above_minimum()
+    print("✅ JPEGs decode at reduced scale")
+    test_crop_remap_matches_full_frame_coordinates()
+    test_window_is_sticky_until_person_nears_edge()
+    print("✅ ROI crop maps landmarks back to the full frame")
+    test_ingest_decodes_once()
+    test_ingest_passes_arrays_through_and_caches_errors()
+    test_to_rgb_reuses_buffer()
+    print("✅ Frames are decoded once and converted into a reused buffer")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Check the response encoder: same JSON as Flask's default provider with
+either backend, the streamed list encoding and installing it on an app
+"""
+
+import json
+import uuid
+from datetime import date, datetime
+
+import pytest
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+import config
+import json_encoding
+from json_encoding import dumps_bytes, stream_json
+
+BACKENDS = ['stdlib'] + (['orjson'] if json_encoding.orjson is not None else [])
+
+
+def sample_payload():
+    return {
+        'child_id': 7,
+        'summary': {'total_attempts': 2, 'latest_attempt': None},
+        'attempts': [
+            {'result_id': i, 'scores': {'total': i, 'percentage': 66.7}, 'badge': '🥇', 'ok': i % 2 == 0}
+            for i in range(40)
+        ],
+        'completed': datetime(2025, 8, 6, 8, 50),
+        'day': date(2025, 8, 6),
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'by_age': {3: 'three', 1: 'one'}
+    }
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    previous = config.JSON_ENCODER
+    config.JSON_ENCODER = request.param
+    yield request.param
+    config.JSON_ENCODER = previous
+
+
+def flask_default(obj):
+    return json.loads(DefaultJSONProvider(Flask('reference')).dumps(obj))
+
+
+def test_matches_flask_default(backend):
+    payload = sample_payload()
+    payload.pop('by_age')  # Flask's provider cannot sort mixed key types either
+    assert json_encoding.backend() == backend
+    assert json.loads(dumps_bytes(payload)) == flask_default(payload)
+    assert json.loads(dumps_bytes({3: 'three', 1: 'one'})) == {'3': 'three', '1': 'one'}
+
+
+def test_key_order_follows_config(backend):
+    assert dumps_bytes({'b': 1, 'a': {'d': 2, 'c': 3}}) == b'{"a":{"c":3,"d":2},"b":1}'
+    assert dumps_bytes({'b': 1, 'a': 2}, sort_keys=False) == b'{"b":1,"a":2}'
+
+
+def test_stream_matches_single_encode(backend):
+    payload = sample_payload()
+    payload.pop('by_age')
+    streamed = b''.join(stream_json(payload, 'attempts').response)
+    assert streamed == dumps_bytes(payload) + b'\n'
+
+    assert json.loads(b''.join(stream_json({'attempts': []}, 'attempts').response)) == {'attempts': []}
+    only = {'z': 1, 'attempts': [1, 2]}
+    assert json.loads(b''.join(stream_json(only, 'attempts').response)) == only
+
+
+def test_install_replaces_jsonify():
+    app = Flask('json_encoding_test')
+    json_encoding.install(app)
+
+    @app.route('/payload')
+    def payload():
+        return jsonify({'b': [1, 2], 'a': 'ä'})
+
+    response = app.test_client().get('/payload')
+    assert response.mimetype == 'application/json'
+    assert response.get_json() == {'a': 'ä', 'b': [1, 2]}
+    app.debug = True
+    assert b'\n  ' in app.test_client().get('/payload').data  # Readable in debug mode, as before
+
+
+if __name__ == "__main__":
+    print("🧪 JSON response encoding")
+    for name in BACKENDS:
+        config.JSON_ENCODER = name
+        test_matches_flask_default(name)
+        test_key_order_follows_config(name)
+        test_stream_matches_single_encode(name)
+        print(f"✅ {name}: same JSON as Flask's encoder, streamed or not")
+    config.JSON_ENCODER = 'auto'
+    test_install_replaces_jsonify()
+    print("✅ Installed provider serves jsonify()")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Check the compiled keyword matcher and the story analysis built on it:
+whole-word matching, inflections, phrases and batch analysis
+"""
+
+from tasks.keyword_matcher import KeywordMatcher
+from tasks.linguistic_0_say_mama import SayMamaTask
+from tasks.linguistic_5_story_kite import StoryKiteTask
+
+
+def test_whole_words_and_inflections():
+    matcher = KeywordMatcher({'story': ['fly', 'up'], 'action': ['pull', 'run', 'string']})
+    result = matcher.analyze('A butterfly sat on my cup')
+    assert result['counts'] == {'story': 0, 'action': 0}
+    result = matcher.analyze("We pulled the strings, running UP and up")
+    assert result['counts'] == {'story': 1, 'action': 3}
+    assert result['matches']['action'] == ['pull', 'string', 'run']
+    assert result['tokens'][:3] == ['we', 'pulled', 'the']
+
+
+def test_phrases_and_shared_words():
+    matcher = KeywordMatcher({'place': ['the sky', 'park'], 'story': ['sky']})
+    result = matcher.analyze('up in the sky above the park')
+    assert result['matches'] == {'place': ['park', 'the sky'], 'story': ['sky']}  # Phrases after words
+
+
+def test_story_analysis_and_batch():
+    task = StoryKiteTask(load_model=False)
+    story = 'first my kites flew up high in the wind then the string broke'
+    analysis = task.analyze_story_content(story)
+    assert analysis['has_essential'] and analysis['word_count'] == 13
+    assert (analysis['story_words_used'], analysis['action_words_used'], analysis['narrative_words_used']) == (4, 1, 2)
+    assert task.analyze_story_content('a butterfly flew by')['story_words_used'] == 1  # flew, not fly
+
+    batch = task.analyze_stories([story, 'ok', story])
+    assert batch[0] == analysis and batch[2] == analysis
+    assert batch[1]['word_count'] == 0  # Too short to be a story
+
+
+def test_phonetics_batch_matches_single():
+    task = SayMamaTask(load_model=False)
+    texts = ['mama', 'the cat', 'mum mum', 'mama']
+    assert task.analyze_phonetics_batch(texts) == [task.analyze_phonetics(t) for t in texts]
+    # Targets match inside babbling; patterns, syllables and the m/a sound follow in that order
+    assert task.analyze_phonetics('mum, mama!') == (
+        True, 1.0, ['ma', 'mama', 'mam', 'mama', 'mum', 'mu', 'ma', 'ma', 'ma-sound'])
+    assert task.analyze_phonetics('mamama')[2][:3] == ['ma', 'mama', 'mam']
+
+
+if __name__ == "__main__":
+    print("🧪 Keyword matcher")
+    test_whole_words_and_inflections()
+    test_phrases_and_shared_words()
+    print("✅ Whole words, inflections and phrases")
+    test_story_analysis_and_batch()
+    test_phonetics_batch_matches_single()
+    print("✅ Story and phonetic analysis, single and batch")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Check the rolling landmark history against brute force and the smoothed
+jump and balance decisions built on it - no MediaPipe model needed
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from tasks.landmark_array import LEFT_ANKLE, LEFT_HIP, RIGHT_HIP, VIS, Y
+from tasks.landmark_history import LandmarkHistory
+from tasks.physical_1_one_leg_balance import OneLegBalanceTask
+from tasks.physical_4_frog_jump import FrogJumpTask
+from tasks.pose_corpus import SYNTHETIC_POSES
+
+
+def pose(name):
+    arr = np.zeros((33, 4), dtype=np.float32)
+    arr[:, :2] = SYNTHETIC_POSES[name]
+    arr[:, VIS] = 1.0
+    return arr
+
+
+def test_rolling_queries_match_brute_force():
+    rng = np.random.default_rng(7)
+    frames = rng.random((40, 33, 4)).astype(np.float32)
+    history = LandmarkHistory(size=5)
+    for i, frame in enumerate(frames):
+        history.push(frame, now=i * 0.1)
+        window = frames[max(0, i - 4):i + 1]
+        hips = (window[:, LEFT_HIP, Y].astype(np.float64) + window[:, RIGHT_HIP, Y]) / 2
+        assert np.allclose(history.mean(), window.mean(axis=0, dtype=np.float64), atol=1e-6)
+        assert history.min('hip_y') == hips.min() and history.max('hip_y') == hips.max()
+        if i:
+            assert np.isclose(history.velocity('hip_y'), (hips[-1] - hips[0]) / ((len(hips) - 1) * 0.1))
+    assert len(history) == 5 and history.full
+
+
+def test_gap_starts_history_over():
+    history = LandmarkHistory(size=4, max_gap=1.0)
+    history.push(pose('stand'), now=0.0)
+    history.push(pose('stand'), now=0.5)
+    history.push(pose('frog_squat'), now=5.0)
+    assert len(history) == 1
+    assert np.allclose(history.mean(), pose('frog_squat'))
+
+
+def test_frog_jump_uses_smoothed_squat():
+    task = FrogJumpTask(create_pose=False)
+    task.history = LandmarkHistory(size=3)
+    states = [task.process_landmarks(pose(name))['jump_state']
+              for name in ['frog_stand'] * 4 + ['frog_squat'] * 3 + ['frog_jump', 'frog_stand']]
+    # One squat frame is not a squat yet; a held squat is, and the jump lands
+    assert states[4] == 'waiting'
+    assert states[6:] == ['squatting', 'jumping', 'landed']
+    assert task.success_count == 1
+
+
+def lifted(name, dy):
+    arr = pose(name)
+    arr[:, Y] += dy  # Negative = higher in the image
+    return arr
+
+
+def test_frog_jump_lands_after_the_apex():
+    task = FrogJumpTask(create_pose=False)
+    task.history = LandmarkHistory(size=3)
+    start = datetime(2025, 8, 6, 9, 0)
+    frames = ([pose('frog_stand')] * 4 + [pose('frog_squat')] * 3 +
+              [lifted('frog_stand', dy) for dy in (-0.22, -0.26, -0.26, -0.24, -0.21)] +  # Up, apex, coming down
+              [pose('frog_stand')])
+    results = [task.process_landmarks(arr, now=start + timedelta(seconds=0.1 * i)) for i, arr in enumerate(frames)]
+    states = [result['jump_state'] for result in results]
+
+    assert states[6] == 'squatting'
+    assert results[10]['hip_velocity'] > 0 and results[11]['hip_velocity'] > 0  # Past the apex, coming down
+    assert states[7:12] == ['jumping'] * 5  # Still in the air, so not landed yet
+    assert states[-1] == 'landed' and task.success_count == 1
+
+
+def test_balance_survives_one_noisy_frame():
+    task = OneLegBalanceTask(create_pose=False)
+    task.history = LandmarkHistory(size=3)
+    for _ in range(3):
+        task.process_landmarks(pose('left_leg_high'))
+    started = task.balance_start
+    assert started is not None
+
+    glitch = pose('left_leg_high')
+    glitch[LEFT_ANKLE, VIS] = 0.1  # Tracker briefly loses the raised ankle
+    result = task.process_landmarks(glitch)
+    assert task.balance_start == started and result['detected']
+
+    # Actually putting the leg down still ends the hold
+    for _ in range(2):
+        task.process_landmarks(pose('stand'))
+    assert task.balance_start is None
+
+
+if __name__ == "__main__":
+    print("🧪 Landmark history")
+    test_rolling_queries_match_brute_force()
+    test_gap_starts_history_over()
+    print("✅ Rolling mean, velocity and min/max match brute force")
+    test_frog_jump_uses_smoothed_squat()
+    test_frog_jump_lands_after_the_apex()
+    test_balance_survives_one_noisy_frame()
+    print("✅ Jump and balance decide on the smoothed signals")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Check the motion gate reuses landmarks on a still scene, respects the
+consecutive-skip cap and reruns inference as soon as the child moves
+"""
+
+import numpy as np
+
+from tasks.metrics import MetricsRegistry
+from tasks.motion_gate import MotionGate
+
+
+def scene(offset=0):
+    frame = np.full((240, 320, 3), 40, dtype=np.uint8)
+    frame[60:200, 120 + offset:200 + offset] = 220  # The "child"
+    return frame
+
+
+def run(gate, frames):
+    """Feed frames through the gate; returns which ones went to inference"""
+    inferred = []
+    for i, frame in enumerate(frames):
+        if not gate.should_skip(frame):
+            gate.remember(f'landmarks-{i}')
+            inferred.append(i)
+    return inferred
+
+
+def test_still_scene_is_skipped_up_to_cap():
+    registry = MetricsRegistry()
+    gate = MotionGate(threshold=2.0, max_skips=3, registry=registry)
+    inferred = run(gate, [scene()] * 9)
+    assert inferred == [0, 4, 8]
+    assert gate.landmarks == 'landmarks-8'
+    snapshot = registry.snapshot()
+    assert snapshot['counters']['motion_gate.skipped'] == 6
+    assert snapshot['gauges']['motion_gate.skip_rate'] == round(6 / 9, 4)
+
+
+def test_movement_forces_inference():
+    gate = MotionGate(threshold=2.0, max_skips=10, registry=MetricsRegistry())
+    frames = [scene(), scene(), scene(40), scene(40), scene(80)]
+    assert run(gate, frames) == [0, 2, 4]
+
+
+def test_sensor_noise_stays_under_threshold():
+    rng = np.random.default_rng(3)
+    gate = MotionGate(threshold=2.0, max_skips=10, registry=MetricsRegistry())
+    noisy = [np.clip(scene().astype(np.int16) + rng.integers(-6, 7, (240, 320, 3)), 0, 255).astype(np.uint8)
+             for _ in range(5)]
+    assert run(gate, noisy) == [0]
+
+
+if __name__ == "__main__":
+    print("🧪 Motion gate")
+    test_still_scene_is_skipped_up_to_cap()
+    print("✅ Still scenes reuse landmarks up to the skip cap")
+    test_movement_forces_inference()
+    test_sensor_noise_stays_under_threshold()
+    print("✅ Movement reruns inference, camera noise does not")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Check compact physical responses: short keys, delta encoding against the
+session's previous response, resyncing with a full snapshot and the
+compact mode of the physical assessment route
+"""
+
+import base64
+import json
+import time
+
+import cv2
+import numpy as np
+
+from tasks import physical_response
+from tasks.physical_response import RESET_KEY, SEQ_KEY, ResponseDeltas, compact_body, full_body
+
+
+def task_result(**overrides):
+    result = {
+        'detected': False,
+        'message': 'Stand on one leg',
+        'feedback': 'Lift one foot off the ground',
+        'confidence': 0.61234,
+        'success_count': 0,
+        'balance_duration': 0,
+        'balanced_leg': None,
+        'task_name': 'one_leg_balance',
+        'age_group': '1-2',
+        'enhanced': True,
+        'model_complexity': 1,
+        'next_frame_interval_ms': 400,
+        'pose_reused': False
+    }
+    result.update(overrides)
+    return result
+
+
+def test_compact_body_uses_short_keys():
+    body = compact_body(dict(task_result(), hip_velocity=0.1234567))
+    assert body['ok'] is False and body['m'] == 'Stand on one leg'
+    assert body['c'] == 0.612
+    assert body['hip_velocity'] == 0.123  # Unmapped fields keep their names
+    assert 'l' not in body  # Nulls are left out
+    full = json.dumps(full_body(task_result(), 'one_leg', '1-2'))
+    assert len(json.dumps(body)) < len(full) / 2
+
+
+def test_deltas_send_only_changes():
+    deltas = ResponseDeltas()
+    first = deltas.encode('s1', compact_body(task_result()))
+    assert first[RESET_KEY] == 1 and first[SEQ_KEY] == 1 and first['t'] == 'one_leg_balance'
+
+    same = deltas.encode('s1', compact_body(task_result()), client_seq=1)
+    assert same == {SEQ_KEY: 2}
+
+    changed = deltas.encode('s1', compact_body(task_result(detected=True, balanced_leg='left')), client_seq=2)
+    assert changed == {SEQ_KEY: 3, 'ok': True, 'l': 'left'}
+
+    cleared = deltas.encode('s1', compact_body(task_result()), client_seq=3)
+    assert cleared == {SEQ_KEY: 4, 'ok': False, 'l': None}
+
+
+def test_resync_and_eviction():
+    deltas = ResponseDeltas(max_streams=1)
+    deltas.encode('s1', compact_body(task_result()))
+    missed = deltas.encode('s1', compact_body(task_result()), client_seq=None)
+    assert missed[RESET_KEY] == 1 and missed[SEQ_KEY] == 2
+
+    deltas.encode('s2', compact_body(task_result()))
+    evicted = deltas.encode('s1', compact_body(task_result()), client_seq=2)
+    assert evicted[RESET_KEY] == 1 and evicted[SEQ_KEY] == 1
+
+    anonymous = deltas.encode(None, compact_body(task_result()))
+    assert anonymous[RESET_KEY] == 1 and SEQ_KEY not in anonymous
+
+
+def test_serialize_is_plain_json_by_default():
+    payload, mimetype = physical_response.serialize({SEQ_KEY: 7, 'c': 0.5})
+    assert payload == b'{"s":7,"c":0.5}'
+    assert mimetype == 'application/json'
+
+
+def route_client():
+    from flask import Flask
+    from ai_assessment_routes_improved import assessment_ai_bp
+
+    app = Flask('physical_response_test')
+    app.register_blueprint(assessment_ai_bp)
+    return app.test_client()
+
+
+def blank_frame():
+    image = np.zeros((240, 320, 3), dtype=np.uint8)
+    return 'data:image/jpeg;base64,' + base64.b64encode(cv2.imencode('.jpg', image)[1].tobytes()).decode()
+
+
+def test_task_type_selects_scorer():
+    # The camera client sends no age_group (the route defaults it to 1-2)
+    client = route_client()
+    for task_type, task_name in (('raise_hands', 'raise_hands'), ('one_leg', 'one_leg_balance'),
+                                 ('frog_jump', 'frog_jump')):
+        response = client.post('/api/ai/physical-assessment', json={
+            'task_type': task_type, 'frame': blank_frame(), 'session_id': f'route-{task_type}'})
+        body = response.get_json()
+        assert response.status_code == 200 and body['enhanced'] is True
+        assert body['task_name'] == task_name
+
+
+def test_compact_route():
+    client = route_client()
+    frame = blank_frame()
+    request = {'age_group': '1-2', 'task_type': 'one_leg', 'frame': frame, 'session_id': 'compact-test'}
+
+    full = client.post('/api/ai/physical-assessment', json=request)
+    assert 'additional_data' in full.get_json()
+
+    time.sleep(full.get_json()['next_frame_interval_ms'] / 1000)  # Frames are paced per session
+    first = client.post('/api/ai/physical-assessment', json=dict(request, compact=True))
+    body = first.get_json()
+    assert body[RESET_KEY] == 1 and body['t'] == 'one_leg_balance'
+
+    time.sleep(body['i'] / 1000)
+    second = client.post('/api/ai/physical-assessment', json=dict(request, compact=True, seq=body[SEQ_KEY]))
+    delta = second.get_json()
+    assert RESET_KEY not in delta and delta[SEQ_KEY] == body[SEQ_KEY] + 1
+    assert len(second.data) * 10 < len(full.data)
+
+
+if __name__ == "__main__":
+    print("🧪 Compact physical responses")
+    test_compact_body_uses_short_keys()
+    test_serialize_is_plain_json_by_default()
+    print("✅ Compact bodies use short keys and no duplicate fields")
+    test_deltas_send_only_changes()
+    test_resync_and_eviction()
+    print("✅ Only changed fields are sent, with a full snapshot to resync")
+    test_task_type_selects_scorer()
+    print("✅ The task type picks the scorer, whatever the age group")
+    test_compact_route()
+    print("✅ Compact mode works through the physical assessment route")
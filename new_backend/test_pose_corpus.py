@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Replay the pose golden corpus and check the detectors bit-for-bit
+Runs offline - no server, camera or MediaPipe inference needed
+"""
+
+import glob
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from tasks.pose_corpus import CORPUS_DIR, load_corpus, save_corpus, verify
+from tasks.registry import spec_for_task
+
+# Corpus recording -> the task_type the camera client sends for it
+CORPUS_TASK_TYPES = {'synthetic_raise_hands': 'raise_hands', 'synthetic_one_leg': 'one_leg',
+                     'synthetic_frog_jump': 'frog_jump'}
+
+
+def corpus_files():
+    return sorted(glob.glob(os.path.join(CORPUS_DIR, '*.npz')))
+
+
+def test_corpus_matches_golden_outputs():
+    paths = corpus_files()
+    assert paths, f"No corpus files in {CORPUS_DIR}"
+    for path in paths:
+        mismatches = verify(path)
+        assert not mismatches, f"{os.path.basename(path)}: {mismatches[:3]}"
+
+
+def test_batched_rules_match_golden_outputs():
+    for path in corpus_files():
+        mismatches = verify(path, batched=True)
+        assert not mismatches, f"{os.path.basename(path)} (batched): {mismatches[:3]}"
+
+
+def detections(task_type, corpus):
+    """Frames the scorer a task_type routes to reports as detected, replayed at 10 fps"""
+    task = spec_for_task('physical', task_type).load_class()(create_pose=False)
+    start = datetime(2025, 8, 6, 9, 0)
+    results = [task.process_landmarks(frame if present else None, now=start + timedelta(seconds=0.1 * i))
+               for i, (frame, present) in enumerate(zip(corpus['landmarks'], corpus['present']))]
+    return sum(result['detected'] for result in results)
+
+
+def test_task_types_score_their_own_recordings():
+    # Each recording is detected only by the scorer its own task_type routes to
+    for path in corpus_files():
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name not in CORPUS_TASK_TYPES:
+            continue
+        corpus = load_corpus(path)
+        for task_type in CORPUS_TASK_TYPES.values():
+            detected = detections(task_type, corpus)
+            if task_type == CORPUS_TASK_TYPES[name]:
+                assert detected > 0, f"{task_type} found nothing in {name}"
+            else:
+                assert detected == 0, f"{task_type} scored {detected} frames of {name}"
+
+
+def test_verify_reports_changed_output(tmp_path):
+    corpus = load_corpus(corpus_files()[0])
+    confidence = corpus['expected_raise_hands_confidence'].copy()
+    confidence[0] = np.nextafter(confidence[0], 2.0)
+    corpus['expected_raise_hands_confidence'] = confidence
+    tampered = str(tmp_path / 'tampered.npz')
+    save_corpus(tampered, corpus)
+
+    mismatches = verify(tampered)
+    assert [m[:2] for m in mismatches] == [('raise_hands_confidence', 0)]
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+
+    print("🧪 Pose golden corpus")
+    test_corpus_matches_golden_outputs()
+    print("✅ All detectors match the golden outputs")
+    test_batched_rules_match_golden_outputs()
+    print("✅ Batched vectorized rules match the golden outputs")
+    test_task_types_score_their_own_recordings()
+    print("✅ Each task type's scorer detects its own recording only")
+    with tempfile.TemporaryDirectory() as tmp:
+        test_verify_reports_changed_output(pathlib.Path(tmp))
+    print("✅ Tampered expectations are caught")
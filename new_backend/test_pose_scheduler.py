@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Check the pose batching scheduler groups concurrent sessions and hands each
+caller its own result - uses a stand-in graph, so no MediaPipe model is run
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from tasks.metrics import MetricsRegistry
+from tasks.pose_scheduler import PoseBatchScheduler, PoseRequest
+
+
+class EchoGraph:
+    """Returns a landmark array whose x column is the frame's first pixel"""
+
+    def __init__(self):
+        self.frames = 0
+        self.closed = False
+
+    def process(self, rgb):
+        self.frames += 1
+        arr = np.zeros((33, 4), dtype=np.float32)
+        arr[:, 0] = rgb[0, 0, 0]
+
+        class Results:
+            pose_landmarks = arr
+        return Results
+
+    def close(self):
+        self.closed = True
+
+
+class TrackingGraph:
+    """Finds a person in the middle of whatever image it gets; counts resets"""
+
+    def __init__(self, full_shape):
+        self.full_shape = full_shape
+        self.hide_in_crops = False
+        self.resets = 0
+        self.shapes = []
+
+    def process(self, rgb):
+        self.shapes.append(rgb.shape[:2])
+        arr = None
+        if not (self.hide_in_crops and rgb.shape != self.full_shape):
+            arr = np.zeros((33, 4), dtype=np.float32)
+            arr[:, 0] = np.linspace(0.4, 0.6, 33)
+            arr[:, 1] = np.linspace(0.3, 0.7, 33)
+            arr[:, 3] = 1.0
+
+        class Results:
+            pose_landmarks = arr
+        return Results
+
+    def reset(self):
+        self.resets += 1
+
+    def close(self):
+        pass
+
+
+def make_frame(value):
+    return np.full((4, 4, 3), value, dtype=np.uint8)
+
+
+def test_concurrent_sessions_share_batches():
+    graphs = []
+
+    def factory(tier):
+        graphs.append(EchoGraph())
+        return graphs[-1]
+
+    registry = MetricsRegistry()
+    scheduler = PoseBatchScheduler(pose_factory=factory, window_ms=50, max_batch=8,
+                                   workers=2, registry=registry)
+    results = {}
+    barrier = threading.Barrier(4)
+
+    def session(i):
+        barrier.wait()
+        for step in range(3):
+            landmarks = scheduler.infer(f'session-{i}', make_frame(i * 10 + step))
+            results[(i, step)] = float(landmarks[0, 0])
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    scheduler.shutdown()
+
+    assert results == {(i, step): float(i * 10 + step) for i in range(4) for step in range(3)}
+    assert len(graphs) == 4 and sum(g.frames for g in graphs) == 12
+    snapshot = registry.snapshot()
+    assert snapshot['counters']['pose_batch.frames'] == 12
+    assert snapshot['histograms']['pose_batch.size']['max'] > 1
+
+
+def test_session_graphs_are_bounded():
+    graphs = []
+
+    def factory(tier):
+        graphs.append(EchoGraph())
+        return graphs[-1]
+
+    scheduler = PoseBatchScheduler(pose_factory=factory, window_ms=0, max_batch=1,
+                                   workers=1, max_sessions=2, registry=MetricsRegistry())
+    for i in range(4):
+        scheduler.infer(f'session-{i}', make_frame(i))
+    assert len(graphs) == 4
+    assert [g.closed for g in graphs] == [True, True, False, False]
+    scheduler.shutdown()
+
+
+def test_slow_session_does_not_hold_up_others():
+    release = threading.Event()
+    builds = []
+
+    def factory(tier):
+        builds.append(tier)
+        if len(builds) == 1:
+            release.wait(5)  # The first session's graph is slow to build
+        return EchoGraph()
+
+    scheduler = PoseBatchScheduler(pose_factory=factory, window_ms=0, max_batch=1,
+                                   workers=2, registry=MetricsRegistry())
+    slow = {}
+    thread = threading.Thread(target=lambda: slow.update(landmarks=scheduler.infer('slow', make_frame(1))))
+    thread.start()
+    while not builds:
+        time.sleep(0.001)
+
+    # Neither the graph lock nor the batch loop waits for the slow build
+    landmarks = scheduler.infer('fast', make_frame(2), timeout=2)
+    assert float(landmarks[0, 0]) == 2.0 and 'landmarks' not in slow
+    release.set()
+    thread.join()
+    assert float(slow['landmarks'][0, 0]) == 1.0
+    scheduler.shutdown()
+
+
+def test_tier_switches_are_capped_per_batch():
+    graphs = []
+
+    def factory(tier):
+        graphs.append((tier, EchoGraph()))
+        return graphs[-1][1]
+
+    registry = MetricsRegistry()
+    scheduler = PoseBatchScheduler(pose_factory=factory, workers=1, tier_switches=1, registry=registry)
+    sessions = ('a', 'b', 'c')
+
+    def run(tier):
+        batch = [PoseRequest(key, make_frame(1), tier) for key in sessions]
+        scheduler._run_batch(batch)
+        return [request.tier for request in batch]
+
+    assert run(1) == [1, 1, 1] and len(graphs) == 3
+    # A downgrade moves one session per batch; the others keep their graph meanwhile
+    assert run(0) == [0, 1, 1] and len(graphs) == 4
+    assert run(0) == [0, 0, 1] and len(graphs) == 5
+    assert run(0) == [0, 0, 0] and len(graphs) == 6
+    assert [tier for tier, graph in graphs if not graph.closed] == [0, 0, 0]  # One graph per session
+    assert registry.counter('pose_tier.session_switches') == 3
+    assert registry.counter('pose_tier.deferred_switches') == 3
+    scheduler.shutdown()
+
+
+def test_graph_is_reset_when_the_crop_window_changes():
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    graph = TrackingGraph(frame.shape)
+    registry = MetricsRegistry()
+    scheduler = PoseBatchScheduler(pose_factory=lambda tier: graph, window_ms=0, max_batch=1, workers=1,
+                                   roi_crop=True, registry=registry)
+
+    scheduler.infer('child', frame)  # Full frame; the person sets a crop window
+    scheduler.infer('child', frame)  # First crop: the graph tracked full-frame coordinates
+    assert graph.shapes[-1] != (100, 100) and graph.resets == 1
+    scheduler.infer('child', frame)  # Same window, tracking carries on
+    assert graph.resets == 1
+
+    graph.hide_in_crops = True  # Person leaves the crop: full frame again, fresh state
+    landmarks = scheduler.infer('child', frame)
+    assert graph.shapes[-2:] == [graph.shapes[1], (100, 100)] and graph.resets == 2
+    assert landmarks is not None and np.isclose(landmarks[0, 0], 0.4)
+
+    graph.hide_in_crops = False
+    scheduler.infer('child', frame)  # Back to a crop after the full-frame run
+    assert graph.resets == 3
+    assert registry.counter('pose_roi.graph_resets') == 3
+    scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    print("🧪 Pose batching scheduler")
+    test_concurrent_sessions_share_batches()
+    print("✅ Concurrent sessions are batched and get their own results")
+    test_session_graphs_are_bounded()
+    print("✅ Session graphs are bounded")
+    test_slow_session_does_not_hold_up_others()
+    print("✅ A slow session does not hold up the others")
+    test_tier_switches_are_capped_per_batch()
+    print("✅ Tier changes rebuild a few session graphs per batch")
+    test_graph_is_reset_when_the_crop_window_changes()
+    print("✅ Graphs drop their tracking state when the crop window changes")
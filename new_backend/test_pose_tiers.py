@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Check the pose model tier controller steps down under load and recovers
+"""
+
+from tasks.metrics import MetricsRegistry
+from tasks.pose_tiers import TierController
+
+
+def make_controller():
+    return TierController(enabled=True, queue_high=8, queue_low=2, p95_high_ms=200, p95_low_ms=80,
+                          cooldown=5.0, registry=MetricsRegistry())
+
+
+def test_queue_depth_downgrades_with_cooldown():
+    tiers = make_controller()
+    assert tiers.effective(1) == 1
+    assert tiers.update(queue_depth=20, now=tiers.last_change + 6) == 0
+    assert tiers.effective(1) == 0
+    # Within the cooldown nothing changes, even once load is gone
+    assert tiers.update(queue_depth=0, now=tiers.last_change + 1) == 0
+    assert tiers.update(queue_depth=0, now=tiers.last_change + 6) == 1
+    # Never climbs above what tasks ask for
+    assert tiers.update(queue_depth=0, now=tiers.last_change + 6) == 1
+    snapshot = tiers.metrics.snapshot()
+    assert snapshot['counters'] == {'pose_tier.downgrades': 1, 'pose_tier.upgrades': 1}
+    assert snapshot['gauges']['pose_tier.ceiling'] == 1
+
+
+def test_p95_latency_downgrades():
+    tiers = make_controller()
+    tiers.effective(2)
+    for latency in [50] * 10 + [400] * 5:
+        tiers.record(latency)
+    assert tiers.update(queue_depth=0, now=tiers.last_change + 6) == 1
+    # Latencies from the old tier no longer count
+    assert tiers.p95() == 0.0
+
+
+def test_disabled_controller_keeps_requested_tier():
+    tiers = TierController(enabled=False, registry=MetricsRegistry())
+    assert tiers.update(queue_depth=100, now=tiers.last_change + 60) == 2
+    assert tiers.effective(1) == 1
+
+
+if __name__ == "__main__":
+    print("🧪 Pose model tiers")
+    test_queue_depth_downgrades_with_cooldown()
+    test_p95_latency_downgrades()
+    test_disabled_controller_keeps_requested_tier()
+    print("✅ Tiers step down under load and recover")
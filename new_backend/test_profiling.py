@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Check the request profiler: when a request is profiled (the X-Profile
+header only with the admin token), the on-disk ring buffer keeping only the
+newest traces and the admin-token check on the profile routes
+"""
+
+import os
+import random
+import time
+
+import config
+from tasks.profiling import RequestProfiler, profile_section
+
+
+def test_sampling_decision():
+    never = RequestProfiler(trace_dir='unused', sample_rate=0.0)
+    previous = config.ADMIN_TOKEN
+    try:
+        config.ADMIN_TOKEN = ''
+        assert not never.should_profile({config.PROFILE_HEADER: '1', 'X-Admin-Token': ''})
+
+        config.ADMIN_TOKEN = 'profiling-test-token'
+        admin = {'X-Admin-Token': 'profiling-test-token'}
+        for value in ('1', 'true', ' Yes '):
+            assert never.should_profile(dict(admin, **{config.PROFILE_HEADER: value}))
+            # Without the token the header would be a free CPU and disk amplifier
+            assert not never.should_profile({config.PROFILE_HEADER: value})
+            assert not never.should_profile({config.PROFILE_HEADER: value, 'X-Admin-Token': 'wrong'})
+        for headers in ({}, {config.PROFILE_HEADER: '0'}, {config.PROFILE_HEADER: 'no'}):
+            assert not never.should_profile(dict(admin, **headers))
+    finally:
+        config.ADMIN_TOKEN = previous
+
+    assert RequestProfiler(trace_dir='unused', sample_rate=1.0).should_profile({})
+
+    random.seed(26)
+    half = RequestProfiler(trace_dir='unused', sample_rate=0.5)
+    sampled = sum(half.should_profile({}) for _ in range(2000))
+    assert 900 < sampled < 1100
+
+
+def test_ring_buffer_keeps_newest_traces(tmp_path):
+    profiler = RequestProfiler(trace_dir=str(tmp_path), max_traces=3, sample_rate=0.0)
+    trace_ids = []
+    for i in range(5):
+        with profiler.profile(f'/endpoint/{i}') as trace:
+            with profile_section('outer'):
+                with profile_section('inner'):
+                    pass
+        trace_ids.append(trace['trace_id'])
+        time.sleep(0.02)  # Distinct modification times, oldest first
+
+    assert sorted(os.listdir(tmp_path)) == sorted(f'{trace_id}{ext}' for trace_id in trace_ids[2:]
+                                                   for ext in ('.json', '.prof'))
+    listed = profiler.list_traces()
+    assert [trace['trace_id'] for trace in listed] == trace_ids[:1:-1]  # Newest first
+    assert listed[0]['endpoint'] == '/endpoint/4'
+    assert set(listed[0]['sections']) == {'outer', 'outer/inner'}
+
+    assert profiler.trace_path(trace_ids[0]) is None  # Trimmed
+    assert profiler.trace_path(trace_ids[-1]).endswith('.prof')
+    assert profiler.trace_path('../' + trace_ids[-1]) is None
+
+
+def test_profile_routes_need_the_admin_token(tmp_path):
+    from flask import Flask
+    from ai_assessment_routes_improved import assessment_ai_bp, request_profiler
+
+    app = Flask('profiling_test')
+    app.register_blueprint(assessment_ai_bp)
+    client = app.test_client()
+    previous = config.ADMIN_TOKEN, request_profiler.trace_dir
+    request_profiler.trace_dir = str(tmp_path)
+    try:
+        config.ADMIN_TOKEN = 'profiling-test-token'
+        admin = {'X-Admin-Token': 'profiling-test-token'}
+        unauthenticated = client.post('/api/ai/physical-assessment', json={}, headers={config.PROFILE_HEADER: '1'})
+        assert 'X-Profile-Trace' not in unauthenticated.headers and not os.listdir(tmp_path)
+        profiled = client.post('/api/ai/physical-assessment', json={},
+                               headers=dict(admin, **{config.PROFILE_HEADER: '1'}))
+        trace_id = profiled.headers['X-Profile-Trace']
+
+        config.ADMIN_TOKEN = ''
+        assert client.get('/api/ai/admin/profiles').status_code == 403  # Disabled without a token
+
+        config.ADMIN_TOKEN = 'profiling-test-token'
+        assert client.get('/api/ai/admin/profiles').status_code == 401
+        assert client.get('/api/ai/admin/profiles', headers={'X-Admin-Token': 'wrong'}).status_code == 401
+        assert client.get(f'/api/ai/admin/profiles/{trace_id}').status_code == 401
+
+        listing = client.get('/api/ai/admin/profiles', headers=admin).get_json()
+        assert [trace['trace_id'] for trace in listing['traces']] == [trace_id]
+        download = client.get(f'/api/ai/admin/profiles/{trace_id}', headers=admin)
+        assert download.status_code == 200 and download.data
+        assert client.get('/api/ai/admin/profiles/' + '0' * 32, headers=admin).status_code == 404
+    finally:
+        config.ADMIN_TOKEN, request_profiler.trace_dir = previous
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    print("🧪 Request profiler")
+    test_sampling_decision()
+    print("✅ Profiled on an admin's request or by sampling")
+    with tempfile.TemporaryDirectory() as tmp:
+        test_ring_buffer_keeps_newest_traces(Path(tmp))
+    print("✅ Only the newest traces are kept")
+    with tempfile.TemporaryDirectory() as tmp:
+        test_profile_routes_need_the_admin_token(Path(tmp))
+    print("✅ Profile routes need the admin token")
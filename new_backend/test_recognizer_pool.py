@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Check the recognizer pool with stand-in recognizers (no Vosk model needed):
+reuse per key, the per-key bound with waiting, dropping failed recognizers
+and the occupancy/wait metrics
+"""
+
+import threading
+import time
+
+import pytest
+
+from tasks.metrics import MetricsRegistry
+from tasks.recognizer_pool import RecognizerPool
+
+
+class FakeModel:
+    pass
+
+
+def make_pool(**kwargs):
+    built = []
+
+    def factory(model, sample_rate, grammar=None):
+        built.append((sample_rate, grammar))
+        return object()
+
+    registry = MetricsRegistry()
+    return RecognizerPool(factory=factory, registry=registry, **kwargs), built, registry
+
+
+def test_reuse_per_key():
+    pool, built, registry = make_pool(max_per_key=2)
+    model = FakeModel()
+    with pool.recognizer(model, 16000) as first:
+        pass
+    with pool.recognizer(model, 16000) as again:
+        assert again is first
+    with pool.recognizer(model, 16000, '["mama", "[unk]"]'):
+        pass
+    with pool.recognizer(model, 8000):
+        pass
+    assert built == [(16000, None), (16000, '["mama", "[unk]"]'), (8000, None)]
+    snapshot = registry.snapshot()
+    assert snapshot['counters']['recognizer_pool.created'] == 3
+    assert snapshot['gauges']['recognizer_pool.in_use'] == 0
+    assert snapshot['gauges']['recognizer_pool.idle'] == 3
+
+
+def test_bound_waits_then_times_out():
+    pool, built, registry = make_pool(max_per_key=1, timeout=2.0)
+    model = FakeModel()
+    rec = pool.checkout(model, 16000)
+    got = []
+
+    def borrower():
+        with pool.recognizer(model, 16000) as other:
+            got.append(other)
+
+    thread = threading.Thread(target=borrower)
+    thread.start()
+    time.sleep(0.1)
+    assert not got  # Waiting for the only recognizer
+    pool.checkin(model, 16000, None, rec)
+    thread.join(timeout=2)
+    assert got == [rec] and len(built) == 1
+    assert registry.counter('recognizer_pool.waits') == 1
+    assert registry.summarize('recognizer_pool.wait_ms')['max'] >= 50
+
+    pool.timeout = 0.05
+    held = pool.checkout(model, 16000)
+    with pytest.raises(TimeoutError):
+        pool.checkout(model, 16000)
+    assert registry.counter('recognizer_pool.timeouts') == 1
+    pool.checkin(model, 16000, None, held)
+
+
+def test_failed_decode_drops_recognizer_and_idle_keys_are_evicted():
+    pool, built, registry = make_pool(max_per_key=1, max_keys=2)
+    model = FakeModel()
+    with pytest.raises(RuntimeError):
+        with pool.recognizer(model, 16000):
+            raise RuntimeError('decoder error')
+    with pool.recognizer(model, 16000):
+        pass
+    assert len(built) == 2  # The failed one was rebuilt, not reused
+
+    for grammar in ('["a", "[unk]"]', '["b", "[unk]"]'):
+        with pool.recognizer(model, 16000, grammar):
+            pass
+    assert len(pool.slots) == 2
+    assert registry.snapshot()['gauges']['recognizer_pool.keys'] == 2
+
+
+if __name__ == "__main__":
+    print("🧪 Recognizer pool")
+    test_reuse_per_key()
+    print("✅ Recognizers reused per (model, rate, grammar)")
+    test_bound_waits_then_times_out()
+    print("✅ Per-key bound waits, then times out")
+    test_failed_decode_drops_recognizer_and_idle_keys_are_evicted()
+    print("✅ Failed recognizers dropped, idle keys evicted")
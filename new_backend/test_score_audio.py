@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Check the offline audio scorer's transcript cache and transcript-only
+rescoring - no Vosk model needed
+"""
+
+import wave
+
+import numpy as np
+
+from score_audio import SAMPLE_RATE, Clip, TranscriptStore, prepare, score_clip
+from tasks.linguistic_0_say_mama import SayMamaTask
+from tasks.linguistic_5_story_kite import StoryKiteTask
+
+
+def write_tone(path, seconds=0.5):
+    samples = (np.sin(np.arange(int(SAMPLE_RATE * seconds)) * 0.3) * 3000).astype(np.int16)
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(samples.tobytes())
+    return samples
+
+
+def test_cached_clips_skip_decoding(tmp_path):
+    samples = write_tone(tmp_path / 'clip.wav')
+    fresh = prepare(Clip(str(tmp_path / 'clip.wav'), SayMamaTask), set(), decode=True)
+    assert fresh.pcm == samples.tobytes() and not fresh.cached
+
+    store = TranscriptStore(str(tmp_path / 'transcripts.db'), 'model-a')
+    store.put(fresh.content_hash, 'mama')
+    assert store.hashes() == {fresh.content_hash}
+    # Transcripts belong to the model that produced them
+    assert TranscriptStore(str(tmp_path / 'transcripts.db'), 'model-b').get(fresh.content_hash) is None
+
+    again = prepare(Clip(str(tmp_path / 'clip.wav'), SayMamaTask), store.hashes(), decode=True)
+    assert again.cached and again.pcm is None
+    store.close()
+
+
+def test_rescoring_uses_the_task_rules():
+    clip = Clip('clip.wav', StoryKiteTask)
+    clip.transcript = 'first the kite flew up high. then the wind pulled the string.'
+    record = score_clip(clip)
+    expected = StoryKiteTask(load_model=False).analyze_story_content(clip.transcript)
+    assert record['task'] == 'story_kite' and record['success']
+    assert record['analysis'] == expected
+
+    clip = Clip('clip.wav', SayMamaTask)
+    clip.transcript = 'hello'
+    assert not score_clip(clip)['success']
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    print("🧪 Offline audio scoring")
+    with tempfile.TemporaryDirectory() as tmp:
+        test_cached_clips_skip_decoding(Path(tmp))
+    test_rescoring_uses_the_task_rules()
+    print("✅ Cached transcripts skip decoding and rescore with the task rules")
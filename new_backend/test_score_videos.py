@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Check the offline video scorer drives task timers on video time - no
+MediaPipe model or video files needed
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from score_videos import VideoScorer, find_videos, score_landmarks
+from tasks.landmark_array import VIS
+from tasks.physical_0_raise_hands import RaiseHandsTask
+from tasks.pose_corpus import SYNTHETIC_POSES
+from tasks.shared_frames import FrameRing
+
+
+def pose(name):
+    arr = np.zeros((33, 4), dtype=np.float32)
+    arr[:, :2] = SYNTHETIC_POSES[name]
+    arr[:, VIS] = 1.0
+    return arr
+
+
+def test_timers_follow_video_clock():
+    task = RaiseHandsTask(create_pose=False)
+    names = ['stand'] * 5 + ['hands_up'] * 40
+    times = [i * 0.1 for i in range(len(names))]
+    # Scoring takes milliseconds, but the hold is measured in video seconds
+    record = score_landmarks(task, [pose(name) for name in names[:-1]] + [None], times)
+    assert record['frames'] == 45 and record['person_frames'] == 44
+    assert record['success_times']
+    assert record['success_times'][0] >= 0.5 + task.min_detection_time - 1e-6
+
+
+def test_find_videos_walks_directories(tmp_path):
+    (tmp_path / 'frog_jump').mkdir()
+    for name in ('b.mp4', 'a.MOV', 'notes.txt'):
+        (tmp_path / 'frog_jump' / name).write_bytes(b'')
+    found = [p.split('/')[-1] for p in find_videos([str(tmp_path)])]
+    assert found == ['a.MOV', 'b.mp4']
+
+
+def test_stalled_pool_fails_instead_of_hanging():
+    ring = FrameRing(slots=1, max_pixels=16)
+    try:
+        ring.acquire(timeout=1)  # The only slot is in flight and never comes back
+        worker = SimpleNamespace(alive=True)
+        worker.is_alive = lambda: worker.alive
+        scorer = VideoScorer.__new__(VideoScorer)
+        scorer.slot_timeout = 0.2
+        scorer.pool = SimpleNamespace(ring=ring, processes=[worker], restarts=0)
+
+        for alive, message in ((True, 'No shared frame slot'), (False, 'died')):
+            worker.alive = alive
+            try:
+                scorer._acquire_slot()
+                assert False, 'no slot can be acquired'
+            except RuntimeError as e:
+                assert message in str(e)
+    finally:
+        ring.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    print("🧪 Offline video scoring")
+    test_timers_follow_video_clock()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_find_videos_walks_directories(Path(tmp))
+    print("✅ Task timers run on video time")
+    test_stalled_pool_fails_instead_of_hanging()
+    print("✅ A stalled worker pool fails the run instead of hanging")
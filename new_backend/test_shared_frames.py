@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Check the shared-memory frame ring and the pose worker processes behind it
+"""
+
+import os
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+
+from tasks.metrics import MetricsRegistry
+from tasks.pose_scheduler import PoseBatchScheduler
+from tasks.shared_frames import FrameRing
+
+
+class MeanGraph:
+    """Stand-in pose graph: reports the frame's mean red value as landmark 0"""
+
+    def process(self, rgb):
+        if rgb[0, 0, 0] == CRASH_RED:
+            os._exit(3)  # A crash inside the native graph takes the whole worker down
+        landmark = SimpleNamespace(x=float(rgb[..., 0].mean()) / 255.0, y=0.5, z=0.0, visibility=1.0)
+        return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=[landmark] * 33))
+
+    def close(self):
+        pass
+
+
+CRASH_RED = 13
+
+
+def mean_graph(tier):
+    return MeanGraph()
+
+
+def test_ring_writes_rgb_in_place():
+    ring = FrameRing(slots=2, max_pixels=64 * 48)
+    try:
+        slot = ring.acquire(timeout=1)
+        bgr = np.zeros((48, 64, 3), dtype=np.uint8)
+        bgr[..., 2] = 200  # Red in BGR order
+        ring.write_frame(slot, bgr)
+        rgb = ring.frame(slot)
+        assert rgb.shape == (48, 64, 3)
+        assert rgb[..., 0].min() == 200 and rgb[..., 2].max() == 0
+        assert np.shares_memory(rgb, ring.frames)
+
+        # Frames over the slot size are scaled down to fit
+        ring.write_frame(slot, np.zeros((96, 128, 3), dtype=np.uint8))
+        assert ring.frame(slot).shape == (48, 64, 3)
+
+        other = ring.acquire(timeout=1)
+        try:
+            ring.acquire(timeout=0.05)
+            assert False, 'every slot is taken'
+        except TimeoutError:
+            pass
+        ring.release(other)
+    finally:
+        ring.close()
+
+
+def test_worker_processes_return_landmarks():
+    scheduler = PoseBatchScheduler(pose_factory=mean_graph, window_ms=1, roi_crop=False, processes=2,
+                                   registry=MetricsRegistry())
+    try:
+        results = {}
+
+        def session(name, red):
+            frame = np.zeros((120, 160, 3), dtype=np.uint8)
+            frame[..., 2] = red
+            results[name] = [scheduler.infer((name, 's'), frame, tier=0, timeout=30) for _ in range(3)]
+
+        threads = [threading.Thread(target=session, args=(f'child-{red}', red)) for red in (51, 204)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for name, red in (('child-51', 51), ('child-204', 204)):
+            for landmarks in results[name]:
+                assert landmarks.shape == (33, 4)
+                assert abs(landmarks[0, 0] - red / 255.0) < 1e-3
+        assert scheduler.metrics.counter('pose_batch.frames') == 6
+        assert scheduler._pool.ring._free.qsize() == scheduler._pool.ring.slots
+    finally:
+        scheduler.shutdown()
+
+
+def test_dead_worker_is_replaced():
+    scheduler = PoseBatchScheduler(pose_factory=mean_graph, window_ms=1, roi_crop=False, processes=1,
+                                   registry=MetricsRegistry())
+    try:
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        frame[..., 2] = CRASH_RED
+        try:
+            scheduler.infer('child', frame, tier=0, timeout=30)
+            assert False, 'the worker died on this frame'
+        except RuntimeError:
+            pass
+        pool = scheduler._pool
+        assert pool.restarts == 1 and pool.processes[0].is_alive()
+        assert pool.ring._free.qsize() == pool.ring.slots
+
+        frame[..., 2] = 102
+        landmarks = scheduler.infer('child', frame, tier=0, timeout=30)
+        assert abs(landmarks[0, 0] - 102 / 255.0) < 1e-3
+    finally:
+        scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    print("🧪 Shared frame transport")
+    test_ring_writes_rgb_in_place()
+    print("✅ Frames convert straight into shared slots")
+    test_worker_processes_return_landmarks()
+    print("✅ Worker processes answer through the shared landmark array")
+    test_dead_worker_is_replaced()
+    print("✅ A dead worker's frames fail and a new worker takes over")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Check the background speech job queue with stand-in handlers (no Vosk
+model needed): results by polling and long-polling, rejection when the
+queue is full, result expiry, the queue stats and the job-mode routes
+"""
+
+import queue
+import threading
+import time
+
+import pytest
+
+import config
+from tasks.metrics import MetricsRegistry
+from tasks.speech_jobs import SpeechJobQueue
+
+
+def make_queue(handler, **kwargs):
+    registry = MetricsRegistry()
+    return SpeechJobQueue(handler, registry=registry, **kwargs), registry
+
+
+def test_poll_and_long_poll():
+    jobs, registry = make_queue(lambda payload: ({'transcript': payload['audio']}, 200), workers=1)
+    job = jobs.submit({'audio': 'mama'})
+    assert job.describe()['status'] in ('queued', 'running', 'done')
+
+    finished = jobs.get(job.id, wait=5.0)
+    info = finished.describe()
+    assert info['status'] == 'done'
+    assert info['result'] == {'transcript': 'mama'}
+    assert info['queued_ms'] >= 0 and info['run_ms'] >= 0
+    assert finished.payload is None
+    assert jobs.get('missing') is None
+    assert registry.counter('speech_jobs.completed') == 1
+
+
+def test_errors_mark_the_job_failed():
+    def handler(payload):
+        if payload == 'raise':
+            raise RuntimeError('decoder crashed')
+        return {'error': 'Audio processing failed'}, 500
+
+    jobs, registry = make_queue(handler, workers=1)
+    crashed = jobs.get(jobs.submit('raise').id, wait=5.0)
+    assert crashed.state == 'failed' and crashed.status_code == 500
+    assert 'decoder crashed' in crashed.result['error']
+    errored = jobs.get(jobs.submit('status').id, wait=5.0)
+    assert errored.state == 'failed' and errored.status_code == 500
+    assert registry.counter('speech_jobs.failed') == 2
+
+
+def test_full_queue_rejects():
+    release = threading.Event()
+    jobs, registry = make_queue(lambda payload: (release.wait(5.0), 200), workers=1, max_queued=2)
+    first = jobs.submit(1)
+    deadline = time.time() + 5.0
+    while first.state == 'queued' and time.time() < deadline:
+        time.sleep(0.01)
+
+    jobs.submit(2)
+    jobs.submit(3)
+    with pytest.raises(queue.Full):
+        jobs.submit(4)
+    stats = jobs.stats()
+    assert stats['queued'] == 2 and stats['running'] == 1
+    assert stats['oldest_queued_ms'] >= 0
+    assert jobs.retry_after() >= 1
+    assert registry.counter('speech_jobs.rejected') == 1
+
+    release.set()
+    assert jobs.get(first.id, wait=5.0).state == 'done'
+
+
+def test_finished_jobs_expire():
+    jobs, registry = make_queue(lambda payload: ({}, 200), workers=1, result_ttl=0.05)
+    job = jobs.get(jobs.submit(None).id, wait=5.0)
+    assert job.state == 'done'
+    time.sleep(0.1)
+    assert jobs.get(job.id) is None
+    assert jobs.stats()['finished'] == 0
+    assert registry.counter('speech_jobs.expired') == 1
+
+
+class StandInSpeechTask:
+    """Enhanced linguistic task that only reports which task scored the clip"""
+
+    def __init__(self, task_name):
+        self.task_name = task_name
+
+    def get_task_info(self):
+        return {'task_name': self.task_name}
+
+    def process_audio(self, audio_data):
+        return {'success': True, 'transcript': audio_data, 'task_name': self.task_name}
+
+
+def test_task_type_selects_speech_scorer():
+    from ai_assessment_routes_improved import assess_speech
+    from tasks import get_task_manager
+
+    # Stand-ins, as the enhanced tasks need a Vosk model; the voice client sends no age_group
+    tasks = get_task_manager().linguistic_tasks
+    previous = dict(tasks.instances)
+    tasks.instances.update({'0-1': StandInSpeechTask('say_mama'), '5-6': StandInSpeechTask('story_kite')})
+    try:
+        for task_type, age_group in (('say_mama', '0-1'), ('story_kite', '5-6')):
+            body, status = assess_speech({'audio': 'clip', 'task_type': task_type, 'target_words': ['kite']})
+            assert status == 200 and body['enhanced'] is True
+            assert (body['task_name'], body['age_group']) == (task_type, age_group)
+    finally:
+        tasks.instances.clear()
+        tasks.instances.update(previous)
+
+
+def test_job_mode_routes():
+    from flask import Flask
+    from ai_assessment_routes_improved import assessment_ai_bp
+
+    app = Flask('speech_jobs_test')
+    app.register_blueprint(assessment_ai_bp)
+    client = app.test_client()
+
+    submitted = client.post('/api/ai/speech-assessment', json={'audio': 'bm90IGF1ZGlv', 'async': True})
+    assert submitted.status_code == 202
+    job_id = submitted.get_json()['job_id']
+    assert submitted.headers['Location'].endswith(job_id)
+
+    polled = client.get(f'/api/ai/speech-assessment/jobs/{job_id}?wait=30')
+    assert polled.status_code == 200
+    assert polled.get_json()['status'] in ('done', 'failed')
+    assert 'result' in polled.get_json()
+
+    assert client.get('/api/ai/speech-assessment/jobs/unknown').status_code == 404
+
+    # Metrics expose internals, so they need the admin token like the profile routes
+    previous = config.ADMIN_TOKEN
+    config.ADMIN_TOKEN = 'metrics-test-token'
+    try:
+        assert client.get('/api/ai/metrics').status_code == 401
+        metrics_response = client.get('/api/ai/metrics', headers={'X-Admin-Token': 'metrics-test-token'})
+        assert metrics_response.get_json()['speech_jobs']['capacity'] >= 1
+    finally:
+        config.ADMIN_TOKEN = previous
+
+
+if __name__ == "__main__":
+    print("🧪 Speech job queue")
+    test_poll_and_long_poll()
+    test_errors_mark_the_job_failed()
+    print("✅ Jobs finish in the background and are fetched by polling")
+    test_full_queue_rejects()
+    print("✅ A full queue sheds new jobs")
+    test_finished_jobs_expire()
+    print("✅ Finished jobs expire")
+    test_job_mode_routes()
+    print("✅ Job mode works through the speech assessment route")
+    test_task_type_selects_speech_scorer()
+    print("✅ The task type picks the speech scorer, whatever the age group")
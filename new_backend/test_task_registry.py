@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Check the declarative task registry: nothing is built at startup, tasks are
+built once on first use, and undeclared or broken tasks fall back to the
+basic task info
+"""
+
+import os
+import subprocess
+import sys
+
+from tasks import registry
+from tasks.enhanced_task_manager import EnhancedTaskManager
+from tasks.registry import LazyTasks, TaskSpec
+
+
+def test_importing_the_package_imports_no_task():
+    # A fresh interpreter: this one has long imported everything
+    script = (
+        "import sys, tasks\n"
+        "print(','.join(sorted(m for m in sys.modules if m.startswith('tasks.'))))\n"
+        "tasks.FrogJumpTask\n"
+        "print('tasks.physical_4_frog_jump' in sys.modules)\n"
+    )
+    loaded, frog = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+    task_modules = {f'tasks.{spec.module}' for spec in registry.TASK_SPECS if spec.implemented}
+    assert task_modules.isdisjoint(loaded.split(','))
+    assert 'tasks.speech' not in loaded.split(',')  # No speech stack either
+    assert frog == 'True'  # Still importable by name, on first access
+
+
+def test_manager_builds_tasks_on_first_use():
+    manager = EnhancedTaskManager()
+    assert not manager.physical_tasks.instances and not manager.linguistic_tasks.instances
+    assert sorted(manager.physical_tasks) == ['0-1', '1-2', '4-5']
+
+    summary = manager.get_all_available_tasks()
+    assert summary['total_physical'] == 3 and summary['total_linguistic'] == 2
+    assert summary['physical_tasks']['4-5']['name'] == 'frog_jump'
+    assert not manager.physical_tasks.instances  # Listing builds nothing
+
+    info = manager.get_physical_task('4-5')
+    assert info['available'] and info['task_info']['task_name'] == 'frog_jump'
+    assert manager.get_physical_task('4-5')['instance'] is info['instance']
+    assert list(manager.physical_tasks.instances) == ['4-5']
+
+
+def test_basic_fallbacks_come_from_the_registry():
+    manager = EnhancedTaskManager()
+    apple = manager.get_linguistic_task('1-2')
+    assert apple == {'available': False, 'instance': None,
+                     'task_info': {'task': 'apple', 'title': "Say 'apple'", 'icon': '🍎', 'target_words': ['apple']}}
+    assert manager.get_physical_task('3-4')['task_info'] == {'task': 'stand_still', 'title': 'Can you stand very still?',
+                                                            'icon': '🧘'}
+    assert manager.get_physical_task('9-10') is None
+
+
+def test_task_types_resolve_to_specs():
+    assert registry.spec_for_task('physical', 'raise_hands').age_group == '0-1'
+    assert registry.spec_for_task('physical', 'one_leg').name == 'one_leg_balance'  # The basic flow's name
+    assert registry.spec_for_task('physical', 'one_leg_balance').age_group == '1-2'
+    assert registry.spec_for_task('linguistic', 'raise_hands') is None
+    assert registry.spec_for_task('physical', 'cartwheel') is None
+
+
+def test_failed_build_is_remembered():
+    built = []
+
+    def build(cls):
+        built.append(cls)
+        raise RuntimeError('model missing')
+
+    spec = TaskSpec('physical', '0-1', 'raise_hands', 'Raise', '🖐️', 'physical_0_raise_hands', 'RaiseHandsTask')
+    tasks = LazyTasks('physical', build, specs=(spec,))
+    assert tasks.get('0-1') is None and tasks.get('0-1') is None
+    assert len(built) == 1 and len(tasks) == 0
+
+
+def test_task_classes_are_declared():
+    classes = registry.task_classes('linguistic')
+    assert classes['say_mama'] is classes['0-1'] and classes['story_kite'].__name__ == 'StoryKiteTask'
+
+
+if __name__ == "__main__":
+    print("🧪 Task registry")
+    test_importing_the_package_imports_no_task()
+    test_manager_builds_tasks_on_first_use()
+    print("✅ Tasks built lazily, once")
+    test_basic_fallbacks_come_from_the_registry()
+    test_failed_build_is_remembered()
+    test_task_classes_are_declared()
+    test_task_types_resolve_to_specs()
+    print("✅ Fallbacks and failures handled from the registry")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Check the transcript cache: LRU bound, SQLite tier, hit-rate metrics and
+cache hits that never touch Vosk - no speech model needed
+"""
+
+import io
+import wave
+
+import numpy as np
+
+import config
+from tasks import speech
+from tasks.metrics import MetricsRegistry
+from tasks.transcript_cache import TranscriptCache, get_transcript_cache
+
+
+def wav_bytes(samples, rate=16000):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def test_memory_lru_and_hit_rate():
+    registry = MetricsRegistry()
+    cache = TranscriptCache(max_entries=2, db_path='', registry=registry)
+    keys = [cache.key(bytes([i]) * 100, 16000, 'model') for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, f'word {i}')
+    assert cache.get(keys[0]) is None  # Evicted
+    assert cache.get(keys[2])['text'] == 'word 2'
+    snapshot = registry.snapshot()
+    assert snapshot['counters'] == {'transcript_cache.misses': 1, 'transcript_cache.memory_hits': 1}
+    assert snapshot['gauges']['transcript_cache.hit_rate'] == 0.5
+    assert snapshot['gauges']['transcript_cache.entries'] == 2
+
+
+def test_key_covers_rate_and_model():
+    pcm = b'\x01\x00' * 800
+    assert TranscriptCache.key(pcm, 16000, 'a') != TranscriptCache.key(pcm, 8000, 'a')
+    assert TranscriptCache.key(pcm, 16000, 'a') != TranscriptCache.key(pcm, 16000, 'b')
+
+
+def test_grammar_is_canonical_and_keyed():
+    assert speech.grammar_json(['Mama', 'mom ', 'mama']) == '["mama", "mom", "[unk]"]'
+    assert speech.grammar_json([]) is None
+    grammar = speech.grammar_json(['mama'])
+    pcm = b'\x01\x00' * 800
+    assert TranscriptCache.key(pcm, 16000, 'a', grammar) != TranscriptCache.key(pcm, 16000, 'a')
+
+
+def test_free_form_tasks_keep_the_full_vocabulary():
+    from tasks.registry import spec_for_task
+
+    previous = config.SPEECH_GRAMMAR
+    config.SPEECH_GRAMMAR = True
+    try:
+        for task_type, free_form in (('apple', False), ('rhyme_cat', False), ('fill_blank', False),
+                                     ('sentence_sun', True), ('story_kite', True)):
+            spec = spec_for_task('linguistic', task_type)
+            grammar = speech.task_grammar(['kite', 'fly', 'wind'], free_form=spec.free_form)
+            assert (grammar is None) == free_form, task_type
+    finally:
+        config.SPEECH_GRAMMAR = previous
+
+
+def test_sqlite_tier_survives_restart_and_is_bounded(tmp_path):
+    path = str(tmp_path / 'transcripts.db')
+    words = [{'word': 'mama', 'start': 0.1, 'end': 0.5, 'conf': 0.9}]
+    first = TranscriptCache(max_entries=8, db_path=path, db_max_entries=2, registry=MetricsRegistry())
+    for i in range(3):
+        first.put(f'key-{i}', f'clip {i}', words)
+
+    registry = MetricsRegistry()
+    second = TranscriptCache(max_entries=8, db_path=path, db_max_entries=2, registry=registry)
+    assert second.get('key-0') is None
+    assert second.get('key-2') == {'text': 'clip 2', 'words': words}
+    second.get('key-2')
+    assert registry.snapshot()['counters'] == {'transcript_cache.misses': 1, 'transcript_cache.disk_hits': 1,
+                                               'transcript_cache.memory_hits': 1}
+
+
+def test_pruning_runs_only_past_the_bound(tmp_path):
+    cache = TranscriptCache(max_entries=0, db_path=str(tmp_path / 'transcripts.db'), db_max_entries=20,
+                            registry=MetricsRegistry())
+    counts = []
+    cache.db.set_trace_callback(lambda sql: counts.append(sql) if 'COUNT(*)' in sql else None)
+    sizes = []
+    for i in range(50):
+        cache.put(f'key-{i}', f'clip {i}')
+        sizes.append(cache.db.execute('SELECT COUNT(*) FROM transcripts').fetchone()[0])
+        counts.pop()  # The check above
+    assert max(sizes) == 20 and sizes[-1] <= 20
+    assert len(counts) == 10  # Pruned to 18 rows, so counted on puts 21, 24, ... 48 only
+    assert cache.get('key-49') is not None and cache.get('key-0') is None
+
+    plan = cache.db.execute('EXPLAIN QUERY PLAN SELECT key FROM transcripts ORDER BY used_at LIMIT 5').fetchall()
+    assert 'idx_transcripts_used_at' in str(plan)
+
+
+def test_cached_clip_skips_recognition():
+    samples = (np.sin(np.arange(8000) * 0.2) * 2000)
+    pcm, rate = speech.read_wav(wav_bytes(samples))
+    cache = get_transcript_cache()
+    cache.put(cache.key(pcm, rate, speech.model_name('/models/vosk-model-small-en-us-0.15')), 'mama')
+    # No model is passed, so only the cache can answer
+    result = speech.transcribe(None, pcm, rate, '/models/vosk-model-small-en-us-0.15/')
+    assert (result['text'], result['words'], result['cached']) == ('mama', [], True)
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    print("🧪 Transcript cache")
+    test_memory_lru_and_hit_rate()
+    test_key_covers_rate_and_model()
+    test_grammar_is_canonical_and_keyed()
+    test_free_form_tasks_keep_the_full_vocabulary()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_sqlite_tier_survives_restart_and_is_bounded(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_pruning_runs_only_past_the_bound(Path(tmp))
+    print("✅ LRU, SQLite tier and hit-rate metrics")
+    test_cached_clip_skips_recognition()
+    print("✅ Cached clips skip Vosk entirely")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Check voice activity detection on synthetic clips: silence around a word is
+trimmed, quiet fricatives survive, and silent clips never reach Vosk
+"""
+
+import numpy as np
+
+import config
+from tasks import speech, voice_activity
+from tasks.metrics import MetricsRegistry
+
+RATE = 16000
+
+
+def clip(*parts, noise=40, seed=0):
+    """Concatenate (seconds, kind) parts over a low noise floor as int16 PCM"""
+    rng = np.random.default_rng(seed)
+    pieces = []
+    for seconds, kind in parts:
+        n = int(seconds * RATE)
+        t = np.arange(n) / RATE
+        if kind == 'vowel':
+            piece = 6000 * np.sin(2 * np.pi * 220 * t) + 2000 * np.sin(2 * np.pi * 660 * t)
+        elif kind == 'fricative':
+            piece = rng.normal(0, 500, n)  # Quiet, noisy, lots of zero crossings
+        else:
+            piece = np.zeros(n)
+        pieces.append(piece + rng.normal(0, noise, n))
+    return np.clip(np.concatenate(pieces), -32768, 32767).astype('<i2').tobytes()
+
+
+def test_silence_around_a_word_is_trimmed():
+    registry = MetricsRegistry()
+    pcm, report = voice_activity.trim(clip((1.0, 'silence'), (0.4, 'vowel'), (1.5, 'silence')), RATE, registry)
+    assert report['silent'] is False and report['segments'] == 1
+    assert 380 <= report['speech_ms'] <= 440
+    kept_ms = 1000.0 * len(pcm) / 2 / RATE
+    assert kept_ms <= 400 + 2 * config.SPEECH_VAD_PADDING_MS + 40
+    assert abs(report['trimmed_ms'] - (2900 - kept_ms)) < 1
+    assert registry.counter('speech.trimmed_ms') == report['trimmed_ms']
+
+
+def test_fricatives_and_short_pauses_are_kept():
+    pcm, report = voice_activity.trim(clip((0.5, 'silence'), (0.15, 'fricative'), (0.2, 'vowel'),
+                                           (0.25, 'silence'), (0.2, 'vowel'), (0.5, 'silence')), RATE)
+    assert report['segments'] == 1  # The pause is shorter than the padding on both sides
+    assert report['speech_ms'] >= 500
+
+
+def test_clip_shorter_than_the_padding():
+    # 15 frames against a 21-frame padding kernel: the padded mask must stay 15 frames
+    short = clip((0.1, 'silence'), (0.1, 'vowel'), (0.1, 'silence'))
+    pcm, report = voice_activity.trim(short, RATE)
+    assert report['segments'] == 1 and report['trimmed_ms'] == 0.0
+    assert pcm == short
+
+    # A word at either end keeps exactly the padding on its other side
+    padded_ms = 80 + config.SPEECH_VAD_PADDING_MS
+    for parts in (((0.08, 'vowel'), (0.32, 'silence')), ((0.32, 'silence'), (0.08, 'vowel'))):
+        source = clip(*parts)
+        pcm, report = voice_activity.trim(source, RATE)
+        assert report['segments'] == 1 and report['trimmed_ms'] == 400 - padded_ms
+        assert pcm == (source[:len(pcm)] if parts[0][1] == 'vowel' else source[-len(pcm):])
+
+
+def test_silent_clip_skips_recognition():
+    registry = MetricsRegistry()
+    pcm, report = voice_activity.trim(clip((2.0, 'silence')), RATE, registry)
+    assert pcm == b'' and report['silent'] and report['trimmed_ms'] == 2000.0
+    assert registry.counter('speech.silent_clips') == 1
+    # No model and no model path: anything but the silent shortcut would fail
+    result = speech.transcribe(None, clip((2.0, 'silence')), RATE)
+    assert result['text'] == '' and result['voice_activity']['silent']
+
+
+if __name__ == "__main__":
+    print("🧪 Voice activity detection")
+    test_silence_around_a_word_is_trimmed()
+    test_fricatives_and_short_pauses_are_kept()
+    test_clip_shorter_than_the_padding()
+    print("✅ Silence trimmed, fricatives and short pauses kept")
+    test_silent_clip_skips_recognition()
+    print("✅ Silent clips never reach Vosk")
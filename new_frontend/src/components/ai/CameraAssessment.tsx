@@ -27,6 +27,8 @@ export default function CameraAssessment({
   const [successCount, setSuccessCount] = useState(0);
   const [showFeedback, setShowFeedback] = useState(false);
   const intervalRef = useRef<number | null>(null);
+  // Lets the backend keep this child's progress apart from other sessions
+  const sessionIdRef = useRef(`${Date.now()}-${Math.random().toString(36).slice(2)}`);
 
   const startCamera = async () => {
     try {
@@ -88,17 +90,16 @@ export default function CameraAssessment({
     
     let currentSuccessCount = 0;
     const requiredSuccessFrames = 5; // Reduced from 10 to 5
-    let frameCount = 0;
-    const maxFrames = 60; // 30 seconds at 2 FPS
+    const deadline = Date.now() + 30000; // 30 seconds to complete the task
+    let nextFrameAt = 0; // The server recommends when the next frame is useful
     let isProcessingFrame = false; // Flag to prevent overlapping requests
     
     intervalRef.current = setInterval(async () => {
-      // Skip if already processing a frame
-      if (isProcessingFrame) {
+      // Skip if already processing a frame or the server asked us to wait
+      if (isProcessingFrame || Date.now() < nextFrameAt) {
         return;
       }
       
-      frameCount++;
       isProcessingFrame = true;
       
       const frameData = captureFrame();
@@ -123,15 +124,25 @@ export default function CameraAssessment({
           },
           body: JSON.stringify({
             task_type: taskType,
-            frame: frameData
+            frame: frameData,
+            session_id: sessionIdRef.current
           })
         });
         
+        if (response.status === 429) {
+          // Sent too soon - wait as asked without counting it against the child
+          const throttled = await response.json();
+          nextFrameAt = Date.now() + (throttled.retry_after_ms ?? 500);
+          isProcessingFrame = false;
+          return;
+        }
+        
         if (!response.ok) {
           throw new Error(`HTTP error! status: ${response.status}`);
         }
         
         const result = await response.json();
+        nextFrameAt = Date.now() + (result.next_frame_interval_ms ?? 500);
         
         if (result.success) {
           currentSuccessCount++;
@@ -166,14 +177,15 @@ export default function CameraAssessment({
         console.error('Assessment error:', error);
         setMessage('Assessment failed - trying again...');
         setFeedback('⚠️ Connection issue - retrying...');
+        nextFrameAt = Date.now() + 500;
         currentSuccessCount = Math.max(0, currentSuccessCount - 1);
         setSuccessCount(currentSuccessCount);
       }
       
       isProcessingFrame = false;
       
-      // Timeout after maximum frames
-      if (frameCount >= maxFrames) {
+      // Timeout after the time limit
+      if (Date.now() >= deadline) {
         if (intervalRef.current) {
           clearInterval(intervalRef.current);
           intervalRef.current = null;
@@ -188,7 +200,7 @@ export default function CameraAssessment({
           onComplete(false, currentSuccessCount);
         }, 3000);
       }
-    }, 500); // Process every 500ms (2 FPS) instead of 100ms
+    }, 50); // Poll often; the server-recommended interval sets the real frame rate
   };
 
   const getTaskSpecificFeedback = (taskType: string, message: string): string => {